@@ -0,0 +1,100 @@
+# Test de charge du contrôle d'admission : connexions (bcrypt) envoyées en
+# boucle ouverte à 1x, 2x et 3x la capacité mesurée du pool de hachage, avec
+# un flux constant de lectures GET /books/{book_id}. Compare le débit utile
+# (réponses réussies dans les délais) avec et sans contrôle d'admission.
+# Exécution : python -m benchmarks.bench_admission
+import asyncio
+import random
+import statistics
+import time
+
+import httpx
+
+import main
+from benchmarks.fixtures import HEADERS, lift_rate_limit
+from routers.users import users
+from utils import auth
+from utils.password_hasher import check_password, hash_password
+
+DURATION = 6.0
+READ_RATE = 100  # Lectures par seconde
+LOGIN_SLO = 2.0  # Délai au-delà duquel une connexion réussie n'est plus utile (secondes)
+READ_SLO = 0.1
+FORM = {"username": "charge@example.com", "password": "MotDePasse123"}
+
+
+# Capacité du service de connexion : connexions par seconde avec tous les workers occupés
+def login_capacity() -> float:
+    hashed = hash_password(FORM["password"])
+    start = time.perf_counter()
+    for _ in range(3):
+        check_password(FORM["password"], hashed)
+    return auth.password_hasher.max_workers / ((time.perf_counter() - start) / 3)
+
+
+# Requêtes en boucle ouverte (arrivées de Poisson) : le débit d'arrivée ne
+# dépend pas des réponses, comme pour un vrai pic de trafic
+async def open_loop(client: httpx.AsyncClient, rate: float, send, results: list) -> None:
+    rng = random.Random(rate)
+    tasks = []
+    deadline = time.perf_counter() + DURATION
+    next_time = time.perf_counter()
+    while next_time < deadline:
+        await asyncio.sleep(max(0.0, next_time - time.perf_counter()))
+        tasks.append(asyncio.create_task(timed(send, client, results)))
+        next_time += rng.expovariate(rate)
+    await asyncio.gather(*tasks)
+
+
+async def timed(send, client: httpx.AsyncClient, results: list) -> None:
+    start = time.perf_counter()
+    response = await send(client)
+    results.append((response.status_code, time.perf_counter() - start))
+
+
+async def login(client: httpx.AsyncClient) -> httpx.Response:
+    return await client.post("/token", data=FORM, headers=HEADERS)
+
+
+async def read(client: httpx.AsyncClient) -> httpx.Response:
+    return await client.get("/books/2", headers=HEADERS)
+
+
+def goodput(results: list, slo: float) -> float:
+    return sum(1 for status, latency in results if status == 200 and latency <= slo) / DURATION
+
+
+def summary(results: list) -> str:
+    latencies = sorted(latency for status, latency in results if status == 200) or [0.0]
+    rejected = sum(1 for status, _ in results if status == 503)
+    p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]
+    return f"p50={statistics.median(latencies) * 1e3:>7.0f}ms p99={p99 * 1e3:>7.0f}ms rejetées={rejected:>4}"
+
+
+async def scenario(client: httpx.AsyncClient, login_rate: float) -> tuple:
+    logins, reads = [], []
+    await asyncio.gather(open_loop(client, login_rate, login, logins), open_loop(client, READ_RATE, read, reads))
+    return logins, reads
+
+
+async def run() -> None:
+    lift_rate_limit()
+    await main.startup_event()
+    users.add({"nom": "Charge", "email": FORM["username"], "role": "membre", "mot_de_passe": hash_password(FORM["password"])})
+    capacity = login_capacity()
+    print(f"capacité mesurée : {capacity:.1f} connexions/s ({auth.password_hasher.max_workers} workers)")
+
+    transport = httpx.ASGITransport(app=main.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+        for factor in (1, 2, 3):
+            for enabled in (False, True):
+                main.admission.enabled = enabled
+                logins, reads = await scenario(client, factor * capacity)
+                label = f"{factor}x {'avec' if enabled else 'sans'} admission"
+                print(f"{label:<20} connexions utiles={goodput(logins, LOGIN_SLO):>5.1f}/s {summary(logins)}")
+                print(f"{'':<20} lectures utiles={goodput(reads, READ_SLO):>7.1f}/s {summary(reads)}")
+    auth.password_hasher.shutdown()
+
+
+if __name__ == "__main__":
+    asyncio.run(run())
@@ -0,0 +1,38 @@
+# Micro-benchmark du coût d'authentification par requête (get_current_user),
+# sans cache (jwt.decode + résolution de l'utilisateur) puis avec cache.
+# Exécution : python -m benchmarks.bench_auth_cache
+import asyncio
+import time
+
+from utils import auth
+from utils.repository import Repository
+from utils.token_cache import TokenCache
+
+USERS = 100_000
+TOKENS = 1_000
+CALLS = 50_000
+
+
+async def measure(tokens: list) -> float:
+    start = time.perf_counter()
+    for i in range(CALLS):
+        await auth.get_current_user(tokens[i % len(tokens)])
+    return (time.perf_counter() - start) / CALLS * 1e6
+
+
+async def run() -> None:
+    users = Repository(unique_fields=["email"])
+    for i in range(USERS):
+        users.add({"nom": f"Lecteur {i}", "email": f"lecteur{i}@example.com", "role": "membre", "mot_de_passe": "x"})
+    auth.set_users_reference(users)
+    tokens = [auth.create_access_token({"sub": f"lecteur{i}@example.com"}) for i in range(TOKENS)]
+
+    auth.token_cache = TokenCache(max_size=0)
+    print(f"sans cache : {await measure(tokens):.2f}us par requête")
+    auth.token_cache = TokenCache(max_size=10_000)
+    print(f"avec cache : {await measure(tokens):.2f}us par requête")
+    print(auth.token_cache.stats())
+
+
+if __name__ == "__main__":
+    asyncio.run(run())
@@ -0,0 +1,63 @@
+# Benchmark de l'import/export en masse : import NDJSON envoyé en flux via
+# POST /books/bulk, comparé à un POST /books/ par livre, puis export complet.
+# Exécution : python -m benchmarks.bench_bulk [livres]   (100 000 par défaut)
+import asyncio
+import json
+import sys
+import time
+
+import httpx
+
+import main
+from benchmarks.fixtures import API_KEY, lift_rate_limit, make_book
+from routers.books import books
+from routers.users import users
+from utils.auth import create_access_token, get_password_hash
+
+SINGLE_POSTS = 2_000
+
+
+async def ndjson_body(count: int, offset: int):
+    batch = []
+    for i in range(offset, offset + count):
+        batch.append(json.dumps(make_book(i)))
+        if len(batch) == 1000:
+            yield ("\n".join(batch) + "\n").encode()
+            batch = []
+    if batch:
+        yield ("\n".join(batch) + "\n").encode()
+
+
+async def run(count: int) -> None:
+    lift_rate_limit()
+    await main.startup_event()
+    users.add({"nom": "Admin", "email": "admin@example.com", "role": "admin", "mot_de_passe": get_password_hash("MotDePasse123")})
+    headers = {"api-key": API_KEY, "Authorization": "Bearer " + create_access_token({"sub": "admin@example.com"})}
+
+    transport = httpx.ASGITransport(app=main.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+        start = time.perf_counter()
+        for i in range(SINGLE_POSTS):
+            await client.post("/books/", json=make_book(i), headers=headers)
+        single = SINGLE_POSTS / (time.perf_counter() - start)
+        print(f"POST /books/ unitaire : {single:>9.0f} livres/s")
+
+        start = time.perf_counter()
+        response = await client.post(
+            "/books/bulk", content=ndjson_body(count, SINGLE_POSTS),
+            headers={**headers, "content-type": "application/x-ndjson"},
+        )
+        elapsed = time.perf_counter() - start
+        print(f"POST /books/bulk      : {count / elapsed:>9.0f} livres/s ({response.json()['created']} créés en {elapsed:.1f}s)")
+
+        start = time.perf_counter()
+        size = 0
+        async with client.stream("GET", "/books/export", headers=headers) as stream:
+            async for chunk in stream.aiter_bytes():
+                size += len(chunk)
+        elapsed = time.perf_counter() - start
+        print(f"GET /books/export     : {len(books) / elapsed:>9.0f} livres/s ({size / 1e6:.1f} Mo en {elapsed:.1f}s)")
+
+
+if __name__ == "__main__":
+    asyncio.run(run(int(sys.argv[1]) if len(sys.argv) > 1 else 100_000))
@@ -0,0 +1,74 @@
+# Benchmark du catalogue en colonnes : filtres, tris et comptages comparés au
+# parcours des dictionnaires du dépôt, et mémoire totale d'un dépôt dont les
+# colonnes sont la seule copie de annee/genre/auteur comparée à celle d'un dépôt
+# de dictionnaires complets (avec le coût de reconstitution des livres lors d'un
+# parcours complet). Nécessite NumPy.
+# Exécution : python -m benchmarks.bench_catalogue [livres]   (1 000 000 par défaut)
+import sys
+import time
+import tracemalloc
+
+from benchmarks.fixtures import GENRES, make_book
+from utils.catalogue import CatalogueQuery, ColumnarCatalogue, ScanCatalogue
+from utils.repository import Repository
+
+QUERIES = {
+    "Fantasy 1990-2000, tri par année": dict(genre="Fantasy", annee_min=1990, annee_max=2000, sort="annee"),
+    "un auteur, tri par année desc.": dict(auteur="Auteur 7", sort="annee", descending=True),
+    "tout le catalogue, tri par auteur": dict(sort="auteur"),
+    "un genre": dict(genre="Roman"),
+}
+
+
+# Livre d'ID i + 1 ; 50 000 auteurs distincts (tri et filtre par auteur)
+def book(i: int) -> dict:
+    return make_book(i, id=i + 1, auteur=f"Auteur {i * 7919 % 50_000}")
+
+
+def timed_ms(function, repeats: int = 3) -> float:
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        function()
+        best = min(best, time.perf_counter() - start)
+    return best * 1e3
+
+
+# Mémoire allouée (octets) et durée de construction d'un dépôt
+def build(make_repository) -> tuple:
+    tracemalloc.start()
+    start = time.perf_counter()
+    repository = make_repository()
+    elapsed = time.perf_counter() - start
+    allocated = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return repository, allocated, elapsed
+
+
+def run(count: int) -> None:
+    books, dict_bytes, dict_seconds = build(lambda: Repository(initial=(book(i) for i in range(count))))
+    columnar = ColumnarCatalogue(GENRES, capacity=count)
+    stored, stored_bytes, stored_seconds = build(
+        lambda: Repository(columns=columnar, initial=(book(i) for i in range(count))))
+    print(f"{count} livres : dépôt de dictionnaires {dict_seconds:.2f}s, dépôt en colonnes {stored_seconds:.2f}s")
+    print(f"mémoire : dictionnaires complets {dict_bytes / count:.0f} octets/livre, "
+          f"dictionnaires sans annee/genre/auteur + colonnes {stored_bytes / count:.0f} octets/livre "
+          f"(dont colonnes {columnar.nbytes() / count:.0f})")
+    full = timed_ms(lambda: sum(1 for _ in books), repeats=1)
+    rebuilt = timed_ms(lambda: sum(1 for _ in stored), repeats=1)
+    print(f"{'parcours complet':<36} dictionnaires={full:>8.1f}ms reconstitués={rebuilt:>8.1f}ms")
+
+    scan = ScanCatalogue(books, GENRES)
+    for name, filters in QUERIES.items():
+        query = CatalogueQuery(**filters)
+        fast = timed_ms(lambda: columnar.query(query, limit=50))
+        slow = timed_ms(lambda: scan.query(query, limit=50), repeats=1)
+        print(f"{name:<36} colonnes={fast:>8.1f}ms parcours={slow:>9.1f}ms")
+    query = CatalogueQuery(annee_min=1990)
+    fast = timed_ms(lambda: columnar.facets(query))
+    slow = timed_ms(lambda: scan.facets(query), repeats=1)
+    print(f"{'comptages genre/décennie':<36} colonnes={fast:>8.1f}ms parcours={slow:>9.1f}ms")
+
+
+if __name__ == "__main__":
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000)
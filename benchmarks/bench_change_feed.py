@@ -0,0 +1,59 @@
+# Benchmark de la synchronisation incrémentale : octets transférés et temps de
+# réponse pour un client qui relit tout le catalogue (GET /books/?format=detailed)
+# et pour un client qui lit le journal (GET /books/changes?since=...), selon le
+# nombre de livres modifiés entre deux synchronisations.
+# Exécution : python -m benchmarks.bench_change_feed [livres]   (10 000 par défaut)
+import asyncio
+import sys
+import time
+
+import httpx
+
+import main
+from benchmarks.fixtures import HEADERS, lift_rate_limit, make_book
+from routers import books as books_router
+
+
+# Modifier des livres comme le ferait PUT /books/{book_id} (sans authentification)
+def modify(book_ids) -> None:
+    for book_id in book_ids:
+        book = {**books_router.books.get(book_id), "titre": f"Livre {book_id} (révisé)"}
+        updated = books_router.books.replace(book_id, book)
+        books_router.book_versions.bump(book_id)
+        books_router.discard_encoded_book(book_id)
+        books_router.book_changes.append("put", book_id, updated)
+
+
+async def timed_get(client: httpx.AsyncClient, url: str) -> tuple:
+    start = time.perf_counter()
+    response = await client.get(url, headers=HEADERS)
+    response.raise_for_status()
+    return len(response.content), (time.perf_counter() - start) * 1e3
+
+
+async def run(count: int) -> None:
+    lift_rate_limit()
+    await main.startup_event()
+    books_router.insert_books([make_book(i) for i in range(count)])
+
+    transport = httpx.ASGITransport(app=main.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        for changed in (1, 10, 100, 1000):
+            since = books_router.book_changes.latest
+            modify(range(4, 4 + changed))
+            full_bytes, full_ms = await timed_get(client, "/books/?format=detailed")
+            feed_bytes, feed_ms = 0, 0.0
+            has_more = True
+            while has_more:
+                start = time.perf_counter()
+                response = await client.get(f"/books/changes?since={since}", headers=HEADERS)
+                feed_ms += (time.perf_counter() - start) * 1e3
+                feed_bytes += len(response.content)
+                body = response.json()
+                since, has_more = body["next"], body["has_more"]
+            print(f"{changed:>5} modifiés : catalogue complet {full_bytes / 1024:>8.0f} Kio {full_ms:>7.1f} ms  "
+                  f"journal {feed_bytes / 1024:>8.1f} Kio {feed_ms:>7.1f} ms")
+
+
+if __name__ == "__main__":
+    asyncio.run(run(int(sys.argv[1]) if len(sys.argv) > 1 else 10_000))
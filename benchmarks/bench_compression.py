@@ -0,0 +1,81 @@
+# Benchmark de la compression des réponses : coût CPU et octets économisés par
+# algorithme et niveau sur une liste détaillée de livres, puis débit de
+# GET /books/?format=detailed selon que le corps compressé est conservé dans
+# le cache des réponses ou recompressé à chaque requête.
+# Exécution : python -m benchmarks.bench_compression [livres]   (10 000 par défaut)
+import asyncio
+import sys
+import time
+import zlib
+
+import httpx
+from pydantic_core import to_json
+
+import main
+from benchmarks.fixtures import HEADERS, lift_rate_limit, make_book
+from routers import books as books_router
+from utils.compression import CODECS, brotli, zstandard
+from utils.http_cache import ResponseCache
+
+DURATION = 3.0
+
+
+# Compresseurs à comparer : (nom, fonction) pour plusieurs niveaux
+def candidates():
+    for level in (1, 6, 9):
+        yield f"gzip-{level}", lambda data, level=level: zlib.compress(data, level)
+    if brotli is not None:
+        for quality in (1, 5, 11):
+            yield f"br-{quality}", lambda data, quality=quality: brotli.compress(data, quality=quality)
+    if zstandard is not None:
+        for level in (1, 3, 19):
+            yield f"zstd-{level}", zstandard.ZstdCompressor(level=level).compress
+
+
+def compare_codecs(body: bytes) -> None:
+    print(f"corps : {len(body) / 1024:.0f} Kio")
+    for name, compress in candidates():
+        repeats = 0
+        start = time.perf_counter()
+        while repeats < 3 or time.perf_counter() - start < 0.5:
+            compressed = compress(body)
+            repeats += 1
+        cpu_ms = (time.perf_counter() - start) / repeats * 1e3
+        saved = 1 - len(compressed) / len(body)
+        print(f"{name:<8} {cpu_ms:>8.2f} ms CPU  {len(compressed) / 1024:>8.1f} Kio  "
+              f"économie {saved:>6.1%}  ({(len(body) - len(compressed)) / 1024 / cpu_ms:>7.0f} Kio économisés/ms)")
+
+
+async def requests_per_second(client: httpx.AsyncClient, headers: dict) -> float:
+    count = 0
+    start = time.perf_counter()
+    while time.perf_counter() - start < DURATION:
+        response = await client.get("/books/?format=detailed", headers=headers)
+        response.raise_for_status()
+        count += 1
+    return count / (time.perf_counter() - start)
+
+
+async def compare_serving() -> None:
+    transport = httpx.ASGITransport(app=main.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        for encoding in CODECS:
+            headers = {**HEADERS, "Accept-Encoding": encoding}
+            results = []
+            for cache_size in (0, 1024):
+                # Sans cache, le corps est rendu et compressé à chaque requête
+                books_router.book_response_cache = ResponseCache(max_size=cache_size)
+                results.append(await requests_per_second(client, headers))
+            print(f"{encoding:<5} recompressé={results[0]:>8.1f} req/s  en cache={results[1]:>8.1f} req/s")
+
+
+async def run(count: int) -> None:
+    lift_rate_limit()
+    await main.startup_event()
+    books_router.insert_books([make_book(i) for i in range(count)])
+    compare_codecs(to_json(list(books_router.books)))
+    await compare_serving()
+
+
+if __name__ == "__main__":
+    asyncio.run(run(int(sys.argv[1]) if len(sys.argv) > 1 else 10_000))
@@ -0,0 +1,79 @@
+# Test de charge : latence de GET /books/ pendant une rafale de connexions.
+# Compare le hachage bcrypt exécuté dans la boucle d'événements (ancien
+# comportement) et dans le pool de hachage.
+# Exécution : python -m benchmarks.bench_login_storm
+import asyncio
+import statistics
+import time
+
+import httpx
+
+import main
+from benchmarks.fixtures import HEADERS, lift_rate_limit
+from utils import auth
+from utils.password_hasher import PasswordHasher, check_password, hash_password
+
+LOGINS = 40
+READ_INTERVAL = 0.005  # Une lecture toutes les 5 ms
+
+
+# Référence : bcrypt appelé directement dans la boucle d'événements
+class InlineHasher(PasswordHasher):
+    async def hash(self, password: str) -> str:
+        return hash_password(password)
+
+    async def verify(self, plain_password: str, hashed_password: str) -> bool:
+        return check_password(plain_password, hashed_password)
+
+
+# Lectures planifiées à intervalle fixe ; la latence est mesurée depuis l'heure
+# prévue de la requête, pour inclure le temps passé bloqué derrière bcrypt
+async def measure_reads(client: httpx.AsyncClient, stop: asyncio.Event) -> list:
+    latencies = []
+    origin = time.perf_counter()
+    while not stop.is_set():
+        scheduled = origin + len(latencies) * READ_INTERVAL
+        await asyncio.sleep(max(0.0, scheduled - time.perf_counter()))
+        await client.get("/books/", headers=HEADERS)
+        latencies.append((time.perf_counter() - scheduled) * 1e3)
+    return latencies
+
+
+async def storm(client: httpx.AsyncClient) -> None:
+    form = {"username": "charge@example.com", "password": "MotDePasse123"}
+    await asyncio.gather(*(client.post("/token", data=form, headers=HEADERS) for _ in range(LOGINS)))
+
+
+async def scenario(hasher: PasswordHasher) -> list:
+    auth.password_hasher = hasher
+    transport = httpx.ASGITransport(app=main.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        stop = asyncio.Event()
+        reads = asyncio.create_task(measure_reads(client, stop))
+        await storm(client)
+        stop.set()
+        latencies = await reads
+    hasher.shutdown()
+    return latencies
+
+
+def report(name: str, latencies: list) -> None:
+    latencies = sorted(latencies)
+    p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]
+    print(f"{name:<22} requêtes={len(latencies):>4} p50={statistics.median(latencies):>8.2f}ms "
+          f"p99={p99:>8.2f}ms max={latencies[-1]:>8.2f}ms")
+
+
+async def run() -> None:
+    lift_rate_limit()
+    await main.startup_event()
+    from routers.users import users
+    users.add({"nom": "Charge", "email": "charge@example.com", "role": "membre",
+               "mot_de_passe": hash_password("MotDePasse123")})
+
+    report("bcrypt dans la boucle", await scenario(InlineHasher()))
+    report("pool de hachage", await scenario(PasswordHasher(max_pending=LOGINS)))
+
+
+if __name__ == "__main__":
+    asyncio.run(run())
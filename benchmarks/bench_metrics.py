@@ -0,0 +1,86 @@
+# Benchmark du coût de l'instrumentation : surcoût par requête du middleware
+# de métriques (histogramme, statut, Server-Timing) et surcoût par appel d'une
+# dépendance instrumentée. Mesuré sur une application ASGI minimale pour
+# isoler l'instrumentation du reste de la pile. Les configurations sont mesurées
+# en alternance (meilleur temps de chacune) pour limiter l'effet des variations
+# de fréquence du processeur ; code de sortie 1 si le budget est dépassé.
+# Exécution : python -m benchmarks.bench_metrics
+import asyncio
+import sys
+import time
+
+from utils.metrics import Metrics, MetricsMiddleware, instrument
+
+REQUESTS = 20_000
+REPEATS = 15  # Meilleur temps sur plusieurs répétitions (moins sensible au bruit)
+BUDGET_US = 5.0  # Surcoût maximal accepté par requête (microsecondes)
+
+
+class Route:
+    path = "/books/{book_id}"
+
+
+# Application minimale : une dépendance instrumentée et une réponse vide
+async def dependency() -> bool:
+    return True
+
+
+instrumented_dependency = instrument("dependency")(dependency)
+
+
+def make_app(check):
+    async def app(scope, receive, send) -> None:
+        scope["route"] = Route
+        await check()
+        await send({"type": "http.response.start", "status": 200, "headers": [(b"content-length", b"0")]})
+        await send({"type": "http.response.body", "body": b""})
+    return app
+
+
+async def receive():
+    return {"type": "http.request", "body": b""}
+
+
+async def send(message) -> None:
+    pass
+
+
+# Durée par requête (µs) de chaque application, mesurées en alternance
+async def per_request_us(*apps) -> list:
+    scope = {"type": "http", "method": "GET", "path": "/books/1"}
+    best = [float("inf")] * len(apps)
+    for app in apps:
+        for _ in range(1000):  # Chauffe
+            await app(dict(scope), receive, send)
+    for _ in range(REPEATS):
+        for position, app in enumerate(apps):
+            start = time.perf_counter()
+            for _ in range(REQUESTS):
+                await app(dict(scope), receive, send)
+            best[position] = min(best[position], time.perf_counter() - start)
+    return [duration / REQUESTS * 1e6 for duration in best]
+
+
+async def run() -> bool:
+    bare, wrapped, middleware, header, quiet, both = await per_request_us(
+        make_app(dependency),
+        make_app(instrumented_dependency),
+        MetricsMiddleware(make_app(dependency), registry=Metrics(), timing_header=False),
+        MetricsMiddleware(make_app(dependency), registry=Metrics(), timing_header=True),
+        MetricsMiddleware(make_app(instrumented_dependency), registry=Metrics(), timing_header=False),
+        MetricsMiddleware(make_app(instrumented_dependency), registry=Metrics(), timing_header=True),
+    )
+
+    print(f"application nue                 {bare:>7.2f} µs/requête")
+    print(f"dépendance instrumentée         {wrapped - bare:>+7.2f} µs")
+    print(f"middleware                      {middleware - bare:>+7.2f} µs")
+    print(f"en-tête Server-Timing           {header - middleware:>+7.2f} µs")
+    print(f"total sans Server-Timing        {quiet - bare:>+7.2f} µs")
+    overhead = both - bare
+    print(f"total de l'instrumentation      {overhead:>+7.2f} µs "
+          f"({'dans le' if overhead <= BUDGET_US else 'AU-DELÀ DU'} budget de {BUDGET_US:g} µs)")
+    return overhead <= BUDGET_US
+
+
+if __name__ == "__main__":
+    sys.exit(0 if asyncio.run(run()) else 1)
@@ -0,0 +1,65 @@
+# Benchmark des modifications d'un livre : PUT /books/{book_id} (corps complet,
+# validation et réindexation de tous les champs) comparé à PATCH avec un seul
+# champ, selon que ce champ est indexé par la recherche (titre), par le
+# catalogue en colonnes (annee) ou par aucun index, avec la précondition If-Match.
+# Exécution : python -m benchmarks.bench_patch [livres]   (10 000 par défaut)
+import asyncio
+import json
+import sys
+import time
+
+import httpx
+
+import main
+from benchmarks.fixtures import GENRES, HEADERS, lift_rate_limit, make_book
+from routers import books as books_router
+from routers.users import users
+from utils.auth import create_access_token, get_password_hash
+
+DURATION = 3.0
+
+
+# Requêtes par seconde et taille moyenne du corps envoyé ; change(n) produit le
+# corps de la n-ième requête
+async def measure(client: httpx.AsyncClient, book_id: int, method: str, headers: dict, change, if_match: bool) -> tuple:
+    count, sent = 0, 0
+    etag = (await client.get(f"/books/{book_id}", headers=headers)).headers["etag"]
+    start = time.perf_counter()
+    while time.perf_counter() - start < DURATION:
+        body = json.dumps(change(count)).encode()
+        request_headers = {**headers, "content-type": "application/json"}
+        if if_match:
+            request_headers["If-Match"] = etag
+        response = await client.request(method, f"/books/{book_id}", content=body, headers=request_headers)
+        response.raise_for_status()
+        etag = response.headers["etag"]
+        count += 1
+        sent += len(body)
+    return count / (time.perf_counter() - start), sent / count
+
+
+async def run(count: int) -> None:
+    lift_rate_limit()
+    await main.startup_event()
+    books_router.insert_books([make_book(i, titre=f"Livre {i} sur les chroniques de la bibliothèque")
+                               for i in range(4, 4 + count)])
+    users.add({"nom": "Admin", "email": "admin@example.com", "role": "admin", "mot_de_passe": get_password_hash("MotDePasse123")})
+    headers = {**HEADERS, "Authorization": "Bearer " + create_access_token({"sub": "admin@example.com"})}
+    book_id = 4  # Premier livre généré (ISBN conforme au format de BookBase)
+    base = {field: value for field, value in books_router.books.get(book_id).items() if field != "id"}
+
+    scenarios = [
+        ("PUT   (corps complet)", "PUT", lambda n: {**base, "titre": f"Le Petit Prince {n}"}, False),
+        ("PATCH titre", "PATCH", lambda n: {"titre": f"Le Petit Prince {n}"}, False),
+        ("PATCH annee", "PATCH", lambda n: {"annee": 1943 + n % 2}, False),
+        ("PATCH genre (If-Match)", "PATCH", lambda n: {"genre": GENRES[n % 2]}, True),
+    ]
+    transport = httpx.ASGITransport(app=main.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        for label, method, change, if_match in scenarios:
+            rate, size = await measure(client, book_id, method, headers, change, if_match)
+            print(f"{label:<24} {rate:>8.0f} req/s  corps {size:>5.0f} octets")
+
+
+if __name__ == "__main__":
+    asyncio.run(run(int(sys.argv[1]) if len(sys.argv) > 1 else 10_000))
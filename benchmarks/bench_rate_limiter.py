@@ -0,0 +1,26 @@
+# Benchmark du limiteur de débit : coût par requête et mémoire bornée quand
+# le nombre de clés distinctes augmente.
+# Exécution : python -m benchmarks.bench_rate_limiter
+import asyncio
+import time
+
+from utils.rate_limiter import ALGORITHMS, MemoryBackend, RateLimit
+
+HITS = 200_000
+LIMIT = RateLimit(times=10, seconds=60)
+
+
+async def run() -> None:
+    print(f"{'algorithme':<16} {'clés':>8} {'latence':>10} {'clés en mémoire':>16}")
+    for algorithm in ALGORITHMS.values():
+        for keys in (1, 1_000, 100_000):
+            backend = MemoryBackend(max_keys=10_000)
+            start = time.perf_counter()
+            for i in range(HITS):
+                await backend.hit(f"cle-{i % keys}", LIMIT, algorithm)
+            elapsed = (time.perf_counter() - start) / HITS * 1e6
+            print(f"{algorithm.name:<16} {keys:>8} {elapsed:>8.2f}us {len(backend):>16}")
+
+
+if __name__ == "__main__":
+    asyncio.run(run())
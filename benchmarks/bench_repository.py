@@ -0,0 +1,43 @@
+# Benchmark du dépôt en mémoire : la latence des recherches et insertions doit
+# rester constante quand le volume de données augmente.
+# Exécution : python -m benchmarks.bench_repository
+import random
+import time
+from typing import Callable, List
+
+from benchmarks.fixtures import isbn, make_book
+from utils.repository import Repository
+
+SIZES = [1_000, 10_000, 100_000, 500_000]
+SAMPLES = 2_000
+
+
+# Mesurer la latence moyenne (en microsecondes) d'une opération
+def measure(operation: Callable[[int], object], keys: List[int]) -> float:
+    start = time.perf_counter()
+    for key in keys:
+        operation(key)
+    return (time.perf_counter() - start) / len(keys) * 1e6
+
+
+def run() -> None:
+    print(f"{'taille':>10} {'get(id)':>12} {'get_by(ISBN)':>14} {'add':>10} {'delete':>10} {'scan liste':>12}")
+    for size in SIZES:
+        repo = Repository(unique_fields=["ISBN"])
+        for i in range(size):
+            repo.add(make_book(i))
+        as_list = repo.values()  # Référence : l'ancienne implémentation par liste
+        keys = [random.randrange(1, size + 1) for _ in range(SAMPLES)]
+
+        get_us = measure(repo.get, keys)
+        isbn_us = measure(lambda k: repo.get_by("ISBN", isbn(k - 1)), keys)
+        add_us = measure(lambda k: repo.add(make_book(size + k)), list(range(SAMPLES)))
+        delete_us = measure(repo.delete, list(range(size + 1, size + SAMPLES + 1)))
+        scan_keys = keys[:50]
+        scan_us = measure(lambda k: next(b for b in as_list if b["id"] == k), scan_keys)
+
+        print(f"{size:>10} {get_us:>10.2f}us {isbn_us:>12.2f}us {add_us:>8.2f}us {delete_us:>8.2f}us {scan_us:>10.2f}us")
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,71 @@
+# Benchmark de l'index de recherche plein texte sur un grand catalogue.
+# Exécution : python -m benchmarks.bench_search [taille]   (1 000 000 par défaut)
+import random
+import sys
+import time
+
+from utils.search import SearchIndex
+
+WORDS = [
+    "prince", "château", "étoile", "océan", "forêt", "dragon", "mémoire", "été",
+    "nuit", "guerre", "paix", "rouge", "noir", "jardin", "secret", "voyage",
+    "île", "cœur", "lumière", "ombre", "roi", "reine", "ville", "montagne",
+]
+SYLLABLES = ["ba", "cha", "de", "fleu", "gre", "la", "mou", "ne", "pi", "ro", "su", "ter", "vi", "zon"]
+FIRST_NAMES = ["Antoine", "Émile", "Hélène", "George", "Joanne", "Françoise", "Albert", "Agnès"]
+LAST_NAMES = ["Zola", "Hugo", "Camus", "Orwell", "Rowling", "Sagan", "Dumas", "Verne", "Duras", "Proust"]
+QUERIES = [
+    "prin", "chateau", "etoile ocean", "drag", "emile zola", "978-2-07-00", "ha", "lumi", "eau",
+    "chaterro", "agnes sagan", "ar", "84", "hugo ro",
+]
+SAMPLES = 200
+
+
+# Vocabulaire synthétique (environ 20 000 mots) pour des fréquences réalistes
+def make_vocabulary(rng: random.Random) -> list:
+    words = set(WORDS)
+    while len(words) < 20_000:
+        words.add("".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4))))
+    return sorted(words)
+
+
+# Quelques auteurs célèbres, le reste des noms étant tiré du vocabulaire
+def surname(rng: random.Random, vocabulary: list) -> str:
+    if rng.random() < 0.01:
+        return rng.choice(LAST_NAMES)
+    return rng.choice(vocabulary).capitalize()
+
+
+def make_book(rng: random.Random, vocabulary: list, i: int) -> dict:
+    return {
+        "titre": " ".join(rng.choice(vocabulary) for _ in range(rng.randint(1, 5))).capitalize(),
+        "auteur": f"{rng.choice(FIRST_NAMES)} {surname(rng, vocabulary)}",
+        "ISBN": f"978-2-{i % 100:02d}-{i:06d}-{i % 10}",
+    }
+
+
+def run(size: int) -> None:
+    rng = random.Random(42)
+    vocabulary = make_vocabulary(rng)
+    index = SearchIndex(fields={"titre": 3, "auteur": 2, "ISBN": 1}, compact_fields=["ISBN"])
+    start = time.perf_counter()
+    for i in range(1, size + 1):
+        index.add(i, make_book(rng, vocabulary, i))
+    print(f"Indexation de {size} livres : {time.perf_counter() - start:.1f}s")
+
+    print(f"{'requête':<22} {'résultats':>10} {'latence':>12}")
+    for query in QUERIES:
+        start = time.perf_counter()
+        for _ in range(SAMPLES):
+            _, total = index.search(query, limit=20)
+        elapsed = (time.perf_counter() - start) / SAMPLES * 1e3
+        print(f"{query:<22} {total:>10} {elapsed:>10.3f}ms")
+
+    start = time.perf_counter()
+    for i in range(1, SAMPLES + 1):
+        index.add(i, make_book(rng, vocabulary, i))
+    print(f"Mise à jour incrémentale : {(time.perf_counter() - start) / SAMPLES * 1e6:.1f}us par livre")
+
+
+if __name__ == "__main__":
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000)
@@ -0,0 +1,80 @@
+# Benchmark de la sérialisation JSON.
+# - GET /users/ et GET /users/me, avec et sans FAST_JSON_RESPONSES (seules les
+#   routes des utilisateurs consultent ce drapeau) ;
+# - liste détaillée des livres : encodage jsonable_encoder + JSONResponse (chemin
+#   d'origine) comparé au JSON pré-encodé par livre (EncodedCache) qu'utilisent
+#   désormais les routes des livres, mesuré hors HTTP pour ne pas compter le
+#   cache de réponses.
+# Exécution : python -m benchmarks.bench_serialization
+import asyncio
+import json
+import time
+from typing import Callable
+
+import httpx
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+import main
+from benchmarks.fixtures import API_KEY, lift_rate_limit, make_book
+from routers.books import books, encode_books, search_index
+from routers.users import users
+from utils import serialization
+from utils.auth import create_access_token
+
+BOOKS = 5_000
+USERS = 1_000
+DURATION = 3.0
+
+
+async def requests_per_second(client: httpx.AsyncClient, url: str, headers: dict) -> float:
+    count = 0
+    start = time.perf_counter()
+    while time.perf_counter() - start < DURATION:
+        response = await client.get(url, headers=headers)
+        response.raise_for_status()
+        count += 1
+    return count / (time.perf_counter() - start)
+
+
+def calls_per_second(encode: Callable[[], bytes]) -> float:
+    count = 0
+    start = time.perf_counter()
+    while time.perf_counter() - start < DURATION:
+        encode()
+        count += 1
+    return count / (time.perf_counter() - start)
+
+
+def report(label: str, baseline: float, fast: float, unit: str) -> None:
+    print(f"{label:<26} actuel={baseline:>8.1f} {unit}  rapide={fast:>8.1f} {unit}  (x{fast / baseline:.1f})")
+
+
+async def run() -> None:
+    lift_rate_limit()
+    await main.startup_event()
+    for book in books.add_many(make_book(i) for i in range(BOOKS)):
+        search_index.add(book["id"], book)
+    for i in range(USERS):
+        users.add({"nom": f"Lecteur {i}", "email": f"lecteur{i}@example.com",
+                   "role": "admin" if i == 0 else "membre", "mot_de_passe": "x"})
+    headers = {"api-key": API_KEY, "Authorization": "Bearer " + create_access_token({"sub": "lecteur0@example.com"})}
+
+    transport = httpx.ASGITransport(app=main.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        for url in ("/users/", "/users/me"):
+            results = []
+            for fast in (False, True):
+                serialization.FAST_JSON_RESPONSES = fast
+                results.append(await requests_per_second(client, url, headers))
+            report(url, results[0], results[1], "req/s")
+
+    page = books.page()
+    assert json.loads(encode_books(page, "detailed")) == json.loads(JSONResponse(jsonable_encoder(page)).body)
+    report(f"livres détaillés ({len(page)})",
+           calls_per_second(lambda: JSONResponse(jsonable_encoder(page)).body),
+           calls_per_second(lambda: encode_books(page, "detailed")), "listes/s")
+
+
+if __name__ == "__main__":
+    asyncio.run(run())
@@ -0,0 +1,61 @@
+# Benchmark du stockage durable : débit d'écriture (écritures durables, avec
+# group commit) selon le nombre d'écrivains concurrents, et temps de
+# récupération au démarrage.
+# Exécution : python -m benchmarks.bench_storage [enregistrements]   (1 000 000 par défaut)
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+from benchmarks.fixtures import make_book
+from utils.repository import Repository
+from utils.storage import Storage
+
+WRITES = 5_000
+
+
+async def write_throughput(path: str, writers: int) -> None:
+    storage = Storage(path)
+    repo = Repository(unique_fields=["ISBN"])
+    repo.attach(storage, "books")
+
+    async def writer(offset: int) -> None:
+        for i in range(offset, WRITES, writers):
+            repo.add(make_book(i))
+            await repo.sync()  # Chaque écrivain attend que son écriture soit durable
+
+    start = time.perf_counter()
+    await asyncio.gather(*(writer(offset) for offset in range(writers)))
+    elapsed = time.perf_counter() - start
+    stats = storage.stats()
+    storage.close()
+    print(f"{writers:>4} écrivains : {WRITES / elapsed:>9.0f} écritures/s "
+          f"({stats['commits']} commits, {stats['average_batch']:.1f} opérations par lot)")
+
+
+def recovery(path: str, records: int) -> None:
+    storage = Storage(path, max_batch=10_000)
+    for i in range(1, records + 1):
+        storage.submit("books", "put", i, {**make_book(i), "id": i})
+    storage.close()
+
+    start = time.perf_counter()
+    storage = Storage(path)
+    repo = Repository(unique_fields=["ISBN"])
+    repo.attach(storage, "books")
+    elapsed = time.perf_counter() - start
+    storage.close()
+    print(f"Récupération de {len(repo)} enregistrements : {elapsed:.2f}s")
+
+
+def run(records: int) -> None:
+    with tempfile.TemporaryDirectory() as directory:
+        for writers in (1, 16, 256):
+            path = os.path.join(directory, f"debit-{writers}.db")
+            asyncio.run(write_throughput(path, writers))
+        recovery(os.path.join(directory, "recuperation.db"), records)
+
+
+if __name__ == "__main__":
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000)
@@ -0,0 +1,39 @@
+# Données communes aux benchmarks : clé API de test, ISBN uniques et livres
+# synthétiques conformes à BookBase, levée de la limite de débit de la clé.
+# Ce module n'importe pas l'application : load.py l'utilise hors processus.
+import random
+from typing import Optional
+
+API_KEY = "my-secret-key"
+HEADERS = {"api-key": API_KEY}
+GENRES = ["Science-fiction", "Fantasy", "Roman", "Conte", "Thriller", "Autre"]
+WORDS = ["jardin", "nuit", "mer", "voyage", "ombre", "roi", "lumière", "guerre", "paix", "hiver",
+         "silence", "étoile", "château", "rivière", "secret", "mémoire", "forêt", "cendre", "ville", "printemps"]
+
+
+# ISBN unique et conforme au format attendu (978-d-ddd-ddddd-d)
+def isbn(i: int) -> str:
+    return f"978-{i // 10**9 % 10}-{i // 10**6 % 1000:03d}-{i // 10 % 100000:05d}-{i % 10}"
+
+
+# Livre d'indice i : valeurs déterministes, ou tirées de rng (titre de trois
+# mots de WORDS) ; fields remplace certains champs
+def make_book(i: int, rng: Optional[random.Random] = None, **fields) -> dict:
+    if rng is None:
+        book = {"titre": f"Livre {i}", "auteur": f"Auteur {i * 7919 % 5000}", "ISBN": isbn(i),
+                "annee": 1901 + i * 31 % 120, "genre": GENRES[i % len(GENRES)]}
+    else:
+        book = {"titre": " ".join(rng.choice(WORDS) for _ in range(3)).capitalize(),
+                "auteur": f"Auteur {rng.randrange(500)}", "ISBN": isbn(i),
+                "annee": rng.randint(1901, 2020), "genre": rng.choice(GENRES)}
+    book.update(fields)
+    return book
+
+
+# Lever la limite de débit de la clé de test (sinon 10 requêtes par minute) ;
+# import différé, seuls les benchmarks en processus chargent l'application
+def lift_rate_limit() -> None:
+    from utils.dependencies import limiter
+    from utils.rate_limiter import RateLimit
+
+    limiter.set_key_limit(API_KEY, RateLimit(times=10**9, seconds=60))
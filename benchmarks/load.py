@@ -0,0 +1,306 @@
+# Suite de tests de charge reproductible : un mélange réaliste de requêtes
+# (connexion, liste, recherche, lecture par ID, création, mise à jour,
+# suppression) exécuté par N clients concurrents, soit directement sur
+# l'application ASGI (en processus), soit sur un serveur uvicorn local.
+# Les résultats (débit, latences p50/p95/p99 par opération) sont enregistrés en
+# JSON ; la commande "compare" échoue si un run régresse au-delà d'un seuil.
+#
+# Exécution :
+#   python -m benchmarks.load run --books 10000 --concurrency 32 --duration 20 --output base.json
+#   python -m benchmarks.load run --target uvicorn --mix read --output uvicorn.json
+#   python -m benchmarks.load compare base.json current.json --threshold 0.15
+import argparse
+import asyncio
+import datetime
+import json
+import os
+import platform
+import random
+import socket
+import subprocess
+import sys
+import time
+from typing import Any, Dict, List, Optional
+
+import httpx
+
+from benchmarks.fixtures import HEADERS, WORDS, make_book
+
+ADMIN = {"username": "admin.charge@example.com", "password": "MotDePasse123"}
+MEMBERS = 8  # Comptes utilisés par l'opération "login"
+
+# Poids des opérations de chaque mélange
+MIXES = {
+    "mixed": {"login": 1, "list": 30, "search": 25, "get": 30, "create": 6, "update": 5, "delete": 3},
+    "read": {"list": 35, "search": 30, "get": 35},
+    "write": {"create": 50, "update": 35, "delete": 15},
+    "login": {"login": 1},
+}
+
+
+# Percentile par rang le plus proche (latences triées)
+def percentile(latencies: List[float], fraction: float) -> float:
+    if not latencies:
+        return 0.0
+    return latencies[min(len(latencies) - 1, int(len(latencies) * fraction))]
+
+
+def summarize(latencies: List[float], errors: int, elapsed: float) -> Dict[str, Any]:
+    latencies = sorted(latencies)
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "throughput": len(latencies) / elapsed if elapsed else 0.0,
+        "mean_ms": sum(latencies) / len(latencies) if latencies else 0.0,
+        "p50_ms": percentile(latencies, 0.50),
+        "p95_ms": percentile(latencies, 0.95),
+        "p99_ms": percentile(latencies, 0.99),
+        "max_ms": latencies[-1] if latencies else 0.0,
+    }
+
+
+# État partagé par les clients : livres existants et compteur d'ISBN
+class Workload:
+    def __init__(self, books: int, seed: int):
+        self.seed = seed
+        self.book_ids: List[int] = []
+        self.next_isbn = books
+        self.admin_headers: Dict[str, str] = {}
+
+    async def seed_catalogue(self, client: httpx.AsyncClient, books: int) -> None:
+        rng = random.Random(self.seed)
+        headers = HEADERS
+        # Compte administrateur (création, mise à jour et suppression) et comptes membres (connexion)
+        await client.post("/users/", headers=headers, json={
+            "nom": "Admin", "email": ADMIN["username"], "mot_de_passe": ADMIN["password"], "role": "admin"})
+        for i in range(MEMBERS):
+            await client.post("/users/", headers=headers, json={
+                "nom": f"Membre {i}", "email": f"membre{i}.charge@example.com", "mot_de_passe": ADMIN["password"]})
+        token = (await client.post("/token", headers=headers, data=ADMIN)).json()["access_token"]
+        self.admin_headers = {**headers, "Authorization": f"Bearer {token}"}
+
+        body = "".join(json.dumps(make_book(i, rng)) + "\n" for i in range(books)).encode()
+        response = await client.post("/books/bulk", headers={**self.admin_headers, "content-type": "application/x-ndjson"},
+                                     content=body, timeout=None)
+        response.raise_for_status()
+        response = await client.get("/books/export", headers=headers, timeout=None)
+        self.book_ids = [json.loads(line)["id"] for line in response.text.splitlines() if line]
+
+    # Exécuter une opération ; retourne True si la réponse est celle attendue
+    async def execute(self, client: httpx.AsyncClient, operation: str, rng: random.Random) -> bool:
+        headers = self.admin_headers
+        if operation == "login":
+            form = {"username": f"membre{rng.randrange(MEMBERS)}.charge@example.com", "password": ADMIN["password"]}
+            response = await client.post("/token", headers=HEADERS, data=form)
+        elif operation == "list":
+            after_id = rng.choice(self.book_ids) if self.book_ids else 0
+            response = await client.get("/books/", headers=headers,
+                                        params={"format": "detailed", "limit": 50, "after_id": after_id})
+        elif operation == "search":
+            response = await client.get("/books/search", headers=headers, params={"q": rng.choice(WORDS)})
+        elif operation == "get":
+            response = await client.get(f"/books/{rng.choice(self.book_ids)}", headers=headers)
+            return response.status_code in (200, 404)  # Le livre a pu être supprimé entre-temps
+        elif operation == "create":
+            self.next_isbn += 1
+            response = await client.post("/books/", headers=headers, json=make_book(self.next_isbn, rng))
+            if response.status_code == 201:
+                self.book_ids.append(response.json()["id"])
+        elif operation == "update":
+            book_id = rng.choice(self.book_ids)
+            self.next_isbn += 1
+            response = await client.put(f"/books/{book_id}", headers=headers, json=make_book(self.next_isbn, rng))
+            return response.status_code in (200, 404)
+        elif operation == "delete":
+            if len(self.book_ids) < 2:
+                return True
+            book_id = self.book_ids.pop(rng.randrange(len(self.book_ids)))
+            response = await client.delete(f"/books/{book_id}", headers=headers)
+        else:
+            raise ValueError(f"Opération inconnue : {operation}")
+        return response.status_code < 400
+
+
+# Boucle d'un client : enchaîne les opérations tirées selon le mélange jusqu'à
+# l'échéance ; les mesures ne commencent qu'après la période de chauffe
+async def client_loop(workload: Workload, client: httpx.AsyncClient, mix: Dict[str, int], worker: int,
+                      measure_from: float, deadline: float, results: Dict[str, Dict[str, Any]]) -> None:
+    rng = random.Random(workload.seed * 1000 + worker)
+    operations, weights = list(mix), list(mix.values())
+    while time.perf_counter() < deadline:
+        operation = rng.choices(operations, weights)[0]
+        start = time.perf_counter()
+        try:
+            ok = await workload.execute(client, operation, rng)
+        except httpx.HTTPError:
+            ok = False
+        end = time.perf_counter()
+        if start >= measure_from:
+            entry = results.setdefault(operation, {"latencies": [], "errors": 0})
+            entry["latencies"].append((end - start) * 1e3)
+            entry["errors"] += not ok
+
+
+async def drive(client: httpx.AsyncClient, args: argparse.Namespace) -> Dict[str, Any]:
+    workload = Workload(args.books, args.seed)
+    await workload.seed_catalogue(client, args.books)
+
+    results: Dict[str, Dict[str, Any]] = {}
+    start = time.perf_counter()
+    measure_from = start + args.warmup
+    deadline = measure_from + args.duration
+    await asyncio.gather(*(
+        client_loop(workload, client, MIXES[args.mix], worker, measure_from, deadline, results)
+        for worker in range(args.concurrency)
+    ))
+    elapsed = time.perf_counter() - measure_from
+
+    operations = {name: summarize(entry["latencies"], entry["errors"], elapsed) for name, entry in sorted(results.items())}
+    all_latencies = [latency for entry in results.values() for latency in entry["latencies"]]
+    total_errors = sum(entry["errors"] for entry in results.values())
+    return {"total": summarize(all_latencies, total_errors, elapsed), "operations": operations}
+
+
+async def run_in_process(args: argparse.Namespace) -> Dict[str, Any]:
+    from benchmarks.load_server import app
+    import main
+
+    await main.startup_event()
+    try:
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            return await drive(client, args)
+    finally:
+        await main.shutdown_event()
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+# Lancer uvicorn dans un sous-processus et attendre qu'il réponde
+async def run_uvicorn(args: argparse.Namespace) -> Dict[str, Any]:
+    port = args.port or free_port()
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "benchmarks.load_server:app", "--host", "127.0.0.1",
+         "--port", str(port), "--workers", "1", "--log-level", "warning", "--no-access-log"],
+        cwd=root,
+    )
+    base_url = f"http://127.0.0.1:{port}"
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    try:
+        async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60) as client:
+            for _ in range(100):
+                try:
+                    await client.get("/", headers=HEADERS)
+                    break
+                except httpx.TransportError:
+                    await asyncio.sleep(0.1)
+            else:
+                raise RuntimeError("uvicorn n'a pas démarré")
+            return await drive(client, args)
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def git_revision() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def print_report(report: Dict[str, Any]) -> None:
+    rows = [*report["operations"].items(), ("total", report["total"])]
+    for name, stats in rows:
+        print(f"{name:<8} requêtes={stats['requests']:>7} erreurs={stats['errors']:>4} "
+              f"débit={stats['throughput']:>8.1f}/s p50={stats['p50_ms']:>8.2f}ms "
+              f"p95={stats['p95_ms']:>8.2f}ms p99={stats['p99_ms']:>8.2f}ms")
+
+
+def run(args: argparse.Namespace) -> int:
+    runner = run_uvicorn if args.target == "uvicorn" else run_in_process
+    results = asyncio.run(runner(args))
+    report = {
+        "config": {key: getattr(args, key) for key in ("target", "mix", "books", "concurrency", "duration", "warmup", "seed")},
+        "environment": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "git_revision": git_revision(),
+            "date": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+        },
+        **results,
+    }
+    print_report(report)
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump(report, file, indent=2)
+    return 0
+
+
+# Comparer deux runs : une latence qui augmente ou un débit qui baisse de plus
+# de "threshold" (fraction relative) est une régression
+def compare(args: argparse.Namespace) -> int:
+    with open(args.baseline) as file:
+        baseline = json.load(file)
+    with open(args.current) as file:
+        current = json.load(file)
+    if baseline["config"] != current["config"]:
+        print("Attention : configurations différentes", baseline["config"], current["config"])
+
+    metrics = args.metrics.split(",")
+    regressions = []
+    sections = [("total", baseline["total"], current["total"])]
+    sections += [(name, stats, current["operations"][name])
+                 for name, stats in baseline["operations"].items() if name in current["operations"]]
+    for name, before, after in sections:
+        for metric in metrics:
+            old, new = before[metric], after[metric]
+            if not old:
+                continue
+            # Variation dans le sens défavorable : hausse de latence ou baisse de débit
+            change = (old - new) / old if metric == "throughput" else (new - old) / old
+            flag = "RÉGRESSION" if change > args.threshold else ""
+            print(f"{name:<8} {metric:<10} {old:>10.2f} -> {new:>10.2f} ({change:+.1%}) {flag}")
+            if flag:
+                regressions.append((name, metric))
+    if regressions:
+        print(f"{len(regressions)} régression(s) au-delà de {args.threshold:.0%}")
+        return 1
+    return 0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Tests de charge de l'API bibliothèque")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="Exécuter un test de charge")
+    run_parser.add_argument("--target", choices=["inprocess", "uvicorn"], default="inprocess")
+    run_parser.add_argument("--mix", choices=sorted(MIXES), default="mixed")
+    run_parser.add_argument("--books", type=int, default=10_000, help="Taille du catalogue")
+    run_parser.add_argument("--concurrency", type=int, default=32, help="Nombre de clients concurrents")
+    run_parser.add_argument("--duration", type=float, default=20.0, help="Durée mesurée (secondes)")
+    run_parser.add_argument("--warmup", type=float, default=2.0, help="Chauffe non mesurée (secondes)")
+    run_parser.add_argument("--seed", type=int, default=42)
+    run_parser.add_argument("--port", type=int, default=0, help="Port uvicorn (libre par défaut)")
+    run_parser.add_argument("--output", help="Fichier JSON des résultats")
+    run_parser.set_defaults(handler=run)
+
+    compare_parser = commands.add_parser("compare", help="Comparer deux runs et détecter les régressions")
+    compare_parser.add_argument("baseline")
+    compare_parser.add_argument("current")
+    compare_parser.add_argument("--threshold", type=float, default=0.10, help="Variation relative tolérée")
+    compare_parser.add_argument("--metrics", default="throughput,p95_ms,p99_ms")
+    compare_parser.set_defaults(handler=compare)
+
+    args = parser.parse_args()
+    return args.handler(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,9 @@
+# Application servie pendant les tests de charge : l'API normale, avec la
+# limite de débit levée pour la clé API de test (sinon 10 requêtes par minute).
+# Exécution : uvicorn benchmarks.load_server:app
+import main
+from benchmarks.fixtures import lift_rate_limit
+
+lift_rate_limit()
+
+app = main.app
@@ -1,44 +1,170 @@
-from fastapi import FastAPI, Depends, HTTPException, status
+from fastapi import APIRouter, FastAPI, Depends, HTTPException, status
+from fastapi.responses import PlainTextResponse
 from fastapi.security import OAuth2PasswordRequestForm
 from routers import books, users  # Importation des routeurs pour les livres et les utilisateurs
-from utils.dependencies import rate_limit  # Dépendance pour limiter le taux de requêtes
-from utils.auth import authenticate_user, create_access_token, Token, set_users_reference
+from utils.dependencies import rate_limit, limiter, verify_api_key, RATE_LIMIT_REDIS_URL  # Dépendance pour limiter le taux de requêtes
+from utils.rate_limiter import RedisBackend
+from utils.storage import Storage
+from utils.metrics import METRICS_ENABLED, MetricsMiddleware, metrics
+from utils.compression import COMPRESSION_ENABLED, CompressionMiddleware
+from utils.admission import AdmissionClass, AdmissionController, AdmissionMiddleware
+from utils.auth import authenticate_user, create_access_token, Token, set_users_reference, password_hasher, token_cache
 from datetime import timedelta
 from utils.auth import ACCESS_TOKEN_EXPIRE_MINUTES
+import os
+
+# Chemin de la base SQLite pour la persistance (données en mémoire uniquement si absent).
+# Une base ne peut être ouverte que par un seul processus (voir utils/storage.py) :
+# avec plusieurs workers, le démarrage du second échoue avec StorageLockedError
+STORAGE_PATH = os.environ.get("STORAGE_PATH")
+storage = None
+
+# Contrôle d'admission : nombre de requêtes traitées simultanément et classes
+# de priorité (lectures peu coûteuses d'abord, bcrypt et imports en masse ensuite)
+ADMISSION_ENABLED = os.environ.get("ADMISSION_ENABLED", "1") == "1"
+ADMISSION_CAPACITY = int(os.environ.get("ADMISSION_CAPACITY", "256"))
+# Par défaut, autant de connexions simultanées que de workers de hachage
+ADMISSION_LOGIN_CONCURRENCY = int(os.environ.get("ADMISSION_LOGIN_CONCURRENCY", "0")) or password_hasher.max_workers
+admission = AdmissionController(
+    classes=[
+        AdmissionClass("read", priority=0, concurrency=ADMISSION_CAPACITY, max_queue=1024, max_wait=1.0),
+        AdmissionClass("default", priority=1, concurrency=ADMISSION_CAPACITY // 2, max_queue=256, max_wait=2.0),
+        AdmissionClass("login", priority=2, concurrency=ADMISSION_LOGIN_CONCURRENCY, max_queue=32, max_wait=1.0),
+        AdmissionClass("bulk", priority=3, concurrency=2, max_queue=8, max_wait=5.0),
+    ],
+    capacity=ADMISSION_CAPACITY,
+    rules={
+        "GET /": "read",
+        "GET /books/": "read",
+        "GET /books/search": "read",
+        "GET /books/facets": "read",
+        "GET /books/changes": "read",
+        "GET /books/export": "bulk",
+        "GET /books/{book_id}": "read",
+        "GET /users/me": "read",
+        "POST /token": "login",  # Vérification bcrypt
+        "POST /users/": "login",  # Hachage bcrypt
+        "PATCH /users/{user_id}": "login",  # Hachage bcrypt si mot_de_passe est modifié
+        "POST /books/bulk": "bulk",
+        "POST /users/bulk": "bulk",
+        "GET /users/export": "bulk",
+    },
+    exempt=["GET /books/changes/stream"],  # Abonnement SSE : ouvert pendant toute la session du client
+    enabled=ADMISSION_ENABLED,
+)
 
 # Création de l'application FastAPI avec des métadonnées (titre, description, version)
 app = FastAPI(
     title="Bibliothèque API",  # Titre de l'API
     description="API de gestion de bibliothèque",  # Description de l'API
     version="0.1.0",  # Version de l'API
-    dependencies=[Depends(rate_limit)]  # Dépendance globale pour limiter le taux de requêtes
 )
 
+# Limitation du taux de requêtes, appliquée à toutes les routes de l'API sauf
+# aux routes de supervision (voir monitoring)
+RATE_LIMITED = [Depends(rate_limit)]
+
+# Compression des réponses selon Accept-Encoding (gzip, et brotli/zstd si installés)
+if COMPRESSION_ENABLED:
+    app.add_middleware(CompressionMiddleware)
+
+# Admission (et rejet rapide en 503) avant tout traitement de la requête
+app.add_middleware(AdmissionMiddleware, controller=admission)
+
+# Mesure des latences par route et par dépendance (voir /metrics et l'en-tête Server-Timing)
+if METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)
+
 # Inclusion des routeurs pour gérer les routes liées aux livres et aux utilisateurs
-app.include_router(books.router)  # Routeur pour les livres
-app.include_router(users.router)  # Routeur pour les utilisateurs
+app.include_router(books.router, dependencies=RATE_LIMITED)  # Routeur pour les livres
+app.include_router(users.router, dependencies=RATE_LIMITED)  # Routeur pour les utilisateurs
 
 # Événement de démarrage de l'application (exécuté au lancement de l'API)
 @app.on_event("startup")
 async def startup_event():
+    global storage
     # Importation de la liste des utilisateurs pour éviter les problèmes d'importation circulaire
-    from routers.users import users
+    from routers.users import users, open_storage as open_users_storage
+
+    # Chargement des données persistées (avant toute requête)
+    if STORAGE_PATH:
+        storage = Storage(STORAGE_PATH)
+        books.open_storage(storage)
+        open_users_storage(storage)
+
     set_users_reference(users)  # Initialisation de la référence des utilisateurs
 
+    # Limitation de débit partagée entre les workers si Redis est configuré
+    if RATE_LIMIT_REDIS_URL:
+        import redis.asyncio as redis
+        from fastapi_limiter import FastAPILimiter
+        connection = redis.from_url(RATE_LIMIT_REDIS_URL)
+        await FastAPILimiter.init(connection)
+        limiter.backend = RedisBackend(connection, prefix=FastAPILimiter.prefix)
+
+# Événement d'arrêt de l'application (pool de hachage, stockage, connexion Redis)
+@app.on_event("shutdown")
+async def shutdown_event():
+    password_hasher.shutdown()  # Arrêt du pool de hachage des mots de passe
+    if storage is not None:
+        storage.close()  # Validation des écritures en attente
+    if RATE_LIMIT_REDIS_URL:
+        from fastapi_limiter import FastAPILimiter
+        await FastAPILimiter.close()
+
 # Route de base pour vérifier que l'API fonctionne
-@app.get("/")
+@app.get("/", dependencies=RATE_LIMITED)
 async def root():
     # Retourne un message de bienvenue
     return {"message": "Bienvenue sur l'API de gestion de bibliothèque"}
 
+# Routes de supervision (métriques et statistiques), hors limitation du taux de
+# requêtes : un collecteur ne consomme pas le quota de la clé API des clients.
+# /metrics ne demande pas de clé API (collecteurs Prometheus)
+monitoring = APIRouter(tags=["monitoring"])
+stats = APIRouter(prefix="/stats", tags=["monitoring"], dependencies=[Depends(verify_api_key)])
+
+# Route pour consulter l'utilisation du pool de hachage des mots de passe
+@stats.get("/password-hashing")
+async def password_hashing_stats():
+    return password_hasher.stats()
+
+# Route pour consulter les statistiques du cache des tokens vérifiés
+@stats.get("/token-cache")
+async def token_cache_stats():
+    return token_cache.stats()
+
+# Route pour consulter les statistiques du cache des réponses du catalogue
+@stats.get("/response-cache")
+async def response_cache_stats():
+    return books.book_response_cache.stats()
+
+# Route pour consulter l'état du journal des modifications du catalogue
+@stats.get("/change-log")
+async def change_log_stats():
+    return books.book_changes.stats()
+
+# Route exposant les métriques au format texte Prometheus
+@monitoring.get("/metrics", response_class=PlainTextResponse)
+async def prometheus_metrics():
+    return metrics.render()
+
+# Route pour consulter l'état du contrôle d'admission
+@stats.get("/admission")
+async def admission_stats():
+    return admission.stats()
+
+app.include_router(monitoring)
+app.include_router(stats)
+
 # Route pour générer un token d'accès (authentification des utilisateurs)
-@app.post("/token", response_model=Token)
+@app.post("/token", response_model=Token, dependencies=RATE_LIMITED)
 async def login_for_access_token(form_data: OAuth2PasswordRequestForm = Depends()):
     # Importation de la liste des utilisateurs
     from routers.users import users
     
     # Authentification de l'utilisateur avec son nom d'utilisateur et son mot de passe
-    user = authenticate_user(users, form_data.username, form_data.password)
+    user = await authenticate_user(users, form_data.username, form_data.password)
     if not user:
         # Si l'utilisateur n'est pas authentifié, une exception HTTP 401 est levée
         raise HTTPException(
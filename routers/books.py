@@ -1,10 +1,22 @@
-from fastapi import APIRouter, Query, Path, HTTPException, status, Depends
+from fastapi import APIRouter, Query, Path, HTTPException, status, Depends, Request, Response, Header, WebSocket, WebSocketDisconnect
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, field_validator, Field
+from pydantic_core import to_json
 from typing import Optional, List
 from enum import Enum
 import datetime
 from utils.dependencies import verify_api_key
 from utils.auth import get_current_user, check_admin_role, UserInDB
+from utils.repository import Repository, DuplicateKeyError
+from utils.search import SearchIndex
+from utils.catalogue import SORT_KEYS, CatalogueQuery, build_catalogue, build_columns
+from utils.streaming import (NDJSON_MEDIA_TYPE, CSV_MEDIA_TYPE, SSE_MEDIA_TYPE, SSE_KEEPALIVE, wants_ndjson,
+                             iter_ndjson, iter_csv, sse_event)
+from utils.serialization import EncodedCache, RawJSONResponse
+from utils.http_cache import RenderedResponse, ResourceVersions, ResponseCache, check_if_match
+from utils.change_log import ChangeLog, ResyncRequired
+from utils.storage import OP_PUT, OP_DELETE
+from utils.bulk import BatchValidator, ImportReport, MODE_ATOMIC, MODE_PARTIAL, iter_batches, iter_records, row_error
 
 # Création d'un routeur pour les livres avec un préfixe et des tags
 router = APIRouter(
@@ -13,13 +25,6 @@ router = APIRouter(
     responses={404: {"description": "Livre non trouvé"}}  # Gestion de la réponse 404
 )
 
-# Liste fictive pour stocker les livres (simulation d'une base de données)
-books = [
-    {"id": 1, "titre": "Le Petit Prince", "auteur": "Antoine de Saint-Exupéry", "ISBN": "978-2-07-040850-4", "annee": 1943, "genre": "Conte"},
-    {"id": 2, "titre": "Harry Potter", "auteur": "J.K. Rowling", "ISBN": "978-0-7475-3269-9", "annee": 1997, "genre": "Fantasy"},
-    {"id": 3, "titre": "1984", "auteur": "George Orwell", "ISBN": "978-0-14-103614-4", "annee": 1949, "genre": "Science-fiction"}
-]
-
 # Enumération pour représenter différents genres de livres
 class GenreEnum(str, Enum):
     SF = "Science-fiction"
@@ -29,6 +34,40 @@ class GenreEnum(str, Enum):
     THRILLER = "Thriller"
     AUTRE = "Autre"
 
+GENRES = [genre.value for genre in GenreEnum]
+
+# Colonnes du catalogue (année, genre et auteur) : seule copie de ces champs, le
+# dépôt reconstitue les livres complets à chaque lecture
+book_columns = build_columns(GENRES)
+
+# Dépôt en mémoire des livres (simulation d'une base de données), indexé par ID et par ISBN
+books = Repository(unique_fields=["ISBN"], columns=book_columns, initial=[
+    {"id": 1, "titre": "Le Petit Prince", "auteur": "Antoine de Saint-Exupéry", "ISBN": "978-2-07-040850-4", "annee": 1943, "genre": "Conte"},
+    {"id": 2, "titre": "Harry Potter", "auteur": "J.K. Rowling", "ISBN": "978-0-7475-3269-9", "annee": 1997, "genre": "Fantasy"},
+    {"id": 3, "titre": "1984", "auteur": "George Orwell", "ISBN": "978-0-14-103614-4", "annee": 1949, "genre": "Science-fiction"}
+])
+
+# Construire l'index de recherche plein texte (titre, auteur, ISBN)
+def build_search_index() -> SearchIndex:
+    index = SearchIndex(fields={"titre": 3, "auteur": 2, "ISBN": 1}, compact_fields=["ISBN"])
+    for book in books:
+        index.add(book["id"], book)
+    return index
+
+# Index de recherche mis à jour à chaque écriture
+search_index = build_search_index()
+
+# Charger les livres depuis le stockage durable (au démarrage) et reconstruire
+# l'index de recherche (les colonnes du catalogue sont rechargées par le dépôt)
+def open_storage(storage):
+    global search_index
+    books.attach(storage, "books")
+    search_index = build_search_index()
+
+# Catalogue (filtres, tris et comptages par genre et par décennie) : les colonnes
+# du dépôt, ou un parcours du dépôt si NumPy n'est pas installé
+catalogue = build_catalogue(books, GENRES)
+
 # Modèle Pydantic de base pour la validation des livres
 class BookBase(BaseModel):
     titre: str
@@ -48,62 +87,365 @@ class BookBase(BaseModel):
 class Book(BookBase):
     id: int
 
+# Modèle pour la modification partielle d'un livre : seuls les champs envoyés
+# sont validés (mêmes contraintes que BookBase) ; annee et genre acceptent null
+class BookPatch(BaseModel):
+    titre: Optional[str] = None
+    auteur: Optional[str] = None
+    ISBN: Optional[str] = Field(None, pattern=r'^\d{3}-\d-\d{3}-\d{5}-\d$')
+    annee: Optional[int] = Field(None, gt=1900, le=datetime.datetime.now().year)
+    genre: Optional[GenreEnum] = None
+
+    # Les champs obligatoires d'un livre ne peuvent pas être effacés
+    @field_validator('titre', 'auteur', 'ISBN')
+    def validate_required(cls, v):
+        if v is None:
+            raise ValueError("Champ obligatoire")
+        return v
+
+    @field_validator('ISBN')
+    def validate_isbn(cls, v):
+        return BookBase.validate_isbn(v)
+
+# JSON pré-encodé de chaque livre (format détaillé et format simple), valide tant
+# que l'enregistrement du dépôt n'est pas remplacé
+book_json_cache = EncodedCache(source=books.record)
+book_summary_json_cache = EncodedCache(lambda book: to_json({"id": book["id"], "titre": book["titre"]}), source=books.record)
+
+# Versions du catalogue (ETag) et cache des réponses rendues
+book_versions = ResourceVersions("books")
+book_response_cache = ResponseCache()
+
+# Journal des modifications du catalogue (synchronisation incrémentale des clients)
+book_changes = ChangeLog()
+CHANGES_KEEPALIVE = 15.0  # Délai entre deux messages de maintien des abonnements (secondes)
+
+# Validation par lots pour l'import en masse
+book_batch_validator = BatchValidator(BookBase)
+BOOK_FIELDS = ["id", "titre", "auteur", "ISBN", "annee", "genre"]
+
 # Fonction de dépendance pour récupérer un livre par son ID
 def get_book_by_id(book_id: int):
-    for book in books:
-        if book["id"] == book_id:
-            return book
-    raise HTTPException(status_code=404, detail="Livre non trouvé")
+    book = books.get(book_id)
+    if book is None:
+        raise HTTPException(status_code=404, detail="Livre non trouvé")
+    return book
 
-# Route pour récupérer tous les livres
-@router.get("/", response_model=List[dict])
-async def get_books(format: Optional[str] = Query("simple", enum=["simple", "detailed"])):
+# Représentation d'un livre selon le format demandé
+def format_book(book: dict, format: Optional[str]) -> dict:
     if format == "simple":
-        return [{"id": book["id"], "titre": book["titre"]} for book in books]  # Retourne ID et titre uniquement
-    else:
-        return books  # Retourne tous les détails
+        return {"id": book["id"], "titre": book["titre"]}  # ID et titre uniquement
+    return book  # Tous les détails
+
+# Encoder une liste de livres en JSON à partir du cache (chemin rapide)
+def encode_books(rows, format: Optional[str]) -> bytes:
+    cache = book_summary_json_cache if format == "simple" else book_json_cache
+    return cache.encode_list(rows)
 
-# Route pour rechercher des livres par titre
+# Invalider le JSON en cache d'un livre modifié ou supprimé
+def discard_encoded_book(book_id: int):
+    book_json_cache.discard(book_id)
+    book_summary_json_cache.discard(book_id)
+
+# Lire le journal des modifications ; 410 si la séquence demandée a été
+# compactée (le client doit recharger le catalogue via /books/export)
+def read_changes(since: int, limit: Optional[int] = None):
+    try:
+        return book_changes.since(since, limit)
+    except ResyncRequired as e:
+        raise HTTPException(status_code=410, detail=resync_detail(e))
+
+def resync_detail(e: ResyncRequired) -> dict:
+    return {"message": "resync required", "oldest": e.oldest, "latest": e.latest}
+
+# Séquence de départ d'un abonnement : paramètre since, sinon Last-Event-ID
+# (reconnexion SSE), sinon la dernière séquence (modifications à venir seulement)
+def subscription_start(since: Optional[int], last_event_id: Optional[str] = None) -> int:
+    if since is not None:
+        return since
+    if last_event_id is not None and last_event_id.strip().isdigit():
+        return int(last_event_id)
+    return book_changes.latest
+
+# Filtres communs à la liste des livres et aux comptages
+def catalogue_query(
+    genre: Optional[GenreEnum] = Query(None, description="Genre exact"),
+    auteur: Optional[str] = Query(None, description="Auteur exact"),
+    annee_min: Optional[int] = Query(None, description="Année minimale (incluse)"),
+    annee_max: Optional[int] = Query(None, description="Année maximale (incluse)"),
+) -> CatalogueQuery:
+    return CatalogueQuery(genre=genre.value if genre is not None else None, auteur=auteur,
+                          annee_min=annee_min, annee_max=annee_max)
+
+# Route pour récupérer les livres, avec pagination par curseur (limit, after_id)
+# et export en flux NDJSON si le client envoie "Accept: application/x-ndjson".
+# Avec des filtres (genre, auteur, années) ou un tri, la liste est calculée par
+# le catalogue en colonnes et paginée par limit/offset (X-Total-Count)
+@router.get("/", response_model=List[dict])
+async def get_books(
+    request: Request,
+    format: Optional[str] = Query("simple", enum=["simple", "detailed"]),
+    limit: Optional[int] = Query(None, ge=1, le=1000, description="Nombre maximal de livres"),
+    after_id: Optional[int] = Query(None, ge=0, description="Curseur : ID du dernier livre reçu"),
+    offset: int = Query(0, ge=0, description="Nombre de livres à ignorer (requêtes filtrées ou triées)"),
+    sort: Optional[str] = Query(None, enum=list(SORT_KEYS), description="Clé de tri"),
+    order: str = Query("asc", enum=["asc", "desc"], description="Ordre du tri"),
+    query: CatalogueQuery = Depends(catalogue_query),
+):
+    filtered = (sort is not None or offset or order == "desc" or query.genre is not None or query.auteur is not None
+                or query.annee_min is not None or query.annee_max is not None)
+    if filtered:
+        return get_filtered_books(request, query, format, limit, after_id, offset, sort or "id", order == "desc")
+
+    if wants_ndjson(request):
+        rows = (format_book(book, format) for book in books.iter_from(after_id, limit))
+        return StreamingResponse(iter_ndjson(rows), media_type=NDJSON_MEDIA_TYPE)
+
+    def render() -> RenderedResponse:
+        page = books.page(after_id, limit)
+        headers = {}
+        if limit is not None and len(page) == limit:
+            # Lien vers la page suivante
+            next_url = request.url.include_query_params(after_id=page[-1]["id"])
+            headers["Link"] = f'<{next_url}>; rel="next"'
+        return RenderedResponse(encode_books(page, format), headers)
+
+    return book_response_cache.respond(request, book_versions.collection_etag(), render)
+
+# Liste filtrée et triée par le catalogue en colonnes
+def get_filtered_books(request: Request, query: CatalogueQuery, format: Optional[str], limit: Optional[int],
+                       after_id: Optional[int], offset: int, sort: str, descending: bool):
+    query.sort = sort
+    query.descending = descending
+    # Le curseur after_id ne s'applique qu'à l'ordre croissant des IDs
+    if after_id is not None and sort == "id" and not descending:
+        query.after_id = after_id
+
+    if wants_ndjson(request):
+        ids, _ = catalogue.query(query, limit=limit, offset=offset)
+        # Les livres supprimés depuis le calcul de la liste sont omis
+        rows = (format_book(book, format) for book in map(books.get, ids) if book is not None)
+        return StreamingResponse(iter_ndjson(rows), media_type=NDJSON_MEDIA_TYPE)
+
+    def render() -> RenderedResponse:
+        ids, total = catalogue.query(query, limit=limit, offset=offset)
+        headers = {"X-Total-Count": str(total)}  # Nombre total de livres correspondant aux filtres
+        if limit is not None and offset + len(ids) < total and ids:
+            # Lien vers la page suivante (curseur pour l'ordre des IDs, décalage sinon) ;
+            # le curseur remplace le décalage, déjà appliqué à cette page
+            if query.after_id is not None or (sort == "id" and not descending and not offset):
+                next_url = request.url.remove_query_params("offset").include_query_params(after_id=ids[-1])
+            else:
+                next_url = request.url.include_query_params(offset=offset + limit)
+            headers["Link"] = f'<{next_url}>; rel="next"'
+        return RenderedResponse(encode_books([books.get(book_id) for book_id in ids], format), headers)
+
+    return book_response_cache.respond(request, book_versions.collection_etag(), render)
+
+# Route pour compter les livres par genre et par décennie (mêmes filtres que la liste)
+@router.get("/facets")
+async def book_facets(request: Request, query: CatalogueQuery = Depends(catalogue_query)):
+    return book_response_cache.respond(
+        request, book_versions.collection_etag(),
+        lambda: RenderedResponse(to_json(catalogue.facets(query)), {}),
+    )
+
+# Route pour rechercher des livres par titre, auteur ou ISBN (résultats classés et paginés)
 @router.get("/search")
-async def search_books(q: str = Query(..., min_length=1, description="Terme de recherche")):
-    results = [book for book in books if q.lower() in book["titre"].lower()]
-    return results
+async def search_books(
+    request: Request,
+    q: str = Query(..., min_length=1, description="Terme de recherche"),
+    limit: int = Query(20, ge=1, le=100, description="Nombre maximal de résultats"),
+    offset: int = Query(0, ge=0, description="Nombre de résultats à ignorer"),
+):
+    def render() -> RenderedResponse:
+        ids, total = search_index.search(q, limit=limit, offset=offset)
+        results = [books.get(book_id) for book_id in ids]
+        return RenderedResponse(encode_books(results, "detailed"), {"X-Total-Count": str(total)})  # Nombre total de résultats
+
+    return book_response_cache.respond(request, book_versions.collection_etag(), render)
+
+# Route pour exporter tout le catalogue en flux (NDJSON ou CSV), en mémoire constante.
+# X-Change-Seq : séquence du journal à partir de laquelle suivre les modifications
+@router.get("/export")
+async def export_books(format: str = Query("ndjson", enum=["ndjson", "csv"])):
+    headers = {"X-Change-Seq": str(book_changes.latest)}
+    if format == "csv":
+        return StreamingResponse(iter_csv(books.iter_from(), BOOK_FIELDS), media_type=CSV_MEDIA_TYPE, headers=headers)
+    return StreamingResponse(iter_ndjson(books.iter_from()), media_type=NDJSON_MEDIA_TYPE, headers=headers)
+
+# Route pour récupérer les modifications du catalogue postérieures à une séquence
+# (créations et mises à jour avec le livre complet, suppressions avec l'ID seul)
+@router.get("/changes")
+async def get_changes(
+    since: int = Query(..., ge=0, description="Dernière séquence reçue (X-Change-Seq de l'export)"),
+    limit: int = Query(1000, ge=1, le=1000, description="Nombre maximal de modifications"),
+):
+    changes = read_changes(since, limit)
+    next_seq = changes[-1].seq if changes else since
+    body = {
+        "changes": [change.as_dict("book") for change in changes],
+        "next": next_seq,  # Valeur de since pour la requête suivante
+        "latest": book_changes.latest,
+        "has_more": next_seq < book_changes.latest,
+    }
+    return RawJSONResponse(to_json(body), headers={"X-Change-Seq": str(next_seq)})
+
+# Route pour suivre les modifications en Server-Sent Events : un événement "change"
+# par modification, puis "resync" (et fin du flux) si le client a trop de retard
+@router.get("/changes/stream")
+async def stream_changes(
+    since: Optional[int] = Query(None, ge=0, description="Dernière séquence reçue"),
+    last_event_id: Optional[str] = Header(None),
+):
+    start = subscription_start(since, last_event_id)
+    read_changes(start, 0)  # 410 immédiat si la séquence n'est plus disponible
+
+    async def events():
+        try:
+            async for changes in book_changes.follow(start, CHANGES_KEEPALIVE):
+                if not changes:
+                    yield SSE_KEEPALIVE
+                for change in changes:
+                    yield sse_event("change", to_json(change.as_dict("book")), change.seq)
+        except ResyncRequired as e:
+            yield sse_event("resync", to_json(resync_detail(e)))
+
+    return StreamingResponse(events(), media_type=SSE_MEDIA_TYPE,
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+# Route WebSocket pour suivre les modifications : un message JSON par modification
+# ("type": "change"), puis "resync" et fermeture si le client a trop de retard
+@router.websocket("/changes/ws")
+async def changes_websocket(websocket: WebSocket, since: Optional[int] = Query(None, ge=0)):
+    await websocket.accept()
+    start = subscription_start(since)
+    try:
+        async for changes in book_changes.follow(start, CHANGES_KEEPALIVE):
+            if not changes:
+                await websocket.send_text('{"type":"keepalive"}')  # Détecte aussi les clients partis
+            for change in changes:
+                await websocket.send_text(to_json({"type": "change", **change.as_dict("book")}).decode())
+    except ResyncRequired as e:
+        await websocket.send_text(to_json({"type": "resync", **resync_detail(e)}).decode())
+        await websocket.close(code=4410)
+    except WebSocketDisconnect:
+        pass
 
 # Route pour récupérer un livre par son ID
 @router.get("/{book_id}", response_model=dict)
-async def get_book(book: dict = Depends(get_book_by_id)):
-    return book
+async def get_book(request: Request, book: dict = Depends(get_book_by_id)):
+    etag = book_versions.item_etag(book["id"])
+    return book_response_cache.respond(request, etag, lambda: RenderedResponse(book_json_cache.get(book), {}))
 
 # Route pour créer un nouveau livre
 @router.post("/", status_code=status.HTTP_201_CREATED, response_model=Book)
 async def create_book(book: BookBase, current_user: UserInDB = Depends(get_current_user)):
-    new_id = max([b["id"] for b in books]) + 1 if books else 1  # Générer un nouvel ID
-    new_book = book.model_dump()  # Convertir le modèle en dictionnaire
-    new_book["id"] = new_id
-    books.append(new_book)  # Ajouter le livre à la liste
+    # Vérifier si l'ISBN est déjà utilisé
+    if books.get_by("ISBN", book.ISBN) is not None:
+        raise HTTPException(status_code=400, detail="ISBN déjà utilisé")
+    new_book = books.add(book.model_dump())  # Ajouter le livre (un nouvel ID est attribué)
+    search_index.add(new_book["id"], new_book)  # Indexer le livre pour la recherche
+    book_versions.bump(new_book["id"])  # Nouvelle version du catalogue (ETag)
+    book_changes.append(OP_PUT, new_book["id"], new_book)
+    await books.sync()  # Attendre que l'écriture soit durable
     return new_book
 
-# Route pour mettre à jour un livre existant
+# Ajouter des livres validés (sans attente : l'ensemble est appliqué d'un bloc)
+def insert_books(rows: List[dict]) -> int:
+    new_books = books.add_many(rows)
+    for new_book in new_books:
+        search_index.add(new_book["id"], new_book)
+        book_changes.append(OP_PUT, new_book["id"], new_book)
+    if rows:
+        book_versions.bump()
+    return len(rows)
+
+# Route pour importer des livres en masse (corps NDJSON ou CSV envoyé en flux, réservé aux admins).
+# Mode "atomic" : aucun livre n'est créé si une ligne est invalide ;
+# mode "partial" : les lignes valides sont créées et les erreurs rapportées
+@router.post("/bulk")
+async def bulk_create_books(
+    request: Request,
+    mode: str = Query(MODE_ATOMIC, enum=[MODE_ATOMIC, MODE_PARTIAL]),
+    current_user: UserInDB = Depends(check_admin_role),
+):
+    report = ImportReport()
+    pending: List[dict] = []
+    seen_isbn = set()
+    async for batch in iter_batches(iter_records(request)):
+        valid, errors = book_batch_validator.validate(batch)
+        rows = []
+        for line, book in valid:
+            # Unicité de l'ISBN dans le fichier et dans le catalogue
+            if book.ISBN in seen_isbn or books.get_by("ISBN", book.ISBN) is not None:
+                errors.append(row_error(line, ["ISBN déjà utilisé"]))
+                continue
+            seen_isbn.add(book.ISBN)
+            rows.append(book.model_dump())
+        report.add_errors(errors)
+        if mode == MODE_PARTIAL:
+            report.created += insert_books(rows)
+        elif not report.error_count:
+            pending += rows
+
+    if mode == MODE_ATOMIC:
+        if report.error_count:
+            raise HTTPException(status_code=422, detail=report.as_dict())
+        # Un livre a pu être créé par une autre requête pendant la lecture du flux
+        if any(books.get_by("ISBN", row["ISBN"]) is not None for row in pending):
+            raise HTTPException(status_code=409, detail="ISBN créé entre-temps, import annulé")
+        report.created = insert_books(pending)
+    await books.sync()
+    return report.as_dict()
+
+# Route pour mettre à jour un livre existant (If-Match : 412 si le livre a été
+# modifié depuis la lecture du client)
 @router.put("/{book_id}", response_model=Book)
-async def update_book(book_id: int, book: BookBase, current_user: UserInDB = Depends(get_current_user)):
-    book_dict = get_book_by_id(book_id)  # Vérifier si le livre existe
-    
-    updated_book = book.model_dump()
-    updated_book["id"] = book_id  # Conserver l'ID
-    
-    for i, stored_book in enumerate(books):
-        if stored_book["id"] == book_id:
-            books[i] = updated_book  # Mise à jour des données
-            return updated_book
-    
-    raise HTTPException(status_code=404, detail="Livre non trouvé")
+async def update_book(request: Request, response: Response, book_id: int, book: BookBase,
+                      current_user: UserInDB = Depends(get_current_user)):
+    get_book_by_id(book_id)  # Vérifier si le livre existe
+    check_if_match(request, book_versions.item_etag(book_id))
+
+    try:
+        updated_book = books.replace(book_id, book.model_dump())  # Mise à jour des données (l'ID est conservé)
+    except DuplicateKeyError:
+        raise HTTPException(status_code=400, detail="ISBN déjà utilisé")
+    search_index.add(book_id, updated_book)  # Réindexer le livre
+    discard_encoded_book(book_id)
+    book_versions.bump(book_id)
+    book_changes.append(OP_PUT, book_id, updated_book)
+    await books.sync()
+    response.headers["ETag"] = book_versions.item_etag(book_id)
+    return updated_book
+
+# Route pour modifier certains champs d'un livre. Seuls les index concernés par
+# les champs modifiés sont mis à jour ; If-Match : 412 si le livre a été modifié
+# depuis la lecture du client (ETag de GET /books/{book_id})
+@router.patch("/{book_id}", response_model=Book)
+async def patch_book(request: Request, book_id: int, patch: BookPatch, current_user: UserInDB = Depends(get_current_user)):
+    book = get_book_by_id(book_id)
+    check_if_match(request, book_versions.item_etag(book_id))
+    changes = {field: value for field, value in patch.model_dump(exclude_unset=True).items() if book.get(field) != value}
+    if changes:
+        try:
+            book = books.update(book_id, changes)
+        except DuplicateKeyError:
+            raise HTTPException(status_code=400, detail="ISBN déjà utilisé")
+        search_index.update(book_id, book, changes)
+        discard_encoded_book(book_id)
+        book_versions.bump(book_id)
+        book_changes.append(OP_PUT, book_id, book)
+        await books.sync()
+    return RawJSONResponse(book_json_cache.get(book), headers={"ETag": book_versions.item_etag(book_id)})
 
 # Route pour supprimer un livre (réservé aux administrateurs)
 @router.delete("/{book_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_book(book_id: int, current_user: UserInDB = Depends(check_admin_role)):
-    book = get_book_by_id(book_id)  # Vérifier si le livre existe
-    
-    for i, b in enumerate(books):
-        if b["id"] == book_id:
-            books.pop(i)  # Suppression du livre
-            return
\ No newline at end of file
+    get_book_by_id(book_id)  # Vérifier si le livre existe
+    books.delete(book_id)  # Suppression du livre
+    search_index.remove(book_id)  # Retrait de l'index de recherche
+    discard_encoded_book(book_id)
+    book_versions.discard(book_id)
+    book_changes.append(OP_DELETE, book_id)
+    await books.sync()
\ No newline at end of file
@@ -1,9 +1,18 @@
-from fastapi import APIRouter, HTTPException, status, Depends
-from pydantic import BaseModel, EmailStr, field_validator
+from fastapi import APIRouter, HTTPException, Query, Request, Response, status, Depends
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, EmailStr, TypeAdapter, field_validator
 from typing import Optional, List  
+from typing_extensions import TypedDict
 from enum import Enum
 import re
-from utils.auth import get_password_hash, get_current_user, check_admin_role, UserInDB
+from utils.auth import (get_password_hash_async, get_password_hashes_async, get_current_user, check_admin_role,
+                        invalidate_user_tokens, UserInDB)
+from utils.bulk import BatchValidator, ImportReport, MODE_ATOMIC, MODE_PARTIAL, iter_batches, iter_records, row_error
+from utils import serialization
+from utils.serialization import RawJSONResponse
+from utils.streaming import NDJSON_MEDIA_TYPE, CSV_MEDIA_TYPE, iter_ndjson, iter_csv
+from utils.repository import Repository, DuplicateKeyError
+from utils.http_cache import ResourceVersions, check_if_match
 
 # Création d'un routeur pour gérer les utilisateurs
 router = APIRouter(
@@ -12,14 +21,31 @@ router = APIRouter(
     responses={404: {"description": "Utilisateur non trouvé"}}  # Gestion des réponses 404 par défaut
 )
 
-# Liste fictive pour stocker temporairement les utilisateurs
-users = []
+# Dépôt en mémoire pour stocker temporairement les utilisateurs, indexé par ID et par email
+users = Repository(unique_fields=["email"])
+
+# Versions des utilisateurs (ETag et préconditions If-Match)
+user_versions = ResourceVersions("users")
+
+# Charger les utilisateurs depuis le stockage durable (au démarrage)
+def open_storage(storage):
+    users.attach(storage, "users")
 
 # Enumération des rôles possibles pour les utilisateurs
 class RoleEnum(str, Enum):
     ADMIN = "admin"
     MEMBRE = "membre"
 
+# Règles de robustesse du mot de passe (création et modification)
+def check_password_strength(v: str) -> str:
+    if len(v) < 8:
+        raise ValueError("Le mot de passe doit contenir au moins 8 caractères")
+    if not re.search(r'[A-Z]', v):
+        raise ValueError("Le mot de passe doit contenir au moins une majuscule")
+    if not re.search(r'[0-9]', v):
+        raise ValueError("Le mot de passe doit contenir au moins un chiffre")
+    return v
+
 # Modèle de base pour un utilisateur
 class UserBase(BaseModel):
     nom: str
@@ -33,13 +59,7 @@ class UserCreate(UserBase):
     # Validation du mot de passe (longueur, majuscule, chiffre)
     @field_validator('mot_de_passe')
     def validate_password(cls, v):
-        if len(v) < 8:
-            raise ValueError("Le mot de passe doit contenir au moins 8 caractères")
-        if not re.search(r'[A-Z]', v):
-            raise ValueError("Le mot de passe doit contenir au moins une majuscule")
-        if not re.search(r'[0-9]', v):
-            raise ValueError("Le mot de passe doit contenir au moins un chiffre")
-        return v
+        return check_password_strength(v)
     
     # Exemple de données pour la documentation
     class Config:
@@ -59,29 +79,62 @@ class User(UserBase):
     class Config:
         orm_mode = True  # Permet l'intégration avec un ORM
 
+# Modèle pour la modification partielle d'un utilisateur : seuls les champs
+# envoyés sont validés (aucun ne peut être effacé)
+class UserPatch(BaseModel):
+    nom: Optional[str] = None
+    email: Optional[EmailStr] = None
+    role: Optional[RoleEnum] = None
+    mot_de_passe: Optional[str] = None
+
+    @field_validator('nom', 'email', 'role', 'mot_de_passe')
+    def validate_required(cls, v):
+        if v is None:
+            raise ValueError("Champ obligatoire")
+        return v
+
+    @field_validator('mot_de_passe')
+    def validate_password(cls, v):
+        return check_password_strength(v)
+
+# Représentation publique d'un utilisateur pour la sérialisation rapide :
+# un TypedDict sérialise directement les dictionnaires stockés (le mot de passe est ignoré)
+class UserPublic(TypedDict):
+    nom: str
+    email: str
+    role: str
+    id: int
+
+user_json_adapter = TypeAdapter(UserPublic)
+user_list_json_adapter = TypeAdapter(List[UserPublic])
+
+# Validation par lots pour l'import en masse
+user_batch_validator = BatchValidator(UserCreate)
+USER_FIELDS = ["id", "nom", "email", "role"]
+
+# Représentation publique d'un utilisateur (sans le mot de passe)
+def public_user(user: dict) -> dict:
+    return {field: user[field] for field in USER_FIELDS}
+
 # Route pour créer un utilisateur
 @router.post("/", response_model=User, status_code=status.HTTP_201_CREATED)
 async def create_user(user: UserCreate):
     # Vérifier si l'email est déjà utilisé
-    for existing_user in users:
-        if existing_user["email"] == user.email:
-            raise HTTPException(status_code=400, detail="Email déjà utilisé")
-    
-    # Générer un nouvel ID unique
-    new_id = max([u["id"] for u in users]) + 1 if users else 1
+    if users.get_by("email", user.email) is not None:
+        raise HTTPException(status_code=400, detail="Email déjà utilisé")
     
-    # Hachage du mot de passe
-    hashed_password = get_password_hash(user.mot_de_passe)
+    # Hachage du mot de passe (dans le pool de hachage, hors boucle d'événements)
+    hashed_password = await get_password_hash_async(user.mot_de_passe)
     
     # Création du nouvel utilisateur
     new_user = {
-        "id": new_id,
         "nom": user.nom,
         "email": user.email,
         "role": user.role,
         "mot_de_passe": hashed_password  # Stockage sécurisé du mot de passe
     }
-    users.append(new_user)
+    new_user = users.add(new_user)  # Un nouvel ID unique est attribué
+    await users.sync()  # Attendre que l'écriture soit durable
     
     # Retourner l'utilisateur sans le mot de passe
     return User(
@@ -94,6 +147,8 @@ async def create_user(user: UserCreate):
 # Route pour récupérer tous les utilisateurs (réservé aux admins)
 @router.get("/", response_model=List[User])
 async def get_users(current_user: UserInDB = Depends(check_admin_role)):
+    if serialization.FAST_JSON_RESPONSES:
+        return RawJSONResponse(user_list_json_adapter.dump_json(users.values()))
     return [User(
         id=user["id"],
         nom=user["nom"],
@@ -101,9 +156,72 @@ async def get_users(current_user: UserInDB = Depends(check_admin_role)):
         role=user["role"]
     ) for user in users]
 
+# Route pour importer des utilisateurs en masse (NDJSON ou CSV, réservé aux admins).
+# Les mots de passe de chaque lot sont hachés en parallèle dans le pool de hachage
+@router.post("/bulk")
+async def bulk_create_users(
+    request: Request,
+    mode: str = Query(MODE_ATOMIC, enum=[MODE_ATOMIC, MODE_PARTIAL]),
+    current_user: UserInDB = Depends(check_admin_role),
+):
+    report = ImportReport()
+    pending = []
+    seen_emails = set()
+    async for batch in iter_batches(iter_records(request)):
+        valid, errors = user_batch_validator.validate(batch)
+        accepted = []
+        for line, user in valid:
+            if user.email in seen_emails or users.get_by("email", user.email) is not None:
+                errors.append(row_error(line, ["Email déjà utilisé"]))
+                continue
+            seen_emails.add(user.email)
+            accepted.append((line, user))
+        report.add_errors(errors)
+        if mode == MODE_ATOMIC and report.error_count:
+            continue  # Import annulé : inutile de hacher les lots suivants
+        hashes = await get_password_hashes_async([user.mot_de_passe for _, user in accepted])
+        rows = [
+            (line, {"nom": user.nom, "email": user.email, "role": user.role, "mot_de_passe": hashed})
+            for (line, user), hashed in zip(accepted, hashes)
+        ]
+        if mode == MODE_PARTIAL:
+            # Un email a pu être créé par une autre requête pendant le hachage
+            for line, row in rows:
+                if users.get_by("email", row["email"]) is not None:
+                    report.add_errors([row_error(line, ["Email déjà utilisé"])])
+                    continue
+                users.add(row)
+                report.created += 1
+        else:
+            pending += [row for _, row in rows]
+
+    if mode == MODE_ATOMIC:
+        if report.error_count:
+            raise HTTPException(status_code=422, detail=report.as_dict())
+        if any(users.get_by("email", row["email"]) is not None for row in pending):
+            raise HTTPException(status_code=409, detail="Email créé entre-temps, import annulé")
+        for row in pending:
+            users.add(row)
+        report.created = len(pending)
+    await users.sync()
+    return report.as_dict()
+
+# Route pour exporter les utilisateurs en flux (NDJSON ou CSV, réservé aux admins)
+@router.get("/export")
+async def export_users(
+    format: str = Query("ndjson", enum=["ndjson", "csv"]),
+    current_user: UserInDB = Depends(check_admin_role),
+):
+    rows = (public_user(user) for user in users.iter_from())
+    if format == "csv":
+        return StreamingResponse(iter_csv(rows, USER_FIELDS), media_type=CSV_MEDIA_TYPE)
+    return StreamingResponse(iter_ndjson(rows), media_type=NDJSON_MEDIA_TYPE)
+
 # Route pour récupérer les informations de l'utilisateur connecté
 @router.get("/me", response_model=User)
 async def read_users_me(current_user: UserInDB = Depends(get_current_user)):
+    if serialization.FAST_JSON_RESPONSES:
+        return RawJSONResponse(user_json_adapter.dump_json(current_user.model_dump()))
     return User(
         id=current_user.id,
         nom=current_user.nom,
@@ -111,19 +229,58 @@ async def read_users_me(current_user: UserInDB = Depends(get_current_user)):
         role=current_user.role
     )
 
-# Route pour récupérer un utilisateur par son ID
+# Route pour récupérer un utilisateur par son ID (ETag : version de l'utilisateur)
 @router.get("/{user_id}", response_model=User)
-async def get_user(user_id: int, current_user: UserInDB = Depends(get_current_user)):
+async def get_user(user_id: int, response: Response, current_user: UserInDB = Depends(get_current_user)):
     # Vérifier que l'utilisateur peut accéder à ses propres infos ou qu'il est admin
     if current_user.id != user_id and current_user.role != "admin":
         raise HTTPException(status_code=403, detail="Accès non autorisé")
         
-    for user in users:
-        if user["id"] == user_id:
-            return User(
-                id=user["id"],
-                nom=user["nom"],
-                email=user["email"],
-                role=user["role"]
-            )
-    raise HTTPException(status_code=404, detail="Utilisateur non trouvé")
\ No newline at end of file
+    user = users.get(user_id)
+    if user is None:
+        raise HTTPException(status_code=404, detail="Utilisateur non trouvé")
+    etag = user_versions.item_etag(user_id)
+    if serialization.FAST_JSON_RESPONSES:
+        return RawJSONResponse(user_json_adapter.dump_json(user), headers={"ETag": etag})
+    response.headers["ETag"] = etag
+    return User(
+        id=user["id"],
+        nom=user["nom"],
+        email=user["email"],
+        role=user["role"]
+    )
+
+# Route pour modifier certains champs d'un utilisateur (lui-même ou un admin ;
+# seul un admin peut changer un rôle). If-Match : 412 si l'utilisateur a été
+# modifié depuis la lecture du client (ETag de GET /users/{user_id})
+@router.patch("/{user_id}", response_model=User)
+async def patch_user(request: Request, user_id: int, patch: UserPatch, current_user: UserInDB = Depends(get_current_user)):
+    if current_user.id != user_id and current_user.role != "admin":
+        raise HTTPException(status_code=403, detail="Accès non autorisé")
+    changes = patch.model_dump(exclude_unset=True)
+    if "role" in changes and current_user.role != "admin":
+        raise HTTPException(status_code=403, detail="Permissions insuffisantes")
+    if users.get(user_id) is None:
+        raise HTTPException(status_code=404, detail="Utilisateur non trouvé")
+    if "mot_de_passe" in changes:
+        # Hachage avant la vérification de la version : aucune attente entre
+        # la précondition et l'écriture
+        changes["mot_de_passe"] = await get_password_hash_async(changes["mot_de_passe"])
+
+    user = users.get(user_id)
+    if user is None:
+        raise HTTPException(status_code=404, detail="Utilisateur non trouvé")
+    check_if_match(request, user_versions.item_etag(user_id))
+    changes = {field: value for field, value in changes.items() if user.get(field) != value}
+    if changes:
+        try:
+            updated = users.update(user_id, changes)
+        except DuplicateKeyError:
+            raise HTTPException(status_code=400, detail="Email déjà utilisé")
+        # Les tokens en cache portent l'ancien rôle, l'ancien email ou un mot de passe révoqué
+        if not changes.keys().isdisjoint(("role", "mot_de_passe", "email")):
+            invalidate_user_tokens(user["email"])
+        user_versions.bump(user_id)
+        user = updated
+        await users.sync()
+    return RawJSONResponse(user_json_adapter.dump_json(user), headers={"ETag": user_versions.item_etag(user_id)})
@@ -0,0 +1,38 @@
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+from routers.users import users
+from utils.auth import create_access_token, get_password_hash
+from utils.dependencies import limiter
+from utils.rate_limiter import RateLimit
+
+API_KEY = "my-secret-key"
+ADMIN_EMAIL = "admin.tests@example.com"
+
+# Application démarrée une fois pour toute la session, sans limite de débit
+@pytest.fixture(scope="session")
+def client():
+    limiter.set_key_limit(API_KEY, RateLimit(times=10**9, seconds=60))
+    with TestClient(main.app) as client:
+        yield client
+
+
+@pytest.fixture(scope="session")
+def api_headers():
+    return {"api-key": API_KEY}
+
+
+@pytest.fixture(scope="session")
+def admin_headers(client, api_headers):
+    if users.get_by("email", ADMIN_EMAIL) is None:
+        users.add({"nom": "Admin", "email": ADMIN_EMAIL, "role": "admin", "mot_de_passe": get_password_hash("MotDePasse123")})
+    return {**api_headers, "Authorization": "Bearer " + create_access_token({"sub": ADMIN_EMAIL})}
+
+
+@pytest.fixture(scope="session")
+def member_headers(client, api_headers):
+    email = "membre.tests@example.com"
+    if users.get_by("email", email) is None:
+        users.add({"nom": "Membre", "email": email, "role": "membre", "mot_de_passe": get_password_hash("MotDePasse123")})
+    return {**api_headers, "Authorization": "Bearer " + create_access_token({"sub": email})}
@@ -0,0 +1,16 @@
+import itertools
+
+from benchmarks.fixtures import isbn
+
+# Les ISBN des tests commencent par 978-9 (benchmarks.fixtures.isbn)
+_isbn_counter = itertools.count(9 * 10**9 + 1)
+
+
+# ISBN unique et conforme au format attendu (978-d-ddd-ddddd-d)
+def new_isbn() -> str:
+    return isbn(next(_isbn_counter))
+
+
+def new_book(**fields) -> dict:
+    return {"titre": "Livre de test", "auteur": "Auteur de test", "ISBN": new_isbn(),
+            "annee": 2001, "genre": "Roman", **fields}
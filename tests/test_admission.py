@@ -0,0 +1,19 @@
+import pytest
+
+import main
+
+
+@pytest.mark.parametrize("method, path, expected", [
+    ("POST", "/token", "login"),
+    ("POST", "/users/", "login"),
+    ("PATCH", "/users/7", "login"),  # Hachage bcrypt lorsque mot_de_passe est envoyé
+    ("GET", "/users/7", "default"),
+    ("PATCH", "/books/7", "default"),
+    ("GET", "/books/7", "read"),
+])
+def test_routes_are_classified_by_cost(method, path, expected):
+    assert main.admission.classify(method, path).name == expected
+
+
+def test_change_stream_is_exempt():
+    assert main.admission.classify("GET", "/books/changes/stream") is None
@@ -0,0 +1,35 @@
+import json
+
+from factories import new_book
+from routers import users as users_router
+
+NDJSON = {"content-type": "application/x-ndjson"}
+
+
+def ndjson(rows) -> str:
+    return "\n".join(json.dumps(row) for row in rows)
+
+
+def test_book_bulk_import_is_admin_only(client, member_headers, admin_headers):
+    body = ndjson([new_book()])
+    assert client.post("/books/bulk", content=body, headers={**member_headers, **NDJSON}).status_code == 403
+    assert client.post("/books/bulk", content=body, headers={**admin_headers, **NDJSON}).json()["created"] == 1
+
+
+# Un email créé par une autre requête pendant le hachage du lot est signalé
+# comme une erreur de sa ligne (mode partial), pas ignoré silencieusement
+def test_user_bulk_partial_reports_email_taken_during_hashing(client, admin_headers, monkeypatch):
+    rows = [{"nom": f"Import {i}", "email": f"import.{i}@example.com", "mot_de_passe": "MotDePasse123"} for i in range(3)]
+    hash_passwords = users_router.get_password_hashes_async
+
+    async def racing_hashes(passwords):
+        hashes = await hash_passwords(passwords)
+        users_router.users.add({"nom": "Concurrent", "email": rows[1]["email"], "role": "membre", "mot_de_passe": hashes[0]})
+        return hashes
+
+    monkeypatch.setattr(users_router, "get_password_hashes_async", racing_hashes)
+    response = client.post("/users/bulk?mode=partial", content=ndjson(rows), headers={**admin_headers, **NDJSON})
+    report = response.json()
+    assert report["created"] == 2
+    assert report["error_count"] == 1
+    assert report["errors"] == [{"line": 2, "errors": ["Email déjà utilisé"]}]
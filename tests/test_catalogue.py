@@ -0,0 +1,62 @@
+import asyncio
+import json
+
+from starlette.requests import Request
+
+from factories import new_book
+from routers import books as books_router
+from utils.catalogue import CatalogueQuery
+
+
+def follow_pages(client, headers, url):
+    ids = []
+    while url:
+        response = client.get(url, headers=headers)
+        assert response.status_code == 200
+        ids += [row["id"] for row in response.json()]
+        link = response.headers.get("link")
+        url = link[1:link.index(">")] if link else None
+    return ids
+
+
+def test_filtered_pages_cover_every_book_once(client, api_headers, admin_headers):
+    created = [client.post("/books/", json=new_book(genre="Thriller", auteur="Auteur pagination"),
+                           headers=admin_headers).json()["id"] for _ in range(12)]
+    base = "/books/?auteur=Auteur%20pagination&limit=3"
+    assert follow_pages(client, api_headers, base) == created
+    assert follow_pages(client, api_headers, base + f"&after_id={created[1]}") == created[2:]
+    # Décalage et curseur combinés : le lien suivant ne réapplique pas le décalage
+    assert follow_pages(client, api_headers, base + f"&after_id={created[1]}&offset=2") == created[4:]
+    assert follow_pages(client, api_headers, base + "&offset=2") == created[2:]
+    assert follow_pages(client, api_headers, base + "&sort=id&order=desc") == created[::-1]
+
+
+def test_columns_hold_the_only_copy_of_catalogue_fields(client, api_headers, admin_headers):
+    from routers.books import books
+
+    book = client.post("/books/", json=new_book(auteur="Auteur colonnes", annee=1950), headers=admin_headers).json()
+    if books.columns is not None:
+        assert books.record(book["id"]).keys().isdisjoint(books.columns.fields)
+    assert client.get(f"/books/{book['id']}", headers=api_headers).json() == book
+
+    patched = client.patch(f"/books/{book['id']}", json={"annee": 1960, "genre": "Conte"}, headers=admin_headers).json()
+    assert patched == {**book, "annee": 1960, "genre": "Conte"}
+    assert client.get(f"/books/{book['id']}", headers=api_headers).json() == patched
+    filtered = client.get("/books/?auteur=Auteur%20colonnes&annee_min=1960&format=detailed", headers=api_headers).json()
+    assert filtered == [patched]
+
+
+async def drain(response) -> list:
+    body = b"".join([chunk async for chunk in response.body_iterator])
+    return [json.loads(line) for line in body.splitlines()]
+
+
+def test_ndjson_stream_skips_books_deleted_before_they_are_sent(client, admin_headers):
+    created = [client.post("/books/", json=new_book(auteur="Auteur flux", annee=1990 + i), headers=admin_headers).json()
+               for i in range(3)]
+    request = Request({"type": "http", "method": "GET", "path": "/books/", "query_string": b"",
+                       "headers": [(b"accept", b"application/x-ndjson")]})
+    response = books_router.get_filtered_books(request, CatalogueQuery(auteur="Auteur flux"), "detailed",
+                                               None, None, 0, "annee", False)
+    assert client.delete(f"/books/{created[1]['id']}", headers=admin_headers).status_code == 204
+    assert asyncio.run(drain(response)) == [created[0], created[2]]
@@ -0,0 +1,67 @@
+import json
+
+from factories import new_book
+from routers import books as books_router
+from routers.books import books
+from utils.change_log import ChangeLog
+
+
+def test_out_of_range_sequences_require_a_resync(client, api_headers, admin_headers, monkeypatch):
+    changes = ChangeLog(max_entries=3)
+    monkeypatch.setattr(books_router, "book_changes", changes)
+    start = changes.latest
+    for _ in range(5):
+        client.post("/books/", json=new_book(), headers=admin_headers)
+
+    # Les deux premières modifications ont été compactées
+    for since in (start, start + 1, 0):
+        response = client.get("/books/changes", params={"since": since}, headers=api_headers)
+        assert response.status_code == 410
+        assert response.json()["detail"] == {"message": "resync required", "oldest": start + 2, "latest": start + 5}
+    assert client.get("/books/changes", params={"since": start + 2}, headers=api_headers).status_code == 200
+
+    # Séquence postérieure à la dernière (curseur d'un autre processus)
+    response = client.get("/books/changes", params={"since": start + 6}, headers=api_headers)
+    assert response.status_code == 410
+
+
+def test_changes_are_paged(client, api_headers, admin_headers):
+    since = books_router.book_changes.latest
+    ids = [client.post("/books/", json=new_book(), headers=admin_headers).json()["id"] for _ in range(5)]
+
+    received = []
+    while True:
+        response = client.get("/books/changes", params={"since": since, "limit": 2}, headers=api_headers)
+        page = response.json()
+        assert len(page["changes"]) <= 2
+        assert response.headers["X-Change-Seq"] == str(page["next"])
+        received += page["changes"]
+        since = page["next"]
+        if not page["has_more"]:
+            break
+    assert [change["id"] for change in received] == ids
+    assert since == page["latest"]
+    assert client.get("/books/changes", params={"since": since}, headers=api_headers).json()["changes"] == []
+
+
+def test_export_then_changes_reproduces_the_catalogue(client, api_headers, admin_headers):
+    updated = client.post("/books/", json=new_book(), headers=admin_headers).json()
+    deleted = client.post("/books/", json=new_book(), headers=admin_headers).json()
+
+    export = client.get("/books/export", headers=api_headers)
+    catalogue = {book["id"]: book for book in map(json.loads, export.text.splitlines())}
+    since = int(export.headers["X-Change-Seq"])
+
+    created = client.post("/books/", json=new_book(), headers=admin_headers).json()
+    client.patch(f"/books/{updated['id']}", json={"titre": "Titre modifié"}, headers=admin_headers)
+    client.delete(f"/books/{deleted['id']}", headers=admin_headers)
+
+    page = client.get("/books/changes", params={"since": since}, headers=api_headers).json()
+    assert [(change["op"], change["id"]) for change in page["changes"]] == [
+        ("put", created["id"]), ("put", updated["id"]), ("delete", deleted["id"])]
+    for change in page["changes"]:
+        if change["op"] == "delete":
+            del catalogue[change["id"]]
+        else:
+            catalogue[change["id"]] = change["book"]
+    assert catalogue == {book["id"]: book for book in books}
@@ -0,0 +1,27 @@
+from factories import new_book
+
+GZIP = {"Accept-Encoding": "gzip"}
+
+
+def test_no_content_responses_are_not_touched(client, admin_headers):
+    book = client.post("/books/", json=new_book(), headers=admin_headers).json()
+    response = client.delete(f"/books/{book['id']}", headers={**admin_headers, **GZIP})
+    assert response.status_code == 204
+    assert "content-length" not in response.headers
+    assert "content-encoding" not in response.headers
+
+
+def test_not_modified_responses_are_not_touched(client, api_headers):
+    etag = client.get("/books/2", headers=api_headers).headers["etag"]
+    response = client.get("/books/2", headers={**api_headers, **GZIP, "If-None-Match": etag})
+    assert response.status_code == 304
+    assert "content-length" not in response.headers
+    assert "content-encoding" not in response.headers
+
+
+def test_large_bodies_are_still_compressed(client, api_headers, admin_headers):
+    for _ in range(20):
+        client.post("/books/", json=new_book(), headers=admin_headers)
+    response = client.get("/books/?format=detailed", headers={**api_headers, **GZIP})
+    assert response.status_code == 200
+    assert response.headers["content-encoding"] == "gzip"
@@ -0,0 +1,173 @@
+import json
+
+import pytest
+from starlette.requests import Request
+
+from factories import new_book
+from utils.http_cache import RenderedResponse, ResponseCache
+
+LIST_URL = "/books/?format=detailed"
+SEARCH_URL = "/books/search?q=test"
+
+
+def etag_of(client, url, headers):
+    response = client.get(url, headers=headers)
+    assert response.status_code == 200
+    return response.headers["etag"]
+
+
+def conditional_get(client, url, headers, etag):
+    return client.get(url, headers={**headers, "If-None-Match": etag})
+
+
+def create(client, admin_headers, **fields) -> dict:
+    response = client.post("/books/", json=new_book(**fields), headers=admin_headers)
+    assert response.status_code == 201
+    return response.json()
+
+
+def test_unchanged_resource_returns_304(client, api_headers, admin_headers):
+    book = create(client, admin_headers)
+    for url in (LIST_URL, SEARCH_URL, f"/books/{book['id']}"):
+        etag = etag_of(client, url, api_headers)
+        response = conditional_get(client, url, api_headers, etag)
+        assert response.status_code == 304
+        assert response.headers["etag"] == etag
+
+
+def test_update_is_visible_to_conditional_and_plain_reads(client, api_headers, admin_headers):
+    book = create(client, admin_headers)
+    url = f"/books/{book['id']}"
+    etag = etag_of(client, url, api_headers)
+    updated = {**new_book(titre="Titre modifié"), "ISBN": book["ISBN"]}
+    assert client.put(url, json=updated, headers=admin_headers).status_code == 200
+
+    response = conditional_get(client, url, api_headers, etag)
+    assert response.status_code == 200  # ETag périmé : nouveau corps
+    assert response.json()["titre"] == "Titre modifié"
+    assert response.headers["etag"] != etag
+    assert client.get(url, headers=api_headers).json()["titre"] == "Titre modifié"
+    listed = {row["id"]: row for row in client.get(LIST_URL, headers=api_headers).json()}
+    assert listed[book["id"]]["titre"] == "Titre modifié"
+
+
+def test_create_is_visible_to_conditional_and_plain_reads(client, api_headers, admin_headers):
+    list_etag = etag_of(client, LIST_URL, api_headers)
+    search_url = "/books/search?q=Xylophage"
+    search_etag = etag_of(client, search_url, api_headers)
+    book = create(client, admin_headers, titre="Xylophage")
+
+    response = conditional_get(client, LIST_URL, api_headers, list_etag)
+    assert response.status_code == 200
+    assert book["id"] in [row["id"] for row in response.json()]
+    assert book["id"] in [row["id"] for row in client.get(LIST_URL, headers=api_headers).json()]
+    response = conditional_get(client, search_url, api_headers, search_etag)
+    assert response.status_code == 200
+    assert [row["id"] for row in response.json()] == [book["id"]]
+
+
+def test_delete_is_visible_to_conditional_and_plain_reads(client, api_headers, admin_headers):
+    book = create(client, admin_headers)
+    url = f"/books/{book['id']}"
+    item_etag = etag_of(client, url, api_headers)
+    list_etag = etag_of(client, LIST_URL, api_headers)
+    assert client.delete(url, headers=admin_headers).status_code == 204
+
+    assert conditional_get(client, url, api_headers, item_etag).status_code == 404
+    assert client.get(url, headers=api_headers).status_code == 404
+    response = conditional_get(client, LIST_URL, api_headers, list_etag)
+    assert response.status_code == 200
+    assert book["id"] not in [row["id"] for row in response.json()]
+    assert book["id"] not in [row["id"] for row in client.get(LIST_URL, headers=api_headers).json()]
+
+
+def test_bulk_import_is_visible_to_conditional_and_plain_reads(client, api_headers, admin_headers):
+    search_url = "/books/search?q=Ornithorynque"
+    list_etag = etag_of(client, LIST_URL, api_headers)
+    search_etag = etag_of(client, search_url, api_headers)
+    body = "\n".join(json.dumps(new_book(titre=f"Ornithorynque {i}")) for i in range(3))
+    response = client.post("/books/bulk", content=body,
+                           headers={**admin_headers, "content-type": "application/x-ndjson"})
+    assert response.json()["created"] == 3
+
+    response = conditional_get(client, LIST_URL, api_headers, list_etag)
+    assert response.status_code == 200
+    titles = [row["titre"] for row in response.json()]
+    assert all(f"Ornithorynque {i}" in titles for i in range(3))
+    response = conditional_get(client, search_url, api_headers, search_etag)
+    assert response.status_code == 200
+    assert len(response.json()) == 3
+    assert len(client.get(search_url, headers=api_headers).json()) == 3
+
+
+# Chaque écriture change les ETags de la liste, de la recherche et de l'enregistrement concerné
+@pytest.mark.parametrize("write", ["update", "create", "delete", "bulk"])
+def test_every_write_changes_list_search_and_item_etags(client, api_headers, admin_headers, write):
+    book = create(client, admin_headers)
+    item_url = f"/books/{book['id']}"
+    urls = [LIST_URL, SEARCH_URL]
+    if write in ("update", "delete"):
+        urls.append(item_url)
+    before = {url: etag_of(client, url, api_headers) for url in urls}
+
+    if write == "update":
+        client.put(item_url, json={**new_book(titre="Autre titre"), "ISBN": book["ISBN"]}, headers=admin_headers)
+    elif write == "create":
+        create(client, admin_headers)
+    elif write == "delete":
+        client.delete(item_url, headers=admin_headers)
+    else:
+        client.post("/books/bulk", content=json.dumps(new_book()),
+                    headers={**admin_headers, "content-type": "application/x-ndjson"})
+
+    for url, etag in before.items():
+        response = client.get(url, headers=api_headers)
+        if write == "delete" and url == item_url:
+            assert response.status_code == 404
+            continue
+        assert response.headers["etag"] != etag, url
+
+
+def cache_request(path: str, query: str = "", encoding: str = "") -> Request:
+    headers = [(b"accept-encoding", encoding.encode())] if encoding else []
+    return Request({"type": "http", "method": "GET", "path": path, "query_string": query.encode(), "headers": headers})
+
+
+def rendering(body: bytes):
+    calls = []
+
+    def render() -> RenderedResponse:
+        calls.append(body)
+        return RenderedResponse(body, {})
+    return render, calls
+
+
+def test_response_cache_keeps_one_version_per_request():
+    cache = ResponseCache(compression=False)
+    for version in range(5):
+        render, calls = rendering(b"x" * (100 + version))
+        for _ in range(2):
+            cache.respond(cache_request("/books/", "format=detailed"), f'"v{version}"', render)
+        assert len(calls) == 1  # Rendu une fois par version
+    assert len(cache) == 1
+    assert cache.stats()["bytes"] == 104
+
+
+def test_response_cache_is_bounded_in_bytes():
+    cache = ResponseCache(compression=False, max_bytes=250, max_body=150)
+    for page in range(3):
+        cache.respond(cache_request("/books/", f"offset={page}"), '"v"', rendering(b"x" * 100)[0])
+    assert len(cache) == 2 and cache.stats()["bytes"] == 200
+
+    render, calls = rendering(b"x" * 200)  # Corps au-delà de max_body : jamais conservé
+    for _ in range(2):
+        assert cache.respond(cache_request("/books/", "format=detailed"), '"v"', render).body == b"x" * 200
+    assert len(calls) == 2 and cache.stats()["uncached"] == 2 and len(cache) == 2
+
+
+def test_response_cache_counts_compressed_bodies():
+    cache = ResponseCache(compression=True, min_size=0)
+    body = b'{"titre": "Le Petit Prince"}' * 50
+    response = cache.respond(cache_request("/books/", encoding="gzip"), '"v"', rendering(body)[0])
+    assert response.headers["content-encoding"] == "gzip"
+    assert cache.stats()["bytes"] == len(body) + len(response.body)
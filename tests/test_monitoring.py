@@ -0,0 +1,63 @@
+import asyncio
+
+from utils.dependencies import limiter
+from utils.metrics import Metrics, MetricsMiddleware, _request_timings, instrument, metrics
+
+
+def test_monitoring_routes_are_not_rate_limited(client, api_headers, monkeypatch):
+    checked = []
+
+    async def check(key, path=None):
+        checked.append(path)
+
+    monkeypatch.setattr(limiter, "check", check)
+    for _ in range(12):
+        assert client.get("/metrics").status_code == 200  # Sans clé API
+        assert client.get("/stats/admission", headers=api_headers).status_code == 200
+    assert checked == []
+
+    assert client.get("/", headers=api_headers).status_code == 200
+    assert client.get("/books/2", headers=api_headers).status_code == 200
+    assert checked == ["/", "/books/{book_id}"]
+
+
+def test_stats_still_require_the_api_key(client):
+    assert client.get("/stats/admission", headers={"api-key": "mauvaise-cle"}).status_code == 403
+
+
+def test_server_timing_lists_instrumented_dependencies(client, api_headers):
+    response = client.get("/books/2", headers=api_headers)
+    entries = [entry.split(";")[0] for entry in response.headers["server-timing"].split(", ")]
+    assert entries[:2] == ["verify_api_key", "rate_limit"]
+    assert entries[-1] == "total"
+
+
+def test_timings_are_not_collected_without_server_timing():
+    seen = []
+
+    @instrument("test_component")
+    async def component():
+        seen.append(_request_timings.get())
+
+    async def app(scope, receive, send):
+        await component()
+        await send({"type": "http.response.start", "status": 204, "headers": []})
+        await send({"type": "http.response.body", "body": b""})
+
+    messages = []
+
+    async def send(message):
+        messages.append(message)
+
+    registry = Metrics()
+    middleware = MetricsMiddleware(app, registry=registry, timing_header=False)
+    asyncio.run(middleware({"type": "http", "method": "GET", "path": "/"}, None, send))
+    assert seen == [None]
+    assert messages[0]["headers"] == []
+    assert registry.requests["GET", "<unmatched>"][1] == {204: 1}
+
+    # Les histogrammes des composants survivent à clear (instrument les conserve)
+    histogram = metrics.components["test_component"]
+    assert histogram.count == 1
+    metrics.clear()
+    assert metrics.components["test_component"] is histogram and histogram.count == 0
@@ -0,0 +1,41 @@
+import asyncio
+import threading
+import time
+
+from utils import password_hasher as hasher_module
+from utils.password_hasher import PasswordHasher
+
+
+def test_bulk_hashing_leaves_a_worker_for_logins(monkeypatch):
+    lock = threading.Lock()
+    running = {"bulk": 0, "max_bulk": 0}
+
+    def slow_hash(password: str) -> str:
+        with lock:
+            running["bulk"] += 1
+            running["max_bulk"] = max(running["max_bulk"], running["bulk"])
+        time.sleep(0.01)
+        with lock:
+            running["bulk"] -= 1
+        return "hash:" + password
+
+    monkeypatch.setattr(hasher_module, "hash_password", slow_hash)
+    monkeypatch.setattr(hasher_module, "check_password", lambda plain, hashed: hashed == "hash:" + plain)
+    hasher = PasswordHasher(max_workers=3)
+
+    async def scenario():
+        passwords = [f"mot-de-passe-{i}" for i in range(60)]
+        bulk = asyncio.create_task(hasher.hash_many(passwords))
+        await asyncio.sleep(0.05)
+        start = time.perf_counter()
+        assert await hasher.verify("secret", "hash:secret")
+        login_wait = time.perf_counter() - start
+        return await bulk, login_wait
+
+    try:
+        hashes, login_wait = asyncio.run(scenario())
+    finally:
+        hasher.shutdown()
+    assert hashes == [f"hash:mot-de-passe-{i}" for i in range(60)]
+    assert running["max_bulk"] == 2  # max_workers - 1
+    assert login_wait < 0.05  # Pas d'attente derrière l'import (60 hachages / 2 workers = 0,3 s)
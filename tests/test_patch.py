@@ -0,0 +1,85 @@
+from factories import new_book, new_isbn
+from routers.books import books
+from routers.users import users
+
+
+def create_book(client, headers, **fields) -> dict:
+    response = client.post("/books/", json=new_book(**fields), headers=headers)
+    assert response.status_code == 201
+    return response.json()
+
+
+def create_user(email: str) -> dict:
+    return users.add({"nom": "Lecteur", "email": email, "role": "membre", "mot_de_passe": "x"})
+
+
+def test_stale_if_match_is_rejected_with_the_current_etag(client, admin_headers):
+    book = create_book(client, admin_headers)
+    url = f"/books/{book['id']}"
+    stale = client.get(url, headers=admin_headers).headers["ETag"]
+    current = client.patch(url, json={"titre": "Nouveau titre"}, headers={**admin_headers, "If-Match": stale}).headers["ETag"]
+    assert current != stale
+
+    response = client.patch(url, json={"auteur": "Autre"}, headers={**admin_headers, "If-Match": stale})
+    assert response.status_code == 412
+    assert response.headers["ETag"] == current
+    response = client.put(url, json=new_book(), headers={**admin_headers, "If-Match": stale})
+    assert response.status_code == 412
+    assert response.headers["ETag"] == current
+    assert books.get(book["id"])["titre"] == "Nouveau titre"
+
+
+def test_stale_if_match_on_a_user(client, admin_headers):
+    user = create_user("patch.etag@example.com")
+    url = f"/users/{user['id']}"
+    stale = client.get(url, headers=admin_headers).headers["ETag"]
+    current = client.patch(url, json={"nom": "Renommé"}, headers=admin_headers).headers["ETag"]
+
+    response = client.patch(url, json={"nom": "Encore"}, headers={**admin_headers, "If-Match": stale})
+    assert response.status_code == 412
+    assert response.headers["ETag"] == current
+    assert users.get(user["id"])["nom"] == "Renommé"
+
+
+def test_required_fields_cannot_be_cleared(client, admin_headers):
+    book = create_book(client, admin_headers)
+    for field in ("titre", "ISBN"):
+        response = client.patch(f"/books/{book['id']}", json={field: None}, headers=admin_headers)
+        assert response.status_code == 422
+    assert books.get(book["id"])["ISBN"] == book["ISBN"]
+
+
+def test_member_cannot_change_a_role(client, member_headers):
+    member = users.get_by("email", "membre.tests@example.com")
+    response = client.patch(f"/users/{member['id']}", json={"role": "admin"}, headers=member_headers)
+    assert response.status_code == 403
+    assert users.get(member["id"])["role"] == "membre"
+
+
+def test_duplicate_unique_values_are_rejected(client, admin_headers):
+    first, second = create_book(client, admin_headers), create_book(client, admin_headers)
+    response = client.patch(f"/books/{second['id']}", json={"ISBN": first["ISBN"]}, headers=admin_headers)
+    assert response.status_code == 400
+    assert books.get_by("ISBN", first["ISBN"])["id"] == first["id"]
+
+    user = create_user("patch.doublon@example.com")
+    response = client.patch(f"/users/{user['id']}", json={"email": "membre.tests@example.com"}, headers=admin_headers)
+    assert response.status_code == 400
+    assert users.get(user["id"])["email"] == "patch.doublon@example.com"
+
+
+def test_isbn_change_updates_the_indexes(client, admin_headers):
+    book = create_book(client, admin_headers)
+    old_isbn, isbn = book["ISBN"], new_isbn()
+    response = client.patch(f"/books/{book['id']}", json={"ISBN": isbn}, headers=admin_headers)
+    assert response.status_code == 200
+
+    found = client.get("/books/search", params={"q": old_isbn}, headers=admin_headers).json()
+    assert book["id"] not in [result["id"] for result in found]
+    found = client.get("/books/search", params={"q": isbn}, headers=admin_headers).json()
+    assert [result["id"] for result in found] == [book["id"]]
+
+    assert books.get_by("ISBN", old_isbn) is None
+    assert books.get_by("ISBN", isbn)["id"] == book["id"]
+    # L'ancien ISBN est de nouveau disponible
+    assert client.post("/books/", json=new_book(ISBN=old_isbn), headers=admin_headers).status_code == 201
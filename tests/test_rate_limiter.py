@@ -0,0 +1,169 @@
+import asyncio
+import time
+
+import fakeredis
+import pytest
+from fastapi import HTTPException
+
+from utils.rate_limiter import MemoryBackend, RateLimit, RateLimiter, RedisBackend, SlidingWindowCounter, TokenBucket
+
+ALGORITHMS = [TokenBucket, SlidingWindowCounter]
+
+
+# Horloge contrôlée par le test (backend en mémoire)
+class FakeClock:
+    def __init__(self, now: float = 0.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+# Nombre de requêtes acceptées puis Retry-After de la première requête refusée
+async def exhaust(limiter: RateLimiter, key: str, attempts: int):
+    allowed = 0
+    for _ in range(attempts):
+        try:
+            await limiter.check(key)
+        except HTTPException as error:
+            assert error.status_code == 429
+            return allowed, int(error.headers["Retry-After"])
+        allowed += 1
+    return allowed, None
+
+
+# Backend en mémoire
+
+@pytest.mark.parametrize("algorithm", ALGORITHMS)
+def test_memory_allows_up_to_limit_then_denies(algorithm):
+    clock = FakeClock(120.0)  # Début d'une fenêtre de 60 s
+    limiter = RateLimiter(RateLimit(3, 60), algorithm.name, MemoryBackend(clock=clock))
+    allowed, retry_after = asyncio.run(exhaust(limiter, "cle", 10))
+    assert allowed == 3
+    # Seau : 1 jeton toutes les 20 s ; fenêtre : fin de la fenêtre courante
+    assert retry_after == (20 if algorithm is TokenBucket else 60)
+
+
+def test_memory_token_bucket_refills_over_time():
+    clock = FakeClock()
+    backend = MemoryBackend(clock=clock)
+    limit = RateLimit(3, 1)
+    waits = [asyncio.run(backend.hit("cle", limit, TokenBucket)) for _ in range(4)]
+    assert waits[:3] == [0.0, 0.0, 0.0]
+    assert waits[3] == pytest.approx(1 / 3)
+    clock.now += 1 / 3
+    assert asyncio.run(backend.hit("cle", limit, TokenBucket)) == 0.0
+
+
+def test_memory_sliding_window_weights_previous_window():
+    clock = FakeClock(120.0)
+    backend = MemoryBackend(clock=clock)
+    limit = RateLimit(3, 60)
+    for _ in range(3):
+        assert asyncio.run(backend.hit("cle", limit, SlidingWindowCounter)) == 0.0
+    # Milieu de la fenêtre suivante : 3 * 0.5 requêtes estimées, une place libre
+    clock.now = 210.0
+    assert asyncio.run(backend.hit("cle", limit, SlidingWindowCounter)) == 0.0
+    wait = asyncio.run(backend.hit("cle", limit, SlidingWindowCounter))
+    assert wait == pytest.approx(10.0)  # (1 - 1/3) * 60 - 30
+
+
+@pytest.mark.parametrize("algorithm", ALGORITHMS)
+def test_memory_evicts_idle_keys(algorithm):
+    clock = FakeClock(120.0)
+    backend = MemoryBackend(clock=clock)
+    limit = RateLimit(3, 60)
+    asyncio.run(backend.hit("inactive", limit, algorithm))
+    clock.now += 2 * limit.seconds + 1
+    asyncio.run(backend.hit("active", limit, algorithm))
+    assert len(backend) == 1
+    # La clé évincée repart de zéro
+    assert asyncio.run(backend.hit("inactive", limit, algorithm)) == 0.0
+
+
+@pytest.mark.parametrize("algorithm", ALGORITHMS)
+def test_memory_max_keys_evicts_least_recently_used(algorithm):
+    backend = MemoryBackend(max_keys=3, clock=FakeClock(120.0))
+    limit = RateLimit(1, 60)
+    for key in ("a", "b", "c", "d"):
+        asyncio.run(backend.hit(key, limit, algorithm))
+    assert len(backend) == 3
+    # "a" a été évincée : sa limite est de nouveau disponible, pas celle de "d"
+    assert asyncio.run(backend.hit("a", limit, algorithm)) == 0.0
+    assert asyncio.run(backend.hit("d", limit, algorithm)) > 0
+
+
+# Backend Redis (scripts Lua exécutés par fakeredis)
+
+def run_redis(test):
+    async def main():
+        redis = fakeredis.FakeAsyncRedis()
+        try:
+            await test(redis, RedisBackend(redis))
+        finally:
+            await redis.aclose()
+    asyncio.run(main())
+
+
+@pytest.mark.parametrize("algorithm", ALGORITHMS)
+def test_redis_allows_up_to_limit_then_denies(algorithm):
+    async def test(redis, backend):
+        limiter = RateLimiter(RateLimit(3, 60), algorithm.name, backend)
+        allowed, retry_after = await exhaust(limiter, "cle", 10)
+        assert allowed == 3
+        if algorithm is TokenBucket:
+            assert retry_after == 20
+        else:
+            # Fin de la fenêtre de 60 s courante (horloge du serveur Redis)
+            remaining = 60 - time.time() % 60
+            assert remaining - 1 <= retry_after <= remaining + 1
+    run_redis(test)
+
+
+@pytest.mark.parametrize("algorithm", ALGORITHMS)
+def test_redis_wait_matches_memory_backend(algorithm):
+    async def test(redis, backend):
+        limit = RateLimit(3, 1)
+        waits = [await backend.hit("cle", limit, algorithm) for _ in range(4)]
+        assert waits[:3] == [0.0, 0.0, 0.0]
+        assert 0 < waits[3] <= 1.0
+        if algorithm is TokenBucket:
+            assert waits[3] == pytest.approx(1 / 3, abs=0.01)
+    run_redis(test)
+
+
+@pytest.mark.parametrize("algorithm", ALGORITHMS)
+def test_redis_keys_are_limited_independently(algorithm):
+    async def test(redis, backend):
+        limiter = RateLimiter(RateLimit(1, 60), algorithm.name, backend)
+        await limiter.check("a")
+        await limiter.check("b")
+        with pytest.raises(HTTPException):
+            await limiter.check("a")
+    run_redis(test)
+
+
+# Redis n'a pas de plafond max_keys : chaque clé expire (PEXPIRE) après une
+# période d'inactivité, ce qui borne le nombre de clés au nombre de clés actives
+@pytest.mark.parametrize("algorithm", ALGORITHMS)
+def test_redis_evicts_idle_keys(algorithm):
+    async def test(redis, backend):
+        limit = RateLimit(1, 0.2)
+        await backend.hit("cle", limit, algorithm)
+        key = f"rate-limit:{algorithm.name}:cle"
+        ttl = await redis.pttl(key)
+        assert 0 < ttl <= (200 if algorithm is TokenBucket else 400)
+        await asyncio.sleep(ttl / 1000 + 0.05)
+        assert await redis.exists(key) == 0
+        assert await backend.hit("cle", limit, algorithm) == 0.0
+    run_redis(test)
+
+
+def test_redis_clear_removes_only_prefixed_keys():
+    async def test(redis, backend):
+        await redis.set("autre", 1)
+        await backend.hit("cle", RateLimit(1, 60), TokenBucket)
+        await backend.clear()
+        assert await redis.keys("rate-limit:*") == []
+        assert await redis.exists("autre") == 1
+    run_redis(test)
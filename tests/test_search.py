@@ -0,0 +1,23 @@
+from utils.search import SearchIndex
+
+
+def search_titles(client, headers, q):
+    response = client.get("/books/search", params={"q": q, "limit": 100}, headers=headers)
+    assert response.status_code == 200
+    return [book["titre"] for book in response.json()]
+
+
+def test_short_terms_match_inside_words(client, api_headers):
+    assert "Harry Potter" in search_titles(client, api_headers, "ar")
+    assert search_titles(client, api_headers, "84")[0] == "1984"
+    assert "Le Petit Prince" in search_titles(client, api_headers, "x")  # Saint-Exupéry
+
+
+def test_short_terms_rank_below_prefix_matches():
+    index = SearchIndex(fields={"titre": 1})
+    index.add(1, {"titre": "Le Phare"})
+    index.add(2, {"titre": "Ar Men"})
+    index.add(3, {"titre": "Arbre"})
+    index.add(4, {"titre": "Nuit"})
+    assert index.search("ar") == ([2, 3, 1], 3)
+    assert index.search("men a") == ([2], 1)
@@ -0,0 +1,44 @@
+import asyncio
+
+import pytest
+
+from utils.repository import Repository
+from utils.storage import Storage, StorageLockedError
+
+
+def open_books(storage: Storage) -> Repository:
+    repo = Repository(unique_fields=["ISBN"])
+    repo.attach(storage, "books")
+    return repo
+
+
+# Deux workers sur la même base attribueraient le même ID : le second ne peut pas l'ouvrir
+def test_second_process_cannot_open_database(tmp_path):
+    path = str(tmp_path / "books.db")
+    storage = Storage(path)
+    try:
+        with pytest.raises(StorageLockedError):
+            Storage(path)
+    finally:
+        storage.close()
+
+
+def test_database_reopens_after_close_with_ids_preserved(tmp_path):
+    path = str(tmp_path / "books.db")
+    storage = Storage(path)
+    repo = open_books(storage)
+    first = repo.add({"ISBN": "a"})
+    asyncio.run(repo.sync())
+    storage.close()
+
+    storage = Storage(path)
+    repo = open_books(storage)
+    second = repo.add({"ISBN": "b"})
+    asyncio.run(repo.sync())
+    storage.close()
+
+    storage = Storage(path)
+    reloaded = open_books(storage)
+    storage.close()
+    assert second["id"] == first["id"] + 1
+    assert [row["ISBN"] for row in reloaded] == ["a", "b"]
@@ -0,0 +1,182 @@
+import asyncio
+from heapq import heappop, heappush
+import itertools
+from math import ceil
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Pattern, Tuple
+
+from starlette.responses import JSONResponse
+from starlette.routing import compile_path
+
+
+# Classe d'admission : priorité (0 = la plus haute), nombre maximal de requêtes
+# simultanées, taille de la file d'attente et attente maximale (secondes)
+class AdmissionClass(NamedTuple):
+    name: str
+    priority: int
+    concurrency: int
+    max_queue: int
+    max_wait: float
+
+
+# Requête en attente d'admission (triée par priorité puis par ordre d'arrivée)
+class _Waiter(NamedTuple):
+    priority: int
+    sequence: int
+    admission_class: AdmissionClass
+    future: asyncio.Future
+
+
+# Contrôle d'admission : une capacité globale (requêtes traitées simultanément)
+# partagée entre des classes de requêtes, chacune avec sa propre limite de
+# concurrence. Quand aucune place n'est disponible, la requête attend dans une
+# file bornée ; les places libérées sont attribuées par ordre de priorité. Une
+# requête qui n'est pas admise avant son échéance (ou si la file est pleine)
+# est rejetée immédiatement (503 avec Retry-After) plutôt que de s'accumuler.
+# Les routes exemptées (abonnements de longue durée) ne prennent aucune place
+class AdmissionController:
+    def __init__(self, classes: Iterable[AdmissionClass], capacity: int, rules: Dict[str, str],
+                 default: str = "default", enabled: bool = True, exempt: Iterable[str] = ()):
+        self.classes = {admission_class.name: admission_class for admission_class in classes}
+        self.capacity = capacity
+        self.default = self.classes[default]
+        self.enabled = enabled
+        # Règles "MÉTHODE /modèle/{param}" -> classe, compilées en expressions régulières
+        self._rules: List[Tuple[str, Pattern, AdmissionClass]] = []
+        for rule, name in rules.items():
+            method, _, path = rule.partition(" ")
+            self._rules.append((method, compile_path(path)[0], self.classes[name]))
+        self._exempt = [(method, compile_path(path)[0]) for method, _, path in (rule.partition(" ") for rule in exempt)]
+        self._running = 0
+        self._active = {name: 0 for name in self.classes}
+        self._queued = {name: 0 for name in self.classes}
+        self._waiters: List[_Waiter] = []
+        self._sequence = itertools.count()
+        self.admitted = {name: 0 for name in self.classes}
+        self.rejected = {name: 0 for name in self.classes}
+
+    # Classe d'admission d'une requête (None si la route est exemptée)
+    def classify(self, method: str, path: str) -> Optional[AdmissionClass]:
+        for rule_method, pattern in self._exempt:
+            if rule_method == method and pattern.match(path):
+                return None
+        for rule_method, pattern, admission_class in self._rules:
+            if rule_method == method and pattern.match(path):
+                return admission_class
+        return self.default
+
+    def _can_run(self, admission_class: AdmissionClass) -> bool:
+        return self._running < self.capacity and self._active[admission_class.name] < admission_class.concurrency
+
+    # Admettre une requête ; retourne False si elle est rejetée
+    async def acquire(self, admission_class: AdmissionClass) -> bool:
+        name = admission_class.name
+        # Admission immédiate si une place est libre et qu'aucune requête de
+        # priorité supérieure ou égale (et pouvant s'exécuter) n'attend déjà
+        if self._can_run(admission_class) and not any(
+                self._queued[other.name] and self._active[other.name] < other.concurrency
+                for other in self.classes.values() if other.priority <= admission_class.priority):
+            self._start(admission_class)
+            return True
+        if self._queued[name] >= admission_class.max_queue or admission_class.max_wait <= 0:
+            self.rejected[name] += 1
+            return False
+
+        future = asyncio.get_running_loop().create_future()
+        heappush(self._waiters, _Waiter(admission_class.priority, next(self._sequence), admission_class, future))
+        self._queued[name] += 1
+        try:
+            await asyncio.wait([future], timeout=admission_class.max_wait)
+        except BaseException:
+            # Requête annulée pendant l'attente (client déconnecté)
+            if future.done():
+                self.release(admission_class)
+            else:
+                future.cancel()
+                self._queued[name] -= 1
+            raise
+        if future.done():
+            return True
+        future.cancel()  # Échéance dépassée : la place ne lui sera pas attribuée
+        self._queued[name] -= 1
+        self.rejected[name] += 1
+        return False
+
+    def release(self, admission_class: AdmissionClass) -> None:
+        self._running -= 1
+        self._active[admission_class.name] -= 1
+        self._dispatch()
+
+    def _start(self, admission_class: AdmissionClass) -> None:
+        self._running += 1
+        self._active[admission_class.name] += 1
+        self.admitted[admission_class.name] += 1
+
+    # Attribuer les places libres aux requêtes en attente, par priorité ; une
+    # classe à sa limite de concurrence laisse passer les classes suivantes
+    def _dispatch(self) -> None:
+        skipped = []
+        while self._waiters and self._running < self.capacity:
+            waiter = heappop(self._waiters)
+            if waiter.future.done():
+                continue  # Requête expirée
+            if not self._can_run(waiter.admission_class):
+                skipped.append(waiter)
+                continue
+            self._queued[waiter.admission_class.name] -= 1
+            self._start(waiter.admission_class)
+            waiter.future.set_result(None)
+        for waiter in skipped:
+            heappush(self._waiters, waiter)
+
+    # Délai conseillé avant une nouvelle tentative (en secondes)
+    @staticmethod
+    def retry_after(admission_class: AdmissionClass) -> int:
+        return max(1, ceil(admission_class.max_wait))
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "enabled": self.enabled,
+            "capacity": self.capacity,
+            "running": self._running,
+            "classes": {
+                name: {
+                    "priority": admission_class.priority,
+                    "concurrency": admission_class.concurrency,
+                    "running": self._active[name],
+                    "queued": self._queued[name],
+                    "admitted": self.admitted[name],
+                    "rejected": self.rejected[name],
+                }
+                for name, admission_class in self.classes.items()
+            },
+        }
+
+
+# Middleware ASGI : admission avant tout traitement (lecture du corps,
+# dépendances, hachage) et libération de la place une fois la réponse envoyée
+class AdmissionMiddleware:
+    def __init__(self, app, controller: AdmissionController):
+        self.app = app
+        self.controller = controller
+
+    async def __call__(self, scope, receive, send) -> None:
+        controller = self.controller
+        if scope["type"] != "http" or not controller.enabled:
+            await self.app(scope, receive, send)
+            return
+        admission_class = controller.classify(scope["method"], scope["path"])
+        if admission_class is None:
+            await self.app(scope, receive, send)
+            return
+        if not await controller.acquire(admission_class):
+            response = JSONResponse(
+                {"detail": "Serveur surchargé, réessayez plus tard"},
+                status_code=503,
+                headers={"Retry-After": str(controller.retry_after(admission_class))},
+            )
+            await response(scope, receive, send)
+            return
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            controller.release(admission_class)
@@ -1,17 +1,28 @@
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
-from passlib.context import CryptContext
 from pydantic import BaseModel
 from datetime import datetime, timedelta
-from typing import Optional, List, Dict, Any
+from typing import Optional
 import jwt 
 import os
+from utils.repository import Repository
+from utils.password_hasher import PasswordHasher, hash_password, check_password
+from utils.token_cache import TokenCache
+from utils.metrics import instrument
 
 # Configuration pour le JWT
 SECRET_KEY = os.environ.get("JWT_SECRET_KEY", "09d25e094faa6ca2556c818166b7a9563b93f7099f6f0f4caa6cf63b88e8d3e7")
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 30
 
+# Configuration du pool de hachage des mots de passe (bcrypt hors boucle d'événements)
+PASSWORD_HASH_WORKERS = int(os.environ.get("PASSWORD_HASH_WORKERS", "0")) or None
+PASSWORD_HASH_MAX_PENDING = int(os.environ.get("PASSWORD_HASH_MAX_PENDING", "64"))
+PASSWORD_HASH_EXECUTOR = os.environ.get("PASSWORD_HASH_EXECUTOR", "thread")  # "thread" ou "process"
+
+# Taille du cache des tokens vérifiés (0 pour le désactiver)
+TOKEN_CACHE_SIZE = int(os.environ.get("TOKEN_CACHE_SIZE", "10000"))
+
 # Modèle pour le token
 class Token(BaseModel):
     access_token: str
@@ -29,35 +40,58 @@ class UserInDB(BaseModel):
     role: str
     mot_de_passe: str
 
-# Contexte pour le hachage des mots de passe
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Service de hachage des mots de passe partagé par l'application
+password_hasher = PasswordHasher(
+    max_workers=PASSWORD_HASH_WORKERS,
+    max_pending=PASSWORD_HASH_MAX_PENDING,
+    use_processes=PASSWORD_HASH_EXECUTOR == "process",
+)
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
 
-# Vérifier si un mot de passe correspond à son hachage
+# Cache des tokens vérifiés et des utilisateurs correspondants
+token_cache = TokenCache(max_size=TOKEN_CACHE_SIZE)
+
+# Vérifier si un mot de passe correspond à son hachage (appel bloquant)
 def verify_password(plain_password, hashed_password):
-    return pwd_context.verify(plain_password, hashed_password)
+    return check_password(plain_password, hashed_password)
 
-# Hacher un mot de passe
+# Hacher un mot de passe (appel bloquant)
 def get_password_hash(password):
-    return pwd_context.hash(password)
+    return hash_password(password)
+
+# Versions asynchrones exécutées dans le pool de hachage
+@instrument("password_verify")
+async def verify_password_async(plain_password, hashed_password):
+    return await password_hasher.verify(plain_password, hashed_password)
+
+@instrument("password_hash")
+async def get_password_hash_async(password):
+    return await password_hasher.hash(password)
+
+async def get_password_hashes_async(passwords):
+    return await password_hasher.hash_many(passwords)
 
 # Récupérer un utilisateur par son email
-def get_user(db: List[Dict[str, Any]], username: str) -> Optional[UserInDB]:
-    for user in db:
-        if user["email"] == username:
-            return UserInDB(
-                id=user["id"],
-                nom=user["nom"],
-                email=user["email"],
-                role=user["role"],
-                mot_de_passe=user["mot_de_passe"]
-            )
-    return None
+def get_user(db: Repository, username: str) -> Optional[UserInDB]:
+    user = db.get_by("email", username)  # Recherche en O(1) via l'index sur l'email
+    if user is None:
+        return None
+    return user_in_db(user)
+
+# Construire un UserInDB à partir d'un enregistrement utilisateur
+def user_in_db(user: dict) -> UserInDB:
+    return UserInDB(
+        id=user["id"],
+        nom=user["nom"],
+        email=user["email"],
+        role=user["role"],
+        mot_de_passe=user["mot_de_passe"]
+    )
 
 # Authentifier un utilisateur
-def authenticate_user(db: List[Dict[str, Any]], username: str, password: str) -> Optional[UserInDB]:
+async def authenticate_user(db: Repository, username: str, password: str) -> Optional[UserInDB]:
     user = get_user(db, username)
-    if not user or not verify_password(password, user.mot_de_passe):
+    if not user or not await verify_password_async(password, user.mot_de_passe):
         return None
     return user
 
@@ -75,9 +109,25 @@ _users_reference = None
 def set_users_reference(users_ref):
     global _users_reference
     _users_reference = users_ref
+    token_cache.clear()
+
+# Invalider les tokens en cache d'un utilisateur (à appeler après un changement
+# de rôle ou de mot de passe)
+def invalidate_user_tokens(email: str):
+    token_cache.invalidate_user(email)
+
+# Une entrée du cache reste valide tant que l'enregistrement de l'utilisateur
+# n'a pas été remplacé ou supprimé dans le dépôt
+def _is_current(entry) -> bool:
+    return _users_reference is not None and _users_reference.get(entry.user.id) is entry.row
 
 # Récupérer l'utilisateur actuel à partir du token
+@instrument("get_current_user")
 async def get_current_user(token: str = Depends(oauth2_scheme)):
+    cached = token_cache.get(token, validate=_is_current)
+    if cached is not None:
+        return cached.user
+
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Impossible de valider les identifiants",
@@ -98,12 +148,15 @@ async def get_current_user(token: str = Depends(oauth2_scheme)):
     if _users_reference is None:
         raise HTTPException(status_code=500, detail="User reference not initialized")
         
-    user = get_user(_users_reference, username=token_data.username)
-    if user is None:
+    row = _users_reference.get_by("email", token_data.username)
+    if row is None:
         raise credentials_exception
+    user = user_in_db(row)
+    token_cache.put(token, payload, user, row, user_key=user.email)
     return user
 
 # Vérifier si l'utilisateur est administrateur
+@instrument("check_admin_role")
 async def check_admin_role(current_user: UserInDB = Depends(get_current_user)):
     if current_user.role != "admin":
         raise HTTPException(status_code=403, detail="Permissions insuffisantes")
@@ -0,0 +1,114 @@
+import csv
+import json
+from typing import Any, AsyncIterator, Dict, List, Tuple, Type
+
+from fastapi import Request
+from pydantic import BaseModel, TypeAdapter, ValidationError
+from utils.streaming import CSV_MEDIA_TYPE
+
+BATCH_SIZE = 1000
+MAX_REPORTED_ERRORS = 1000  # Au-delà, seules les erreurs sont comptées
+
+# Mode d'import : tout ou rien, ou rapport d'erreurs ligne par ligne
+MODE_ATOMIC = "atomic"
+MODE_PARTIAL = "partial"
+
+
+# Ligne rejetée lors d'un import (numéro de ligne et motifs)
+def row_error(line: int, errors: List[str]) -> Dict[str, Any]:
+    return {"line": line, "errors": errors}
+
+
+# Rapport d'import : nombre de lignes créées et erreurs (liste bornée)
+class ImportReport:
+    def __init__(self):
+        self.created = 0
+        self.error_count = 0
+        self.errors: List[Dict[str, Any]] = []
+
+    def add_errors(self, errors: List[Dict[str, Any]]) -> None:
+        self.error_count += len(errors)
+        errors = sorted(errors, key=lambda error: error["line"])
+        self.errors += errors[:max(0, MAX_REPORTED_ERRORS - len(self.errors))]
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {"created": self.created, "error_count": self.error_count, "errors": self.errors}
+
+
+# Découper le corps de la requête en lignes au fil de la réception
+async def iter_lines(request: Request) -> AsyncIterator[str]:
+    buffer = b""
+    async for chunk in request.stream():
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            yield line.decode("utf-8").rstrip("\r")
+    if buffer:
+        yield buffer.decode("utf-8").rstrip("\r")
+
+
+# Lire les enregistrements d'un corps NDJSON ou CSV (selon le Content-Type).
+# Produit des tuples (numéro de ligne, enregistrement ou None, erreur)
+async def iter_records(request: Request) -> AsyncIterator[Tuple[int, Any, str]]:
+    lines = iter_lines(request)
+    if CSV_MEDIA_TYPE in request.headers.get("content-type", ""):
+        header = None
+        line_number = 0
+        async for line in lines:
+            line_number += 1
+            if not line.strip():
+                continue
+            values = next(csv.reader([line]))
+            if header is None:
+                header = values
+                continue
+            # Les cellules vides correspondent aux champs facultatifs absents
+            record = {key: value for key, value in zip(header, values) if value != ""}
+            yield line_number, record, None
+        return
+
+    line_number = 0
+    async for line in lines:
+        line_number += 1
+        if not line.strip():
+            continue
+        try:
+            yield line_number, json.loads(line), None
+        except json.JSONDecodeError:
+            yield line_number, None, "JSON invalide"
+
+
+# Regrouper les enregistrements par lots
+async def iter_batches(records: AsyncIterator[Tuple[int, Any, str]], size: int = BATCH_SIZE) -> AsyncIterator[List[Tuple[int, Any, str]]]:
+    batch = []
+    async for record in records:
+        batch.append(record)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+# Validation d'un lot avec un TypeAdapter (un seul appel à pydantic-core pour
+# tout le lot). Retourne les modèles valides (numéro de ligne, modèle) et les erreurs
+class BatchValidator:
+    def __init__(self, model: Type[BaseModel]):
+        self.adapter = TypeAdapter(List[model])
+
+    def validate(self, batch: List[Tuple[int, Any, str]]) -> Tuple[List[Tuple[int, BaseModel]], List[Dict[str, Any]]]:
+        errors = [row_error(line, [error]) for line, _, error in batch if error is not None]
+        rows = [(line, record) for line, record, error in batch if error is None]
+        try:
+            models = self.adapter.validate_python([record for _, record in rows])
+            return [(line, model) for (line, _), model in zip(rows, models)], errors
+        except ValidationError as exc:
+            messages: Dict[int, List[str]] = {}
+            for error in exc.errors():
+                index, *location = error["loc"]
+                field = ".".join(str(part) for part in location)
+                messages.setdefault(index, []).append(f"{field}: {error['msg']}" if field else error["msg"])
+        errors += [row_error(rows[index][0], found) for index, found in messages.items()]
+        valid = [row for index, row in enumerate(rows) if index not in messages]
+        models = self.adapter.validate_python([record for _, record in valid])
+        return [(line, model) for (line, _), model in zip(valid, models)], errors
@@ -0,0 +1,347 @@
+from collections import Counter
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # NumPy est facultatif : repli sur un parcours du dépôt
+    np = None
+
+# Clés de tri acceptées par les requêtes filtrées
+SORT_KEYS = ("id", "annee", "auteur", "genre")
+# Champs stockés dans les colonnes (une modification des autres champs ne les concerne pas)
+CATALOGUE_FIELDS = ("annee", "genre", "auteur")
+
+
+# Filtres d'une requête sur le catalogue (None : pas de filtre)
+class CatalogueQuery:
+    __slots__ = ("genre", "auteur", "annee_min", "annee_max", "after_id", "sort", "descending")
+
+    def __init__(self, genre: Optional[str] = None, auteur: Optional[str] = None, annee_min: Optional[int] = None,
+                 annee_max: Optional[int] = None, after_id: Optional[int] = None, sort: str = "id", descending: bool = False):
+        self.genre = genre
+        self.auteur = auteur
+        self.annee_min = annee_min
+        self.annee_max = annee_max
+        self.after_id = after_id  # Curseur (livres d'ID supérieur uniquement)
+        self.sort = sort
+        self.descending = descending
+
+    def matches(self, book: Dict[str, Any]) -> bool:
+        if self.after_id is not None and book["id"] <= self.after_id:
+            return False
+        if self.genre is not None and book.get("genre") != self.genre:
+            return False
+        if self.auteur is not None and book.get("auteur") != self.auteur:
+            return False
+        if self.annee_min is not None or self.annee_max is not None:
+            annee = book.get("annee")
+            if annee is None:
+                return False
+            if self.annee_min is not None and annee < self.annee_min:
+                return False
+            if self.annee_max is not None and annee > self.annee_max:
+                return False
+        return True
+
+
+# Comptages par valeur (genres) et par décennie des livres d'une requête
+def facet_counts(genres: Dict[Any, int], decades: Dict[int, int], genre_values: Sequence[str], total: int) -> Dict[str, Any]:
+    return {
+        "total": total,
+        "genre": {value: genres.get(value, 0) for value in genre_values},
+        "decade": {str(decade): count for decade, count in sorted(decades.items())},
+    }
+
+
+# Dictionnaire de valeurs (encodage par dictionnaire) : chaque valeur distincte
+# reçoit un code entier ; le rang de chaque code dans l'ordre trié des valeurs
+# sert aux tris et est recalculé uniquement quand une valeur est ajoutée
+class ValueDictionary:
+    def __init__(self, values: Iterable[str] = ()):
+        self.values: List[str] = []
+        self.codes: Dict[str, int] = {}
+        self._ranks = None
+        for value in values:
+            self.encode(value)
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    def encode(self, value: Optional[str]) -> int:
+        if value is None:
+            return -1
+        code = self.codes.get(value)
+        if code is None:
+            code = self.codes[value] = len(self.values)
+            self.values.append(value)
+            self._ranks = None
+        return code
+
+    def lookup(self, value: str) -> Optional[int]:
+        return self.codes.get(value)
+
+    # Rang de chaque code dans l'ordre alphabétique (le code -1 "absent" est trié en premier)
+    def ranks(self):
+        if self._ranks is None:
+            order = sorted(range(len(self.values)), key=self.values.__getitem__)
+            ranks = np.empty(len(self.values) + 1, dtype=np.int64)
+            ranks[-1] = -1
+            ranks[np.array(order, dtype=np.int64)] = np.arange(len(order), dtype=np.int64)
+            self._ranks = ranks
+        return self._ranks
+
+
+# Catalogue en colonnes : un tableau NumPy par attribut filtrable (ID, année,
+# genre et auteur encodés par dictionnaire) et un masque des lignes actives.
+# Les lignes sont triées par ID (IDs attribués de façon croissante), la position
+# d'un livre est donc retrouvée par recherche dichotomique. Les suppressions
+# laissent une ligne inactive, compactée quand elles deviennent majoritaires.
+# Les filtres et les comptages sont des opérations vectorisées sur ces colonnes.
+# Associé à un dépôt (Repository(columns=...)), il est la seule copie des champs
+# CATALOGUE_FIELDS : materialize reconstitue les livres complets (champs du
+# dépôt suivis de annee, genre et auteur)
+class ColumnarCatalogue:
+    def __init__(self, genre_values: Sequence[str] = (), capacity: int = 1024):
+        self.fields = CATALOGUE_FIELDS
+        self.genre_values = list(genre_values)
+        self.genres = ValueDictionary(genre_values)
+        self.authors = ValueDictionary()
+        self._size = 0
+        self._dead = 0
+        self._allocate(capacity)
+
+    def __len__(self) -> int:
+        return self._size - self._dead
+
+    def _allocate(self, capacity: int) -> None:
+        columns = {"_ids": np.int64, "_annee": np.int16, "_genre": np.int16, "_auteur": np.int32, "_alive": np.bool_}
+        for name, dtype in columns.items():
+            column = np.zeros(capacity, dtype=dtype)
+            if self._size:
+                column[:self._size] = getattr(self, name)[:self._size]
+            setattr(self, name, column)
+
+    def _reserve(self, count: int) -> None:
+        if self._size + count > len(self._ids):
+            self._allocate(max(2 * len(self._ids), self._size + count))
+
+    def nbytes(self) -> int:
+        return sum(column[:self._size].nbytes for column in (self._ids, self._annee, self._genre, self._auteur, self._alive))
+
+    def _position(self, book_id: int) -> Optional[int]:
+        position = int(np.searchsorted(self._ids[:self._size], book_id))
+        if position < self._size and self._ids[position] == book_id and self._alive[position]:
+            return position
+        return None
+
+    def _encode(self, book: Dict[str, Any]) -> Tuple[int, int, int, int]:
+        annee = book.get("annee")
+        return book["id"], annee or 0, self.genres.encode(book.get("genre")), self.authors.encode(book.get("auteur"))
+
+    # Ajouter des livres (ou remplacer ceux déjà présents) en une seule passe
+    def add_many(self, books: Iterable[Dict[str, Any]]) -> None:
+        rows = [self._encode(book) for book in books]
+        if not rows:
+            return
+        last_id = self._ids[self._size - 1] if self._size else 0
+        if all(row[0] > last_id for row in rows) and all(a[0] < b[0] for a, b in zip(rows, rows[1:])):
+            # Cas courant : nouveaux IDs croissants, ajoutés en fin de colonnes
+            self._reserve(len(rows))
+            end = self._size + len(rows)
+            ids, annees, genres, auteurs = zip(*rows)
+            self._ids[self._size:end] = ids
+            self._annee[self._size:end] = annees
+            self._genre[self._size:end] = genres
+            self._auteur[self._size:end] = auteurs
+            self._alive[self._size:end] = True
+            self._size = end
+            return
+        for row in rows:
+            self._set(row)
+
+    def add(self, book: Dict[str, Any]) -> None:
+        self.add_many([book])
+
+    def _set(self, row: Tuple[int, int, int, int]) -> None:
+        book_id = row[0]
+        position = int(np.searchsorted(self._ids[:self._size], book_id))
+        if position < self._size and self._ids[position] == book_id:
+            if not self._alive[position]:
+                self._dead -= 1
+        else:
+            # ID inférieur au dernier : insertion au milieu (cas rare)
+            self._reserve(1)
+            for column in (self._ids, self._annee, self._genre, self._auteur, self._alive):
+                column[position + 1:self._size + 1] = column[position:self._size]
+            self._size += 1
+        self._ids[position], self._annee[position], self._genre[position], self._auteur[position] = row
+        self._alive[position] = True
+
+    def remove(self, book_id: int) -> None:
+        position = self._position(book_id)
+        if position is None:
+            return
+        self._alive[position] = False
+        self._dead += 1
+        if self._dead > self._size // 2:
+            self._compact()
+
+    def clear(self) -> None:
+        self.authors = ValueDictionary()
+        self._size = 0
+        self._dead = 0
+
+    # Livre complet à partir de l'enregistrement du dépôt (sans les champs des colonnes)
+    def materialize(self, record: Dict[str, Any]) -> Dict[str, Any]:
+        position = self._position(record["id"])
+        if position is None:
+            return {**record, "annee": None, "genre": None, "auteur": None}
+        genre, auteur = int(self._genre[position]), int(self._auteur[position])
+        return {**record, "annee": int(self._annee[position]) or None,
+                "genre": self.genres.values[genre] if genre >= 0 else None,
+                "auteur": self.authors.values[auteur] if auteur >= 0 else None}
+
+    # Même chose pour une suite d'enregistrements, avec une seule recherche
+    # vectorisée (un livre absent des colonnes reçoit des valeurs None)
+    def materialize_many(self, records: Sequence[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        if not records:
+            return []
+        ids = np.fromiter((record["id"] for record in records), dtype=np.int64, count=len(records))
+        positions = np.minimum(np.searchsorted(self._ids[:self._size], ids), max(self._size - 1, 0))
+        found = (self._ids[positions] == ids) & self._alive[positions]
+        genre_values, author_values = self.genres.values, self.authors.values
+        annees = np.where(found, self._annee[positions], 0).tolist()
+        genres = np.where(found, self._genre[positions], -1).tolist()
+        auteurs = np.where(found, self._auteur[positions], -1).tolist()
+        # Le code -1 désigne une valeur absente
+        return [{**record, "annee": annee or None, "genre": genre_values[genre] if genre >= 0 else None,
+                 "auteur": author_values[auteur] if auteur >= 0 else None}
+                for record, annee, genre, auteur in zip(records, annees, genres, auteurs)]
+
+    def _compact(self) -> None:
+        alive = self._alive[:self._size].copy()
+        count = int(alive.sum())
+        for name in ("_ids", "_annee", "_genre", "_auteur", "_alive"):
+            column = getattr(self, name)
+            column[:count] = column[:self._size][alive]
+        self._size = count
+        self._dead = 0
+
+    def _mask(self, query: CatalogueQuery):
+        mask = self._alive[:self._size].copy()
+        if query.after_id is not None:
+            mask &= self._ids[:self._size] > query.after_id
+        if query.genre is not None:
+            code = self.genres.lookup(query.genre)
+            if code is None:
+                return None
+            mask &= self._genre[:self._size] == code
+        if query.auteur is not None:
+            code = self.authors.lookup(query.auteur)
+            if code is None:
+                return None
+            mask &= self._auteur[:self._size] == code
+        if query.annee_min is not None or query.annee_max is not None:
+            annee = self._annee[:self._size]
+            mask &= annee != 0  # Année inconnue
+            if query.annee_min is not None:
+                mask &= annee >= query.annee_min
+            if query.annee_max is not None:
+                mask &= annee <= query.annee_max
+        return mask
+
+    # Clé de tri entière de chaque position (l'ID départage les égalités)
+    def _sort_key(self, positions, query: CatalogueQuery):
+        if query.sort == "annee":
+            key = self._annee[positions].astype(np.int64)
+        elif query.sort == "auteur":
+            key = self.authors.ranks()[self._auteur[positions]]
+        else:
+            key = self.genres.ranks()[self._genre[positions]]
+        if query.descending:
+            key = key.max(initial=0) - key
+        return key * (int(self._ids[self._size - 1]) + 1) + self._ids[positions]
+
+    # IDs des livres correspondant à la requête (page demandée) et nombre total
+    def query(self, query: CatalogueQuery, limit: Optional[int] = None, offset: int = 0) -> Tuple[List[int], int]:
+        mask = self._mask(query)
+        if mask is None:
+            return [], 0
+        positions = np.flatnonzero(mask)
+        total = len(positions)
+        end = total if limit is None else min(total, offset + limit)
+        if offset >= end:
+            return [], total
+        if query.sort == "id":
+            selected = positions[::-1] if query.descending else positions
+            return self._ids[selected[offset:end]].tolist(), total
+        key = self._sort_key(positions, query)
+        if end < total:
+            # Seuls les "end" premiers éléments sont triés (sélection partielle en O(n))
+            candidates = np.argpartition(key, end - 1)[:end]
+        else:
+            candidates = np.arange(total)
+        order = candidates[np.argsort(key[candidates], kind="stable")]
+        return self._ids[positions[order[offset:end]]].tolist(), total
+
+    def facets(self, query: CatalogueQuery) -> Dict[str, Any]:
+        mask = self._mask(query)
+        if mask is None:
+            return facet_counts({}, {}, self.genre_values, 0)
+        genre_codes = self._genre[:self._size][mask]
+        counts = np.bincount(genre_codes[genre_codes >= 0], minlength=len(self.genres))
+        genres = {self.genres.values[code]: int(count) for code, count in enumerate(counts) if count}
+        annees = self._annee[:self._size][mask]
+        decade_counts = np.bincount(annees[annees != 0] // 10)
+        decades = {int(decade) * 10: int(decade_counts[decade]) for decade in np.flatnonzero(decade_counts)}
+        return facet_counts(genres, decades, self.genre_values, len(genre_codes))
+
+
+# Repli sans NumPy : même interface, requêtes par parcours complet du dépôt
+class ScanCatalogue:
+    def __init__(self, repository, genre_values: Sequence[str] = ()):
+        self.repository = repository
+        self.genre_values = list(genre_values)
+
+    def __len__(self) -> int:
+        return len(self.repository)
+
+    def query(self, query: CatalogueQuery, limit: Optional[int] = None, offset: int = 0) -> Tuple[List[int], int]:
+        books = [book for book in self.repository if query.matches(book)]
+        if query.sort != "id":
+            # Livres sans valeur en premier (en dernier par ordre décroissant), comme dans
+            # le catalogue en colonnes ; le tri stable conserve l'ordre des IDs à égalité
+            books.sort(key=lambda book: (book.get(query.sort) is not None, book.get(query.sort) or ""), reverse=query.descending)
+        elif query.descending:
+            books.reverse()
+        end = None if limit is None else offset + limit
+        return [book["id"] for book in books[offset:end]], len(books)
+
+    def facets(self, query: CatalogueQuery) -> Dict[str, Any]:
+        genres: Counter = Counter()
+        decades: Counter = Counter()
+        total = 0
+        for book in self.repository:
+            if not query.matches(book):
+                continue
+            total += 1
+            if book.get("genre") is not None:
+                genres[book["genre"]] += 1
+            if book.get("annee"):
+                decades[book["annee"] // 10 * 10] += 1
+        return facet_counts(genres, decades, self.genre_values, total)
+
+
+# Colonnes du catalogue à confier au dépôt si NumPy est disponible (None sinon :
+# les champs restent dans les enregistrements du dépôt)
+def build_columns(genre_values: Sequence[str] = ()) -> Optional["ColumnarCatalogue"]:
+    if np is None:
+        return None
+    return ColumnarCatalogue(genre_values)
+
+
+# Catalogue d'un dépôt : ses colonnes s'il en a, sinon parcours du dépôt
+def build_catalogue(repository, genre_values: Sequence[str] = ()):
+    if repository.columns is not None:
+        return repository.columns
+    return ScanCatalogue(repository, genre_values)
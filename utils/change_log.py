@@ -0,0 +1,100 @@
+import asyncio
+from collections import deque
+import os
+import time
+from typing import Any, AsyncIterator, Deque, Dict, List, NamedTuple, Optional
+
+# Nombre de modifications conservées (les plus anciennes sont compactées)
+CHANGE_LOG_SIZE = int(os.environ.get("CHANGE_LOG_SIZE", "10000"))
+
+
+# Modification journalisée : numéro de séquence, opération (put/delete), ID et
+# nouvel état de l'enregistrement (None pour une suppression)
+class Change(NamedTuple):
+    seq: int
+    op: str
+    id: int
+    data: Optional[Dict[str, Any]]
+
+    def as_dict(self, name: str) -> Dict[str, Any]:
+        return {"seq": self.seq, "op": self.op, "id": self.id, name: self.data}
+
+
+# Levée quand les modifications demandées ont été compactées : le client doit
+# refaire une synchronisation complète
+class ResyncRequired(Exception):
+    def __init__(self, since: int, oldest: int, latest: int):
+        super().__init__(f"Séquence {since} indisponible (journal de {oldest} à {latest})")
+        self.since = since
+        self.oldest = oldest
+        self.latest = latest
+
+
+# Journal borné des modifications d'une collection, numérotées de façon
+# croissante. La numérotation part de l'horloge (en microsecondes) au
+# démarrage : un curseur émis par un processus précédent est antérieur au
+# journal et déclenche une resynchronisation au lieu de manquer des modifications
+class ChangeLog:
+    def __init__(self, max_entries: int = CHANGE_LOG_SIZE):
+        self._entries: Deque[Change] = deque(maxlen=max_entries)
+        self.latest = time.time_ns() // 1000
+        self._first = self.latest + 1  # Plus petite séquence encore disponible
+        self._waiter: Optional[asyncio.Future] = None
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def append(self, op: str, item_id: int, data: Optional[Dict[str, Any]] = None) -> Change:
+        self.latest += 1
+        change = Change(self.latest, op, item_id, data)
+        if len(self._entries) == self._entries.maxlen:
+            self._first = self._entries[0].seq + 1
+        self._entries.append(change)
+        # Réveiller les abonnés en attente
+        if self._waiter is not None:
+            if not self._waiter.done():
+                self._waiter.set_result(None)
+            self._waiter = None
+        return change
+
+    # Modifications postérieures à "since" (au plus "limit")
+    def since(self, since: int, limit: Optional[int] = None) -> List[Change]:
+        if since < self._first - 1 or since > self.latest:
+            raise ResyncRequired(since, self._first - 1, self.latest)
+        count = self.latest - since
+        if limit is not None:
+            count = min(count, limit)
+        if not count:
+            return []
+        # Séquences contiguës : position calculée directement depuis la fin
+        start = len(self._entries) - (self.latest - since)
+        return [self._entries[index] for index in range(start, start + count)]
+
+    # Attendre une modification postérieure à "since" (ou l'expiration du délai)
+    async def wait(self, since: int, timeout: float) -> None:
+        if self.latest > since:
+            return
+        if self._waiter is None:
+            self._waiter = asyncio.get_running_loop().create_future()
+        try:
+            await asyncio.wait_for(asyncio.shield(self._waiter), timeout)
+        except asyncio.TimeoutError:
+            pass
+
+    # Suivre le journal à partir de "since" : lots de modifications dans l'ordre,
+    # ou liste vide après "keepalive" secondes sans modification. Lève
+    # ResyncRequired si l'abonné a pris trop de retard sur le journal
+    async def follow(self, since: int, keepalive: float, batch_size: int = 1000) -> AsyncIterator[List[Change]]:
+        while True:
+            changes = self.since(since, batch_size)
+            if changes:
+                since = changes[-1].seq
+                yield changes
+                continue
+            await self.wait(since, keepalive)
+            if self.latest == since:
+                yield []
+
+    def stats(self) -> Dict[str, Any]:
+        return {"entries": len(self._entries), "max_entries": self._entries.maxlen,
+                "oldest": self._first - 1, "latest": self.latest}
@@ -0,0 +1,219 @@
+import os
+import zlib
+from typing import Callable, Dict, List, Optional, Tuple
+
+try:
+    import brotli
+except ImportError:  # Brotli est facultatif
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:  # Zstandard est facultatif
+    zstandard = None
+
+# Compression des réponses : taille minimale du corps et niveaux par algorithme
+COMPRESSION_ENABLED = os.environ.get("COMPRESSION_ENABLED", "1") == "1"
+COMPRESSION_MIN_SIZE = int(os.environ.get("COMPRESSION_MIN_SIZE", "1024"))
+GZIP_LEVEL = int(os.environ.get("GZIP_LEVEL", "6"))
+BROTLI_QUALITY = int(os.environ.get("BROTLI_QUALITY", "5"))
+ZSTD_LEVEL = int(os.environ.get("ZSTD_LEVEL", "3"))
+
+# Types de contenu compressés (les autres sont transmis tels quels)
+COMPRESSIBLE_TYPES = ("application/json", "application/x-ndjson", "text/")
+# Flux d'événements : chaque événement doit partir immédiatement, sans tampon de compression
+STREAMED_TYPES = ("text/event-stream",)
+# Statuts sans corps (RFC 9110) : transmis tels quels, sans Content-Length ajouté
+BODYLESS_STATUSES = (204, 304)
+
+
+# Compresseur incrémental (réponses en flux) : compress(morceau) puis flush()
+class _ZlibStream:
+    def __init__(self, level: int):
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, 31)  # 31 : en-tête gzip
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.compress(data)
+
+    def flush(self) -> bytes:
+        return self._compressor.flush()
+
+
+class _BrotliStream:
+    def __init__(self, quality: int):
+        self._compressor = brotli.Compressor(quality=quality)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.process(data)
+
+    def flush(self) -> bytes:
+        return self._compressor.finish()
+
+
+class _ZstdStream:
+    def __init__(self, level: int):
+        self._compressor = zstandard.ZstdCompressor(level=level).compressobj()
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.compress(data)
+
+    def flush(self) -> bytes:
+        return self._compressor.flush()
+
+
+# Algorithme de compression : nom (Content-Encoding), compression d'un corps
+# complet et compresseur incrémental
+class Codec:
+    def __init__(self, name: str, compress: Callable[[bytes], bytes], stream: Callable[[], object]):
+        self.name = name
+        self.compress = compress
+        self.stream = stream
+
+
+def _available_codecs() -> Dict[str, Codec]:
+    codecs = {}
+    # Ordre de préférence du serveur, à qualité égale côté client
+    if zstandard is not None:
+        compressor = zstandard.ZstdCompressor(level=ZSTD_LEVEL)
+        codecs["zstd"] = Codec("zstd", compressor.compress, lambda: _ZstdStream(ZSTD_LEVEL))
+    if brotli is not None:
+        codecs["br"] = Codec("br", lambda data: brotli.compress(data, quality=BROTLI_QUALITY),
+                             lambda: _BrotliStream(BROTLI_QUALITY))
+    codecs["gzip"] = Codec("gzip", lambda data: _gzip(data, GZIP_LEVEL), lambda: _ZlibStream(GZIP_LEVEL))
+    return codecs
+
+
+def _gzip(data: bytes, level: int) -> bytes:
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+    return compressor.compress(data) + compressor.flush()
+
+
+CODECS = _available_codecs()
+
+
+# Choisir l'encodage d'après l'en-tête Accept-Encoding (valeurs q) ; None pour
+# ne pas compresser. À qualité égale, l'ordre de préférence du serveur s'applique
+def negotiate(accept_encoding: Optional[str], codecs: Dict[str, Codec] = CODECS) -> Optional[str]:
+    if not accept_encoding:
+        return None
+    qualities: Dict[str, float] = {}
+    for item in accept_encoding.split(","):
+        name, _, params = item.strip().partition(";")
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        qualities[name.strip().lower()] = quality
+    wildcard = qualities.get("*", 0.0)
+    best, best_quality = None, 0.0
+    for name in codecs:
+        quality = qualities.get(name, wildcard)
+        if quality > best_quality:
+            best, best_quality = name, quality
+    return best
+
+
+def is_compressible(content_type: str) -> bool:
+    return content_type.startswith(COMPRESSIBLE_TYPES) and not content_type.startswith(STREAMED_TYPES)
+
+
+# Middleware ASGI : compresse les réponses compressibles au-delà de la taille
+# minimale (corps complet ou en flux) selon l'encodage négocié. Les réponses
+# déjà compressées (corps en cache, voir utils/http_cache.py), sans corps
+# (1xx, 204, 304) ou vides sont transmises telles quelles
+class CompressionMiddleware:
+    def __init__(self, app, min_size: int = COMPRESSION_MIN_SIZE, codecs: Dict[str, Codec] = CODECS):
+        self.app = app
+        self.min_size = min_size
+        self.codecs = codecs
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http" or scope["method"] == "HEAD":
+            await self.app(scope, receive, send)
+            return
+        accept_encoding = None
+        for name, value in scope["headers"]:
+            if name == b"accept-encoding":
+                accept_encoding = value.decode("latin-1")
+                break
+        encoding = negotiate(accept_encoding, self.codecs)
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+        await _CompressedResponse(self.codecs[encoding], self.min_size, send)(self.app, scope, receive)
+
+
+# État d'une réponse en cours de compression
+class _CompressedResponse:
+    def __init__(self, codec: Codec, min_size: int, send):
+        self.codec = codec
+        self.min_size = min_size
+        self.send = send
+        self.start: Optional[dict] = None
+        self.stream = None
+        self.passthrough = False
+
+    async def __call__(self, app, scope, receive) -> None:
+        await app(scope, receive, self.on_message)
+
+    async def on_message(self, message) -> None:
+        if message["type"] == "http.response.start":
+            headers = {name.lower(): value for name, value in message.get("headers", ())}
+            content_type = headers.get(b"content-type", b"").decode("latin-1")
+            status = message["status"]
+            self.passthrough = (b"content-encoding" in headers or not is_compressible(content_type)
+                                or status < 200 or status in BODYLESS_STATUSES or headers.get(b"content-length") == b"0")
+            if self.passthrough:
+                await self.send(message)
+            else:
+                self.start = message  # Envoyé avec le premier morceau du corps
+            return
+        if message["type"] != "http.response.body" or self.passthrough:
+            await self.send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+        if self.stream is None and not more_body:
+            # Corps complet : compressé seulement au-delà de la taille minimale
+            if not body:
+                await self.send(self.start)
+            elif len(body) >= self.min_size:
+                body = self.codec.compress(body)
+                await self.send_start(self.start, len(body), self.codec.name)
+            else:
+                await self.send_start(self.start, len(body), None)
+            await self.send({"type": "http.response.body", "body": body})
+            return
+        if self.stream is None:
+            # Réponse en flux : compression incrémentale, sans Content-Length
+            self.stream = self.codec.stream()
+            await self.send_start(self.start, None, self.codec.name)
+        data = self.stream.compress(body)
+        if not more_body:
+            data += self.stream.flush()
+        if data or not more_body:
+            await self.send({"type": "http.response.body", "body": data, "more_body": more_body})
+
+    # En-têtes de la réponse : encodage choisi, longueur du corps transmis et
+    # Vary (la représentation dépend d'Accept-Encoding, même non compressée)
+    async def send_start(self, start: dict, length: Optional[int], encoding: Optional[str]) -> None:
+        headers: List[Tuple[bytes, bytes]] = []
+        vary = [b"Accept-Encoding"]
+        for name, value in start.get("headers", ()):
+            lowered = name.lower()
+            if lowered == b"vary":
+                vary.insert(0, value)
+            elif lowered != b"content-length":
+                headers.append((name, value))
+        if encoding is not None:
+            headers.append((b"content-encoding", encoding.encode("latin-1")))
+        if len(vary) > 1 and b"accept-encoding" in vary[0].lower():
+            vary.pop()  # Vary: Accept-Encoding déjà présent
+        headers.append((b"vary", b", ".join(vary)))
+        if length is not None:
+            headers.append((b"content-length", str(length).encode("latin-1")))
+        await self.send({**start, "headers": headers})
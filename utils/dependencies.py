@@ -1,33 +1,27 @@
-from fastapi import Header, HTTPException, Depends, Request
-from datetime import datetime, timedelta
-from typing import Dict, List, Tuple
+from fastapi import Header, HTTPException, Depends
+from fastapi.requests import HTTPConnection
+import os
+from utils.metrics import instrument
+from utils.rate_limiter import RateLimit, RateLimiter
 
-# Cache pour limiter le taux de requêtes
-request_cache: Dict[str, List[Tuple[str, datetime]]] = {}
+# Limiteur de débit global : 10 requêtes par minute et par clé API par défaut.
+# Algorithme configurable ("sliding_window" ou "token_bucket") ; le backend en
+# mémoire peut être remplacé par le backend Redis partagé au démarrage (voir main.py)
+RATE_LIMIT_ALGORITHM = os.environ.get("RATE_LIMIT_ALGORITHM", "sliding_window")
+RATE_LIMIT_REDIS_URL = os.environ.get("RATE_LIMIT_REDIS_URL")
+limiter = RateLimiter(default=RateLimit(times=10, seconds=60), algorithm=RATE_LIMIT_ALGORITHM)
 
 # Dépendance pour vérifier l'API-Key
+@instrument("verify_api_key")
 async def verify_api_key(api_key: str = Header(..., description="Clé API pour l'authentification")):
     if api_key != "my-secret-key":  # Vérification de la clé API
         raise HTTPException(status_code=403, detail="Clé API invalide")
     return api_key
 
-# Dépendance pour limiter le taux de requêtes
-async def rate_limit(request: Request, api_key: str = Depends(verify_api_key)):
-    now = datetime.now()
-    # Nettoyer les requêtes expirées
-    if api_key in request_cache:
-        request_cache[api_key] = [req for req in request_cache[api_key] 
-                                 if now - req[1] < timedelta(minutes=1)]
-    else:
-        request_cache[api_key] = []
-    
-    # Vérifier le nombre de requêtes
-    if len(request_cache[api_key]) >= 10:
-        raise HTTPException(
-            status_code=429, 
-            detail="Trop de requêtes. Limite: 10 requêtes par minute."
-        )
-    
-    # Enregistrer la nouvelle requête
-    request_cache[api_key].append((str(request.url), now))
-    return True
\ No newline at end of file
+# Dépendance pour limiter le taux de requêtes (limites par route et par clé API).
+# HTTPConnection : s'applique aussi à l'ouverture des connexions WebSocket
+@instrument("rate_limit")
+async def rate_limit(request: HTTPConnection, api_key: str = Depends(verify_api_key)):
+    route = request.scope.get("route")
+    await limiter.check(api_key, route.path if route is not None else None)
+    return True
@@ -0,0 +1,211 @@
+from collections import OrderedDict
+import os
+import secrets
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+from fastapi import HTTPException, Request, Response
+from utils.compression import CODECS, COMPRESSION_ENABLED, COMPRESSION_MIN_SIZE, negotiate
+from utils.serialization import RawJSONResponse
+
+# Taille du cache des réponses rendues (0 pour le désactiver), mémoire totale
+# de ses corps (compressés compris) et taille au-delà de laquelle un corps
+# n'est pas conservé
+RESPONSE_CACHE_SIZE = int(os.environ.get("RESPONSE_CACHE_SIZE", "1024"))
+RESPONSE_CACHE_MAX_BYTES = int(os.environ.get("RESPONSE_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+RESPONSE_CACHE_MAX_BODY = int(os.environ.get("RESPONSE_CACHE_MAX_BODY", str(4 * 1024 * 1024)))
+
+
+# Versions d'une ressource : une version de collection, incrémentée à chaque
+# écriture, et la version de chaque enregistrement (version de la collection
+# lors de sa dernière modification). L'époque (aléatoire, propre au processus)
+# évite qu'un ETag émis avant un redémarrage corresponde à d'autres données
+class ResourceVersions:
+    def __init__(self, name: str):
+        self.name = name
+        self.epoch = secrets.token_hex(4)
+        self.collection = 0
+        self._versions: Dict[int, int] = {}
+
+    # Enregistrer une écriture (sur un enregistrement ou sur la collection seule)
+    def bump(self, item_id: Optional[int] = None) -> int:
+        self.collection += 1
+        if item_id is not None:
+            self._versions[item_id] = self.collection
+        return self.collection
+
+    # Oublier la version d'un enregistrement supprimé (la collection change)
+    def discard(self, item_id: int) -> None:
+        self._versions.pop(item_id, None)
+        self.collection += 1
+
+    def of(self, item_id: int) -> int:
+        return self._versions.get(item_id, 0)
+
+    # ETag fort de la collection (listes, recherche) ou d'un enregistrement
+    def collection_etag(self) -> str:
+        return f'"{self.name}-{self.epoch}-{self.collection}"'
+
+    def item_etag(self, item_id: int) -> str:
+        return f'"{self.name}-{self.epoch}-{item_id}-{self.of(item_id)}"'
+
+
+# ETag d'une variante compressée : même version, encodage en suffixe
+def encoded_etag(etag: str, encoding: str) -> str:
+    return f'{etag[:-1]}+{encoding}"'
+
+
+# Un ETag désigne-t-il cette version (quel que soit l'encodage de la variante) ?
+def same_version(candidate: str, etag: str) -> bool:
+    return candidate == etag or (candidate.startswith(etag[:-1] + "+") and candidate[:-1].rpartition("+")[2] in CODECS)
+
+
+# ETag de l'en-tête If-None-Match qui correspond à cette version (comparaison
+# faible, comme le prévoit la RFC 9110), quel que soit l'encodage de la variante
+def matching_etag(request: Request, etag: str) -> Optional[str]:
+    header = request.headers.get("if-none-match")
+    if not header:
+        return None
+    if header.strip() == "*":
+        return etag
+    for candidate in header.split(","):
+        candidate = candidate.strip().removeprefix("W/")
+        if same_version(candidate, etag):
+            return candidate
+    return None
+
+
+# Précondition If-Match d'une écriture (comparaison forte) : 412 si le client
+# n'a pas lu la version actuelle de l'enregistrement. Sans en-tête, l'écriture
+# est acceptée (comportement inchangé pour les clients existants)
+def check_if_match(request: Request, etag: str) -> None:
+    header = request.headers.get("if-match")
+    if header is None or header.strip() == "*":
+        return
+    if not any(same_version(candidate.strip(), etag) for candidate in header.split(",")):
+        raise HTTPException(status_code=412, detail="L'enregistrement a été modifié entre-temps",
+                            headers={"ETag": etag})
+
+
+# Réponse rendue : corps JSON encodé, en-têtes propres à la réponse et corps
+# compressés (un par encodage, calculés à la première demande)
+class RenderedResponse:
+    __slots__ = ("body", "headers", "compressed")
+
+    def __init__(self, body: bytes, headers: Dict[str, str]):
+        self.body = body
+        self.headers = headers
+        self.compressed: Dict[str, bytes] = {}
+
+    # Mémoire occupée par les corps (non compressé et compressés)
+    def nbytes(self) -> int:
+        return len(self.body) + sum(len(body) for body in self.compressed.values())
+
+
+# Cache LRU des réponses rendues, indexé par route et paramètres. Chaque entrée
+# conserve l'ETag de la version rendue : une lecture après une écriture remplace
+# l'entrée de la version précédente, une seule version par requête est donc
+# conservée. Le cache est borné en nombre d'entrées et en octets, et les corps
+# plus grands que max_body ne sont pas conservés. Les corps compressés sont
+# conservés avec l'entrée : une réponse populaire n'est compressée qu'une fois
+# par version et par encodage
+class ResponseCache:
+    def __init__(self, max_size: int = RESPONSE_CACHE_SIZE, compression: bool = COMPRESSION_ENABLED,
+                 min_size: int = COMPRESSION_MIN_SIZE, max_bytes: int = RESPONSE_CACHE_MAX_BYTES,
+                 max_body: int = RESPONSE_CACHE_MAX_BODY):
+        self.max_size = max_size
+        self.max_bytes = max_bytes
+        self.max_body = max_body
+        self.compression = compression
+        self.min_size = min_size
+        self._entries: "OrderedDict[Hashable, Tuple[str, RenderedResponse]]" = OrderedDict()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.not_modified = 0
+        self.evictions = 0
+        self.uncached = 0
+        self.compressions = 0
+        self.bytes_saved = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    # Répondre à une lecture : 304 si le client possède déjà cette version,
+    # sinon la réponse en cache ou, à défaut, celle produite par render
+    def respond(self, request: Request, etag: str, render: Callable[[], RenderedResponse]) -> Response:
+        matched = matching_etag(request, etag)
+        if matched is not None:
+            self.not_modified += 1
+            return Response(status_code=304, headers={"ETag": matched, "Vary": "Accept-Encoding"})
+        key = self._key(request)
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] == etag:
+            self.hits += 1
+            self._entries.move_to_end(key)
+            rendered = entry[1]
+        else:
+            self.misses += 1
+            rendered = render()
+            self._put(key, etag, rendered)
+
+        headers = {**rendered.headers, "ETag": etag, "Vary": "Accept-Encoding"}
+        encoding = negotiate(request.headers.get("accept-encoding")) if self.compression else None
+        if encoding is None or len(rendered.body) < self.min_size:
+            return RawJSONResponse(rendered.body, headers=headers)
+        body = rendered.compressed.get(encoding)
+        if body is None:
+            body = CODECS[encoding].compress(rendered.body)
+            self.compressions += 1
+            if self._entries.get(key, (None, None))[1] is rendered:
+                rendered.compressed[encoding] = body
+                self.bytes += len(body)
+                self._evict()
+        self.bytes_saved += len(rendered.body) - len(body)
+        headers["ETag"] = encoded_etag(etag, encoding)
+        headers["Content-Encoding"] = encoding
+        return RawJSONResponse(body, headers=headers)
+
+    @staticmethod
+    def _key(request: Request) -> Tuple[Any, ...]:
+        return (request.url.path, tuple(sorted(request.query_params.multi_items())))
+
+    # Conserver la réponse rendue d'une version (remplace celle de la version précédente)
+    def _put(self, key: Hashable, etag: str, rendered: RenderedResponse) -> None:
+        previous = self._entries.pop(key, None)
+        if previous is not None:
+            self.bytes -= previous[1].nbytes()
+        if self.max_size <= 0:
+            return
+        if len(rendered.body) > self.max_body:
+            self.uncached += 1
+            return
+        self._entries[key] = (etag, rendered)
+        self.bytes += rendered.nbytes()
+        self._evict()
+
+    def _evict(self) -> None:
+        while self._entries and (len(self._entries) > self.max_size or self.bytes > self.max_bytes):
+            _, (_, rendered) = self._entries.popitem(last=False)
+            self.bytes -= rendered.nbytes()
+            self.evictions += 1
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self.bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "bytes": self.bytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "not_modified": self.not_modified,
+            "evictions": self.evictions,
+            "uncached": self.uncached,  # Corps trop grands pour être conservés
+            "compressions": self.compressions,
+            "bytes_saved": self.bytes_saved,
+        }
@@ -0,0 +1,221 @@
+from bisect import bisect_left
+from contextvars import ContextVar
+import functools
+import inspect
+import os
+from time import perf_counter
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+# Instrumentation des requêtes (middleware) et en-tête Server-Timing
+METRICS_ENABLED = os.environ.get("METRICS_ENABLED", "1") == "1"
+SERVER_TIMING = os.environ.get("SERVER_TIMING", "1") == "1"
+
+# Bornes des histogrammes de latence (secondes), de 100 µs à 10 s
+LATENCY_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Durées des composants (dépendances, hachage...) mesurées pendant la requête en
+# cours, avec leur libellé Server-Timing déjà encodé ; renseigné uniquement
+# lorsque l'en-tête est produit
+_request_timings: ContextVar[Optional[List[Tuple[bytes, float]]]] = ContextVar("request_timings", default=None)
+
+
+# Histogramme à bornes fixes (compteurs non cumulés, cumulés à l'export ; le
+# nombre total d'observations est calculé à l'export)
+class Histogram:
+    __slots__ = ("bounds", "counts", "sum")
+
+    def __init__(self, bounds: Tuple[float, ...] = LATENCY_BUCKETS):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)  # Dernière case : au-delà de la plus grande borne
+        self.sum = 0.0
+
+    @property
+    def count(self) -> int:
+        return sum(self.counts)
+
+    def reset(self) -> None:
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.sum += value
+
+    def cumulative(self) -> List[Tuple[str, int]]:
+        total = 0
+        buckets = []
+        for bound, count in zip((*map(repr, self.bounds), "+Inf"), self.counts):
+            total += count
+            buckets.append((bound, total))
+        return buckets
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(**labels: Any) -> str:
+    return ",".join(f'{name}="{_escape(str(value))}"' for name, value in labels.items())
+
+
+# Registre des métriques de l'application, exporté au format texte Prometheus
+class Metrics:
+    def __init__(self):
+        self.in_flight = 0
+        # (méthode, route) -> (histogramme de latence, compteurs par code de statut)
+        self.requests: Dict[Tuple[str, str], Tuple[Histogram, Dict[int, int]]] = {}
+        self.components: Dict[str, Histogram] = {}
+
+    def observe_request(self, method: str, route: str, status: int, seconds: float) -> None:
+        entry = self.requests.get((method, route))
+        if entry is None:
+            entry = self.requests[method, route] = (Histogram(), {})
+        histogram, statuses = entry
+        histogram.observe(seconds)
+        if status in statuses:
+            statuses[status] += 1
+        else:
+            statuses[status] = 1
+
+    # Histogramme d'un composant (dépendance, hachage...), créé au premier appel ;
+    # instrument le conserve pour ne pas le rechercher à chaque mesure
+    def component(self, name: str) -> Histogram:
+        histogram = self.components.get(name)
+        if histogram is None:
+            histogram = self.components[name] = Histogram()
+        return histogram
+
+    # Durée d'un composant ; également ajoutée aux durées de la requête en cours
+    # pour l'en-tête Server-Timing
+    def observe_component(self, name: str, seconds: float) -> None:
+        self.component(name).observe(seconds)
+        timings = _request_timings.get()
+        if timings is not None:
+            timings.append((_timing_label(name), seconds))
+
+    # Les histogrammes des composants sont remis à zéro sur place (instrument
+    # en conserve des références)
+    def clear(self) -> None:
+        self.requests.clear()
+        for histogram in self.components.values():
+            histogram.reset()
+
+    def render(self) -> str:
+        lines = [
+            "# HELP app_requests_in_flight Requêtes en cours de traitement",
+            "# TYPE app_requests_in_flight gauge",
+            f"app_requests_in_flight {self.in_flight}",
+            "# HELP app_responses_total Réponses par route et code de statut",
+            "# TYPE app_responses_total counter",
+        ]
+        for (method, route), (_, statuses) in sorted(self.requests.items()):
+            for status, count in sorted(statuses.items()):
+                lines.append(f"app_responses_total{{{_labels(method=method, route=route, status=status)}}} {count}")
+        lines += [
+            "# HELP app_request_duration_seconds Latence des requêtes par route",
+            "# TYPE app_request_duration_seconds histogram",
+        ]
+        for (method, route), (histogram, _) in sorted(self.requests.items()):
+            lines += self._render_histogram("app_request_duration_seconds", histogram, method=method, route=route)
+        lines += [
+            "# HELP app_component_duration_seconds Durée des dépendances et étapes instrumentées",
+            "# TYPE app_component_duration_seconds histogram",
+        ]
+        for name, histogram in sorted(self.components.items()):
+            lines += self._render_histogram("app_component_duration_seconds", histogram, component=name)
+        return "\n".join(lines) + "\n"
+
+    @staticmethod
+    def _render_histogram(name: str, histogram: Histogram, **labels: Any) -> List[str]:
+        prefix = _labels(**labels)
+        lines = [f'{name}_bucket{{{prefix},le="{bound}"}} {count}' for bound, count in histogram.cumulative()]
+        lines.append(f"{name}_sum{{{prefix}}} {histogram.sum!r}")
+        lines.append(f"{name}_count{{{prefix}}} {histogram.count}")
+        return lines
+
+
+metrics = Metrics()
+
+
+# Mesurer une fonction asynchrone (dépendance FastAPI ou étape coûteuse).
+# La signature est conservée (functools.wraps) pour l'injection de dépendances
+def instrument(name: str) -> Callable[[Callable], Callable]:
+    def decorator(function: Callable) -> Callable:
+        if not inspect.iscoroutinefunction(function):
+            raise TypeError(f"{function.__name__} doit être une fonction asynchrone")
+
+        histogram = metrics.component(name)
+        label = _timing_label(name)
+
+        @functools.wraps(function)
+        async def wrapper(*args, **kwargs):
+            start = perf_counter()
+            try:
+                return await function(*args, **kwargs)
+            finally:
+                seconds = perf_counter() - start
+                histogram.observe(seconds)
+                timings = _request_timings.get()
+                if timings is not None:
+                    timings.append((label, seconds))
+
+        return wrapper
+
+    return decorator
+
+
+# Libellé Server-Timing d'un composant, encodé une seule fois
+def _timing_label(name: str) -> bytes:
+    return name.encode("latin-1") + b";dur="
+
+
+# Valeur de l'en-tête Server-Timing (durées en millisecondes) ; formatage
+# directement en octets, l'en-tête étant construit à chaque requête
+def server_timing(timings: List[Tuple[bytes, float]], total: float) -> bytes:
+    if not timings:
+        return b"total;dur=%.3f" % (total * 1e3)
+    parts = [b"%s%.3f" % (label, seconds * 1e3) for label, seconds in timings]
+    parts.append(b"total;dur=%.3f" % (total * 1e3))
+    return b", ".join(parts)
+
+
+# Middleware ASGI : latence par route (modèle de chemin, pas l'URL), codes de
+# statut, requêtes en cours et en-tête Server-Timing
+class MetricsMiddleware:
+    def __init__(self, app, registry: Metrics = metrics, timing_header: bool = SERVER_TIMING):
+        self.app = app
+        self.registry = registry
+        self.timing_header = timing_header
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        registry = self.registry
+        # Sans en-tête Server-Timing, les durées des composants ne sont pas
+        # collectées par requête (ni liste, ni ContextVar)
+        timings: Optional[List[Tuple[bytes, float]]] = [] if self.timing_header else None
+        token = None if timings is None else _request_timings.set(timings)
+        status = 500
+        start = perf_counter()
+
+        async def send_wrapper(message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                if timings is not None:
+                    header = (b"server-timing", server_timing(timings, perf_counter() - start))
+                    message["headers"] = [*message.get("headers", ()), header]
+            await send(message)
+
+        registry.in_flight += 1
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            registry.in_flight -= 1
+            if token is not None:
+                _request_timings.reset(token)
+            route = scope.get("route")
+            registry.observe_request(scope["method"], route.path if route is not None else "<unmatched>",
+                                     status, perf_counter() - start)
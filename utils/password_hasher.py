@@ -0,0 +1,104 @@
+import asyncio
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+import os
+from typing import Any, Callable, Dict, List, Optional
+
+from fastapi import HTTPException
+from passlib.context import CryptContext
+
+# Contexte pour le hachage des mots de passe
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+
+
+# Fonctions exécutées dans les workers (définies au niveau du module pour
+# pouvoir être transmises à un pool de processus)
+def hash_password(password: str) -> str:
+    return pwd_context.hash(password)
+
+
+def check_password(plain_password: str, hashed_password: str) -> bool:
+    return pwd_context.verify(plain_password, hashed_password)
+
+
+# Service de hachage : exécute bcrypt dans un pool de threads ou de processus
+# pour ne pas bloquer la boucle d'événements. La file d'attente est bornée :
+# au-delà de max_pending requêtes en cours, la requête est rejetée en 503.
+# Les imports en masse (hash_many) n'occupent jamais plus de bulk_workers
+# workers à la fois, tous imports confondus : un worker reste libre pour les
+# connexions, qui n'attendent au plus qu'un hachage derrière un import
+class PasswordHasher:
+    def __init__(self, max_workers: Optional[int] = None, max_pending: int = 64, use_processes: bool = False):
+        self.max_workers = max_workers or min(4, os.cpu_count() or 1)
+        self.max_pending = max_pending
+        self.use_processes = use_processes
+        self.bulk_workers = max(1, self.max_workers - 1)
+        self._bulk_slots: Optional[asyncio.Semaphore] = None
+        self._executor: Optional[Executor] = None
+        self._pending = 0  # Tâches soumises et non terminées (en cours + en attente)
+        self._completed = 0
+        self._rejected = 0
+
+    @property
+    def executor(self) -> Executor:
+        if self._executor is None:
+            pool = ProcessPoolExecutor if self.use_processes else ThreadPoolExecutor
+            self._executor = pool(max_workers=self.max_workers)
+        return self._executor
+
+    async def hash(self, password: str) -> str:
+        return await self._submit(hash_password, password)
+
+    async def verify(self, plain_password: str, hashed_password: str) -> bool:
+        return await self._submit(check_password, plain_password, hashed_password)
+
+    # Hacher une liste de mots de passe en parallèle, un mot de passe par tâche
+    # et au plus bulk_workers tâches soumises à la fois (voir la classe)
+    async def hash_many(self, passwords: List[str]) -> List[str]:
+        if self._bulk_slots is None:
+            self._bulk_slots = asyncio.Semaphore(self.bulk_workers)
+        slots = self._bulk_slots
+        hashed: List[Optional[str]] = [None] * len(passwords)
+        positions = iter(range(len(passwords)))
+
+        async def worker() -> None:
+            for position in positions:
+                async with slots:
+                    hashed[position] = await self._submit(hash_password, passwords[position])
+
+        await asyncio.gather(*(worker() for _ in range(min(self.bulk_workers, len(passwords)))))
+        return hashed
+
+    # Statistiques d'utilisation du pool
+    def stats(self) -> Dict[str, Any]:
+        running = min(self._pending, self.max_workers)
+        return {
+            "executor": "process" if self.use_processes else "thread",
+            "workers": self.max_workers,
+            "bulk_workers": self.bulk_workers,
+            "running": running,
+            "queued": self._pending - running,
+            "max_pending": self.max_pending,
+            "utilization": running / self.max_workers,
+            "completed": self._completed,
+            "rejected": self._rejected,
+        }
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    async def _submit(self, function: Callable, *args) -> Any:
+        if self._pending >= self.max_pending:
+            self._rejected += 1
+            raise HTTPException(
+                status_code=503,
+                detail="Service de hachage saturé, réessayez plus tard",
+                headers={"Retry-After": "1"},
+            )
+        self._pending += 1
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self.executor, function, *args)
+        finally:
+            self._pending -= 1
+            self._completed += 1
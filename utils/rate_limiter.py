@@ -0,0 +1,210 @@
+from collections import OrderedDict
+from math import ceil
+import time
+from typing import Callable, Dict, List, NamedTuple, Optional, Tuple
+
+from fastapi import HTTPException
+
+
+# Limite de débit : "times" requêtes par fenêtre de "seconds" secondes
+class RateLimit(NamedTuple):
+    times: int
+    seconds: float
+
+    def describe(self) -> str:
+        if self.seconds == 60:
+            return f"{self.times} requêtes par minute"
+        return f"{self.times} requêtes par {self.seconds:g} secondes"
+
+
+# Seau à jetons : capacité "times", rechargé de times/seconds jetons par seconde.
+# État par clé : [jetons, horodatage] (O(1) en temps et en mémoire)
+class TokenBucket:
+    name = "token_bucket"
+
+    # Script Lua exécuté de façon atomique par Redis ; l'heure vient du serveur
+    # Redis pour que tous les workers partagent la même horloge
+    lua = """
+local limit = tonumber(ARGV[1])
+local window = tonumber(ARGV[2])
+local t = redis.call('TIME')
+local now = t[1] * 1000 + math.floor(t[2] / 1000)
+local rate = limit / window
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(state[1]) or limit
+local ts = tonumber(state[2]) or now
+tokens = math.min(limit, tokens + math.max(0, now - ts) * rate)
+local wait = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+else
+    wait = math.ceil((1 - tokens) / rate)
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', now)
+redis.call('PEXPIRE', KEYS[1], window)
+return wait
+"""
+
+    # Retourne le nouvel état et le délai d'attente en secondes (0 si autorisé)
+    @staticmethod
+    def hit(state: Optional[List[float]], limit: RateLimit, now: float) -> Tuple[List[float], float]:
+        rate = limit.times / limit.seconds
+        if state is None:
+            state = [float(limit.times), now]
+        tokens = min(limit.times, state[0] + max(0.0, now - state[1]) * rate)
+        state[1] = now
+        if tokens >= 1:
+            state[0] = tokens - 1
+            return state, 0.0
+        state[0] = tokens
+        return state, (1 - tokens) / rate
+
+
+# Compteur à fenêtre glissante : estimation pondérée à partir du compteur de la
+# fenêtre précédente et de celui de la fenêtre courante.
+# État par clé : [numéro de fenêtre, compteur courant, compteur précédent]
+class SlidingWindowCounter:
+    name = "sliding_window"
+
+    lua = """
+local limit = tonumber(ARGV[1])
+local window = tonumber(ARGV[2])
+local t = redis.call('TIME')
+local now = t[1] * 1000 + math.floor(t[2] / 1000)
+local current = math.floor(now / window)
+local state = redis.call('HMGET', KEYS[1], 'win', 'cur', 'prev')
+local win = tonumber(state[1]) or current
+local cur = tonumber(state[2]) or 0
+local prev = tonumber(state[3]) or 0
+if win ~= current then
+    if win == current - 1 then prev = cur else prev = 0 end
+    cur = 0
+end
+local offset = now % window
+local wait = 0
+if prev * (1 - offset / window) + cur + 1 > limit then
+    local free = limit - 1 - cur
+    if prev > 0 and free >= 0 then
+        wait = math.max(1, math.ceil((1 - free / prev) * window - offset))
+    else
+        wait = window - offset
+    end
+else
+    cur = cur + 1
+end
+redis.call('HSET', KEYS[1], 'win', current, 'cur', cur, 'prev', prev)
+redis.call('PEXPIRE', KEYS[1], window * 2)
+return wait
+"""
+
+    @staticmethod
+    def hit(state: Optional[List[float]], limit: RateLimit, now: float) -> Tuple[List[float], float]:
+        current = now // limit.seconds
+        if state is None:
+            state = [current, 0, 0]
+        elif state[0] != current:
+            state[2] = state[1] if state[0] == current - 1 else 0
+            state[1] = 0
+            state[0] = current
+        offset = now - current * limit.seconds
+        previous, count = state[2], state[1]
+        if previous * (1 - offset / limit.seconds) + count + 1 <= limit.times:
+            state[1] = count + 1
+            return state, 0.0
+        free = limit.times - 1 - count
+        if previous > 0 and free >= 0:
+            return state, max((1 - free / previous) * limit.seconds - offset, 0.001)
+        return state, limit.seconds - offset
+
+
+ALGORITHMS = {algorithm.name: algorithm for algorithm in (TokenBucket, SlidingWindowCounter)}
+
+
+# Backend en mémoire (par processus) : états stockés dans un OrderedDict trié
+# par dernier accès, ce qui permet d'évincer les clés inactives en O(1) amorti
+class MemoryBackend:
+    def __init__(self, max_keys: int = 100_000, clock: Callable[[], float] = time.monotonic):
+        self.max_keys = max_keys
+        self.clock = clock
+        # clé -> (état, expiration) ; une clé expirée est équivalente à une clé neuve
+        self._states: "OrderedDict[str, Tuple[List[float], float]]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._states)
+
+    async def hit(self, key: str, limit: RateLimit, algorithm) -> float:
+        now = self.clock()
+        entry = self._states.get(key)
+        state = entry[0] if entry is not None and entry[1] > now else None
+        state, wait = algorithm.hit(state, limit, now)
+        self._states[key] = (state, now + 2 * limit.seconds)
+        self._states.move_to_end(key)
+        self._evict(now)
+        return wait
+
+    # Éviction des clés inactives les plus anciennes, et au-delà de max_keys
+    def _evict(self, now: float) -> None:
+        while self._states:
+            key, (_, expires) = next(iter(self._states.items()))
+            if expires > now and len(self._states) <= self.max_keys:
+                break
+            del self._states[key]
+
+    def clear(self) -> None:
+        self._states.clear()
+
+
+# Backend partagé entre workers via Redis : chaque algorithme est un script
+# Lua exécuté atomiquement (EVALSHA, rechargé automatiquement si nécessaire)
+class RedisBackend:
+    def __init__(self, redis, prefix: str = "rate-limit"):
+        self.redis = redis
+        self.prefix = prefix
+        self._scripts = {name: redis.register_script(algorithm.lua) for name, algorithm in ALGORITHMS.items()}
+
+    async def hit(self, key: str, limit: RateLimit, algorithm) -> float:
+        script = self._scripts[algorithm.name]
+        wait_ms = await script(
+            keys=[f"{self.prefix}:{algorithm.name}:{key}"],
+            args=[limit.times, int(limit.seconds * 1000)],
+        )
+        return int(wait_ms) / 1000
+
+    async def clear(self) -> None:
+        async for key in self.redis.scan_iter(match=f"{self.prefix}:*"):
+            await self.redis.delete(key)
+
+
+# Limiteur de débit configurable : limite par défaut, limites par route
+# (modèle de chemin, ex. "/token") et par clé (ex. clé API premium)
+class RateLimiter:
+    def __init__(self, default: RateLimit, algorithm: str = SlidingWindowCounter.name, backend=None):
+        self.default = default
+        self.algorithm = ALGORITHMS[algorithm]
+        self.backend = backend if backend is not None else MemoryBackend()
+        self.route_limits: Dict[str, RateLimit] = {}
+        self.key_limits: Dict[str, RateLimit] = {}
+
+    def set_route_limit(self, path: str, limit: RateLimit) -> None:
+        self.route_limits[path] = limit
+
+    def set_key_limit(self, key: str, limit: RateLimit) -> None:
+        self.key_limits[key] = limit
+
+    # Une route avec une limite dédiée a son propre compteur ; sinon la limite
+    # de la clé (ou la limite par défaut) s'applique à toutes les routes
+    def resolve(self, key: str, route: Optional[str] = None) -> Tuple[str, RateLimit]:
+        if route is not None and route in self.route_limits:
+            return f"{key}:{route}", self.route_limits[route]
+        return key, self.key_limits.get(key, self.default)
+
+    # Comptabiliser une requête ; lève une HTTPException 429 si la limite est atteinte
+    async def check(self, key: str, route: Optional[str] = None) -> None:
+        bucket, limit = self.resolve(key, route)
+        wait = await self.backend.hit(bucket, limit, self.algorithm)
+        if wait > 0:
+            raise HTTPException(
+                status_code=429,
+                detail=f"Trop de requêtes. Limite: {limit.describe()}.",
+                headers={"Retry-After": str(max(1, ceil(wait)))},
+            )
@@ -0,0 +1,273 @@
+from bisect import bisect_left, bisect_right
+from concurrent.futures import Future
+from itertools import islice
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+from utils.storage import OP_DELETE, OP_PUT, Storage
+
+
+# Exception levée lorsqu'une valeur viole un index unique (ISBN, email...)
+class DuplicateKeyError(ValueError):
+    def __init__(self, field: str, value: Any):
+        super().__init__(f"Valeur déjà utilisée pour '{field}': {value}")
+        self.field = field
+        self.value = value
+
+
+# Dépôt en mémoire indexé : recherche par ID en O(1), index uniques sur
+# certains champs, allocation monotone des IDs et suppression en O(1).
+# Avec un stockage en colonnes (columns, voir utils/catalogue.py), les champs
+# columns.fields ne sont conservés que dans les colonnes : les enregistrements
+# internes en sont privés et les lectures retournent des copies complètes
+class Repository:
+    # Taille des lots reconstitués en une fois lors des parcours
+    BATCH_SIZE = 256
+
+    def __init__(self, unique_fields: Iterable[str] = (), initial: Iterable[Dict[str, Any]] = (), columns=None):
+        # Le dictionnaire conserve l'ordre d'insertion (donc l'ordre des IDs)
+        self._rows: Dict[int, Dict[str, Any]] = {}
+        self._indexes: Dict[str, Dict[Any, int]] = {field: {} for field in unique_fields}
+        # IDs triés pour la pagination par curseur ; les IDs supprimés y restent
+        # jusqu'à la prochaine compaction
+        self._ordered_ids: List[int] = []
+        self._next_id = 1
+        # Stockage durable optionnel (voir attach)
+        self._storage: Optional[Storage] = None
+        self._collection: Optional[str] = None
+        self._last_write: Optional[Future] = None
+        self.columns = columns
+        self._column_fields = frozenset(columns.fields) if columns is not None else frozenset()
+        self._load(dict(row) for row in initial)
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        return self._materialized(self._rows.values())
+
+    def __contains__(self, item_id: int) -> bool:
+        return item_id in self._rows
+
+    # Réserver le prochain ID (jamais réutilisé, même après une suppression)
+    def next_id(self) -> int:
+        new_id = self._next_id
+        self._next_id += 1
+        return new_id
+
+    # Récupérer un enregistrement par son ID
+    def get(self, item_id: int) -> Optional[Dict[str, Any]]:
+        record = self._rows.get(item_id)
+        return None if record is None else self._materialize(record)
+
+    # Enregistrement interne d'un ID (sans les champs des colonnes) : son identité
+    # ne change que lorsque l'enregistrement est remplacé (clé des caches)
+    def record(self, item_id: int) -> Optional[Dict[str, Any]]:
+        return self._rows.get(item_id)
+
+    # Récupérer un enregistrement via un index unique
+    def get_by(self, field: str, value: Any) -> Optional[Dict[str, Any]]:
+        item_id = self._indexes[field].get(value)
+        return None if item_id is None else self._materialize(self._rows[item_id])
+
+    # Ajouter un enregistrement ; un ID est attribué s'il n'est pas fourni
+    def add(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        return self.add_many([data])[0]
+
+    # Ajouter plusieurs enregistrements (colonnes remplies en une seule passe) ;
+    # en cas de doublon, les enregistrements précédents restent ajoutés
+    def add_many(self, items: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        added = []
+        try:
+            for data in items:
+                row = dict(data)
+                if row.get("id") is None:
+                    row["id"] = self.next_id()
+                self._insert(row)
+                added.append(row)
+        finally:
+            if self.columns is not None:
+                self.columns.add_many(added)
+            for row in added:
+                self._log(OP_PUT, row["id"], row)
+        return added
+
+    # Remplacer un enregistrement existant en conservant son ID
+    def replace(self, item_id: int, data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        old = self._rows.get(item_id)
+        if old is None:
+            return None
+        row = dict(data)
+        row["id"] = item_id
+        self._check_unique(row, ignore_id=item_id)
+        self._unindex(old)
+        self._rows[item_id] = self._record(row)
+        self._index(row)
+        if self.columns is not None:
+            self.columns.add(row)
+        self._log(OP_PUT, item_id, row)
+        return row
+
+    # Modifier certains champs d'un enregistrement : le nouvel enregistrement
+    # remplace l'ancien (jamais modifié sur place, les caches comparent les
+    # identités) et seuls les index uniques des champs modifiés sont mis à jour
+    def update(self, item_id: int, changes: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        record = self._rows.get(item_id)
+        if record is None:
+            return None
+        old = self._materialize(record)
+        row = {**old, **changes, "id": item_id}
+        touched = [field for field in self._indexes if field in changes and changes[field] != old.get(field)]
+        for field in touched:
+            owner = self._indexes[field].get(row[field])
+            if owner is not None and owner != item_id:
+                raise DuplicateKeyError(field, row[field])
+        for field in touched:
+            index = self._indexes[field]
+            if index.get(old.get(field)) == item_id:
+                del index[old[field]]
+            if row[field] is not None:
+                index[row[field]] = item_id
+        self._rows[item_id] = self._record(row)
+        if any(field in changes for field in self._column_fields):
+            self.columns.add(row)
+        self._log(OP_PUT, item_id, row)
+        return row
+
+    # Supprimer un enregistrement ; retourne l'enregistrement supprimé
+    def delete(self, item_id: int) -> Optional[Dict[str, Any]]:
+        record = self._rows.pop(item_id, None)
+        if record is None:
+            return None
+        row = self._materialize(record)
+        self._unindex(row)
+        if self.columns is not None:
+            self.columns.remove(item_id)
+        self._log(OP_DELETE, item_id)
+        # Compaction amortie des IDs supprimés (nouvelle liste : les
+        # itérations en cours conservent l'ancienne)
+        if len(self._ordered_ids) > 2 * len(self._rows) + 64:
+            self._ordered_ids = [i for i in self._ordered_ids if i in self._rows]
+        return row
+
+    # Parcourir les enregistrements par ID croissant, à partir de l'ID suivant after_id
+    def iter_from(self, after_id: Optional[int] = None, limit: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+        return self._materialized(self._iter_records(after_id, limit))
+
+    def _iter_records(self, after_id: Optional[int], limit: Optional[int]) -> Iterator[Dict[str, Any]]:
+        ids = self._ordered_ids
+        position = 0 if after_id is None else bisect_right(ids, after_id)
+        count = 0
+        while position < len(ids) and (limit is None or count < limit):
+            row = self._rows.get(ids[position])
+            position += 1
+            if row is not None:
+                count += 1
+                yield row
+
+    # Récupérer une page d'enregistrements (pagination par curseur)
+    def page(self, after_id: Optional[int] = None, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        return list(self.iter_from(after_id, limit))
+
+    def values(self) -> List[Dict[str, Any]]:
+        return list(self)
+
+    # Associer un stockage durable : le contenu est rechargé depuis le stockage,
+    # ou le contenu actuel y est enregistré si la collection n'existe pas encore
+    def attach(self, storage: Storage, collection: str) -> None:
+        rows, next_id = storage.load(collection)
+        self._storage = None  # Pas de journalisation pendant le chargement
+        if next_id is None:
+            rows.close()
+            self._storage, self._collection = storage, collection
+            for row in self:
+                self._log(OP_PUT, row["id"], row)
+            return
+        self.clear()
+        self._load(rows)
+        self._next_id = max(self._next_id, next_id)
+        self._storage, self._collection = storage, collection
+
+    # Attendre que toutes les écritures effectuées soient durables
+    async def sync(self) -> None:
+        if self._last_write is not None:
+            await Storage.wait(self._last_write)
+
+    def clear(self) -> None:
+        self._rows.clear()
+        for index in self._indexes.values():
+            index.clear()
+        self._ordered_ids = []
+        self._next_id = 1
+        if self.columns is not None:
+            self.columns.clear()
+
+    # Insérer des enregistrements complets sans journalisation (chargement),
+    # les colonnes étant remplies par lots
+    def _load(self, rows: Iterable[Dict[str, Any]]) -> None:
+        rows = iter(rows)
+        while True:
+            batch = list(islice(rows, 4096))
+            if not batch:
+                return
+            for row in batch:
+                self._insert(row)
+            if self.columns is not None:
+                self.columns.add_many(batch)
+
+    # Reconstituer des enregistrements complets, par lots de BATCH_SIZE
+    def _materialized(self, records: Iterable[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+        if self.columns is None:
+            yield from records
+            return
+        records = iter(records)
+        while True:
+            batch = list(islice(records, self.BATCH_SIZE))
+            if not batch:
+                return
+            yield from self.columns.materialize_many(batch)
+
+    def _materialize(self, record: Dict[str, Any]) -> Dict[str, Any]:
+        return record if self.columns is None else self.columns.materialize(record)
+
+    # Enregistrement interne : l'enregistrement complet privé des champs des colonnes
+    def _record(self, row: Dict[str, Any]) -> Dict[str, Any]:
+        if self.columns is None:
+            return row
+        return {field: value for field, value in row.items() if field not in self._column_fields}
+
+    def _insert(self, row: Dict[str, Any]) -> Dict[str, Any]:
+        item_id = row["id"]
+        if item_id in self._rows:
+            raise DuplicateKeyError("id", item_id)
+        self._check_unique(row)
+        self._rows[item_id] = self._record(row)
+        self._index(row)
+        ids = self._ordered_ids
+        if not ids or item_id > ids[-1]:
+            ids.append(item_id)  # Cas courant : IDs croissants
+        else:
+            position = bisect_left(ids, item_id)
+            if position == len(ids) or ids[position] != item_id:
+                ids.insert(position, item_id)
+        if item_id >= self._next_id:
+            self._next_id = item_id + 1
+        return row
+
+    def _log(self, op: str, item_id: int, row: Optional[Dict[str, Any]] = None) -> None:
+        if self._storage is not None:
+            self._last_write = self._storage.submit(self._collection, op, item_id, row)
+
+    def _check_unique(self, row: Dict[str, Any], ignore_id: Optional[int] = None) -> None:
+        for field, index in self._indexes.items():
+            owner = index.get(row.get(field))
+            if owner is not None and owner != ignore_id:
+                raise DuplicateKeyError(field, row[field])
+
+    def _index(self, row: Dict[str, Any]) -> None:
+        for field, index in self._indexes.items():
+            if row.get(field) is not None:
+                index[row[field]] = row["id"]
+
+    def _unindex(self, row: Dict[str, Any]) -> None:
+        for field, index in self._indexes.items():
+            if index.get(row.get(field)) == row["id"]:
+                del index[row[field]]
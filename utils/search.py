@@ -0,0 +1,306 @@
+from bisect import bisect_left, insort
+import re
+import unicodedata
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+_TOKEN_RE = re.compile(r"[0-9a-z]+")
+_NON_ALNUM_RE = re.compile(r"[^0-9a-z]+")
+_DIGIT_GROUP_RE = re.compile(r"(?<=\d)[-\s](?=\d)")
+# Caractères possibles d'un jeton (voir _TOKEN_RE)
+_ALPHABET = "0123456789abcdefghijklmnopqrstuvwxyz"
+
+# Multiplicateurs selon le type de correspondance (combinés au poids du champ)
+MATCH_EXACT = 3
+MATCH_PREFIX = 2
+MATCH_SUBSTRING = 1
+# Nombre de candidats en deçà duquel un terme est vérifié directement sur leurs
+# textes plutôt que par le vocabulaire (plages de préfixes, trigrammes), si ce
+# parcours est le moins coûteux (voir _term_tiers)
+SCAN_CANDIDATES = 1024
+# Nombre de jetons d'une plage de préfixes examinés pour estimer sa fréquence
+ESTIMATE_TOKENS = 64
+
+
+# Normaliser un texte : minuscules, suppression des accents ("Élan" -> "elan")
+# et regroupement des nombres séparés par des tirets ("978-2-07" -> "978207")
+def normalize(text: str) -> str:
+    decomposed = unicodedata.normalize("NFKD", text.casefold())
+    stripped = "".join(c for c in decomposed if not unicodedata.combining(c))
+    return _DIGIT_GROUP_RE.sub("", stripped)
+
+
+# Découper un texte en jetons alphanumériques normalisés
+def tokenize(text: str) -> List[str]:
+    return _TOKEN_RE.findall(normalize(text))
+
+
+# Trigrammes d'un jeton ("potter" -> "pot", "ott", "tte", "ter")
+def trigrams(token: str) -> Set[str]:
+    return {token[i:i + 3] for i in range(len(token) - 2)}
+
+
+# Trigrammes et jetons de moins de trois caractères pouvant contenir un terme
+# d'un ou deux caractères ("ar" -> "ar0", ..., "zar" ; "a" -> "a00", ..., "za")
+def short_term_keys(term: str) -> Tuple[List[str], List[str]]:
+    if len(term) == 2:
+        return [term + c for c in _ALPHABET] + [c + term for c in _ALPHABET], []
+    pairs = [a + b for a in _ALPHABET for b in _ALPHABET]
+    grams = [term + pair for pair in pairs] + [pair[0] + term + pair[1] for pair in pairs] + [pair + term for pair in pairs]
+    return grams, [term + c for c in _ALPHABET] + [c + term for c in _ALPHABET]
+
+
+# Index inversé (jetons + trigrammes, par champ) maintenu de façon incrémentale,
+# pour la recherche par préfixe et par sous-chaîne avec classement des résultats.
+# Le classement repose sur des opérations d'ensembles : chaque terme répartit les
+# documents en niveaux (exact > préfixe > sous-chaîne, pondérés par le champ).
+class SearchIndex:
+    def __init__(self, fields: Dict[str, int], compact_fields: Iterable[str] = ()):
+        # fields : nom du champ -> poids dans le classement
+        self.fields = fields
+        # Champs indexés comme un seul jeton sans séparateurs (ex. ISBN)
+        self.compact_fields = set(compact_fields)
+        self._docs: Dict[int, Dict[str, Tuple[str, Set[str]]]] = {}
+        self._tokens: Dict[str, Dict[str, Set[int]]] = {field: {} for field in fields}
+        self._trigrams: Dict[str, Dict[str, Set[int]]] = {field: {} for field in fields}
+        # Jetons triés de chaque champ pour la recherche par préfixe
+        self._vocabulary: Dict[str, List[str]] = {field: [] for field in fields}
+
+    def __len__(self) -> int:
+        return len(self._docs)
+
+    # Indexer un document (remplace l'ancienne version s'il existe déjà)
+    def add(self, doc_id: int, doc: Dict[str, Any]) -> None:
+        if doc_id in self._docs:
+            self.remove(doc_id)
+        entry = {}
+        for field in self.fields:
+            indexed = self._index_field(doc_id, field, doc.get(field))
+            if indexed is not None:
+                entry[field] = indexed
+        self._docs[doc_id] = entry
+
+    # Réindexer seulement les champs modifiés d'un document déjà indexé
+    def update(self, doc_id: int, doc: Dict[str, Any], changed: Iterable[str]) -> None:
+        entry = self._docs.get(doc_id)
+        if entry is None:
+            self.add(doc_id, doc)
+            return
+        for field in changed:
+            if field not in self.fields:
+                continue
+            old = entry.pop(field, None)
+            if old is not None:
+                self._unindex_field(doc_id, field, old[1])
+            indexed = self._index_field(doc_id, field, doc.get(field))
+            if indexed is not None:
+                entry[field] = indexed
+
+    # Retirer un document de l'index
+    def remove(self, doc_id: int) -> None:
+        entry = self._docs.pop(doc_id, None)
+        if entry is None:
+            return
+        for field, (_, tokens) in entry.items():
+            self._unindex_field(doc_id, field, tokens)
+
+    # Ajouter les jetons et trigrammes d'un champ ; retourne (texte normalisé, jetons)
+    def _index_field(self, doc_id: int, field: str, value: Any) -> Optional[Tuple[str, Set[str]]]:
+        if value is None:
+            return None
+        text = normalize(str(value))
+        if field in self.compact_fields:
+            text = _NON_ALNUM_RE.sub("", text)
+            tokens = {text} if text else set()
+        else:
+            tokens = set(_TOKEN_RE.findall(text))
+        field_tokens = self._tokens[field]
+        field_trigrams = self._trigrams[field]
+        for token in tokens:
+            postings = field_tokens.get(token)
+            if postings is None:
+                postings = field_tokens[token] = set()
+                insort(self._vocabulary[field], token)
+            postings.add(doc_id)
+        for gram in self._field_trigrams(tokens):
+            field_trigrams.setdefault(gram, set()).add(doc_id)
+        return text, tokens
+
+    def _unindex_field(self, doc_id: int, field: str, tokens: Set[str]) -> None:
+        for token in tokens:
+            if self._discard(self._tokens[field], token, doc_id):
+                vocabulary = self._vocabulary[field]
+                del vocabulary[bisect_left(vocabulary, token)]
+        for gram in self._field_trigrams(tokens):
+            self._discard(self._trigrams[field], gram, doc_id)
+
+    # Rechercher les documents correspondant à tous les termes de la requête.
+    # Retourne (IDs classés pour la page demandée, nombre total de résultats)
+    def search(self, query: str, limit: Optional[int] = None, offset: int = 0) -> Tuple[List[int], int]:
+        terms = list(dict.fromkeys(tokenize(query)))
+        if not terms:
+            return [], 0
+        # Les termes les plus sélectifs d'abord : les suivants ne sont évalués
+        # que sur les documents déjà retenus. Les termes courts (sans trigrammes,
+        # voir _short_substring), souvent très fréquents, passent en dernier
+        terms.sort(key=lambda term: (len(term) < 3, self._estimate(term)))
+        tiers = []
+        candidates: Optional[Set[int]] = None
+        for term in terms:
+            term_tiers = self._term_tiers(term, within=candidates)
+            if not term_tiers:
+                return [], 0
+            tiers.append(term_tiers)
+            candidates = set().union(*(docs for _, docs in term_tiers))
+        ranked = tiers[0] if len(tiers) == 1 else self._combine(tiers, candidates)
+
+        # Parcours des niveaux par score décroissant ; seul le niveau contenant
+        # la page demandée est trié
+        page: List[int] = []
+        total = 0
+        for _, docs in ranked:
+            start = max(offset - total, 0)
+            total += len(docs)
+            if (limit is None or len(page) < limit) and start < len(docs):
+                end = None if limit is None else start + limit - len(page)
+                page.extend(sorted(docs)[start:end])
+        return page, total
+
+    # Niveaux de correspondance d'un terme : liste de (score, IDs) disjoints,
+    # triée par score décroissant, restreinte aux documents de within s'il est fourni
+    def _term_tiers(self, term: str, within: Optional[Set[int]] = None) -> List[Tuple[int, Set[int]]]:
+        # Peu de candidats : vérification directe si les jetons du vocabulaire à
+        # parcourir (plages de préfixes, trigrammes d'un terme court) sont plus nombreux
+        if within is not None and len(within) <= SCAN_CANDIDATES and (len(term) < 3 or self._span(term) > len(within)):
+            return self._scan_tiers(term, within)
+        levels: List[Tuple[int, Set[int]]] = []
+        for field, weight in self.fields.items():
+            field_tokens = self._tokens[field]
+            postings = [field_tokens[token] for token in self._prefix_tokens(field, term)]
+            exact = field_tokens.get(term, set())
+            if within is not None:
+                postings = [docs & within for docs in postings]
+                exact = exact & within
+            prefix = set().union(*postings)
+            levels.append((MATCH_EXACT * weight, exact))
+            levels.append((MATCH_PREFIX * weight, prefix))
+            levels.append((MATCH_SUBSTRING * weight, self._substring(field, term, exact | prefix, within)))
+        levels.sort(key=lambda level: level[0], reverse=True)
+
+        tiers: List[Tuple[int, Set[int]]] = []
+        seen: Set[int] = set()
+        for score, docs in levels:
+            docs = docs - seen
+            if docs:
+                seen |= docs
+                tiers.append((score, docs))
+        return tiers
+
+    # Mêmes niveaux, calculés en vérifiant le terme sur les jetons et le texte
+    # normalisé de chaque candidat (meilleur score de ses champs)
+    def _scan_tiers(self, term: str, within: Set[int]) -> List[Tuple[int, Set[int]]]:
+        grouped: Dict[int, Set[int]] = {}
+        for doc_id in within:
+            entry = self._docs[doc_id]
+            best = 0
+            for field, weight in self.fields.items():
+                indexed = entry.get(field)
+                if indexed is None:
+                    continue
+                text, tokens = indexed
+                if term in tokens:
+                    score = MATCH_EXACT * weight
+                elif any(token.startswith(term) for token in tokens):
+                    score = MATCH_PREFIX * weight
+                elif term in text:
+                    score = MATCH_SUBSTRING * weight
+                else:
+                    continue
+                best = max(best, score)
+            if best:
+                grouped.setdefault(best, set()).add(doc_id)
+        return sorted(grouped.items(), reverse=True)
+
+    # Combiner les niveaux de plusieurs termes (ET logique, scores additionnés)
+    def _combine(self, tiers: List[List[Tuple[int, Set[int]]]], candidates: Set[int]) -> List[Tuple[int, Set[int]]]:
+        scores: Dict[int, int] = dict.fromkeys(candidates, 0)
+        for term_tiers in tiers:
+            for score, docs in term_tiers:
+                for doc_id in docs & candidates:
+                    scores[doc_id] += score
+        grouped: Dict[int, Set[int]] = {}
+        for doc_id, score in scores.items():
+            grouped.setdefault(score, set()).add(doc_id)
+        return sorted(grouped.items(), reverse=True)
+
+    # Estimation du nombre de documents correspondant à un terme (jetons exacts
+    # et préfixes), utilisée pour ordonner les termes d'une requête. Seuls les
+    # ESTIMATE_TOKENS premiers jetons d'une grande plage de préfixes sont lus
+    def _estimate(self, term: str) -> int:
+        count = 0
+        for field in self.fields:
+            field_tokens = self._tokens[field]
+            start, end = self._prefix_range(field, term)
+            sample = self._vocabulary[field][start:min(end, start + ESTIMATE_TOKENS)]
+            if sample:
+                count += sum(len(field_tokens[token]) for token in sample) * (end - start) // len(sample)
+        return count
+
+    # Positions des jetons du vocabulaire commençant par le terme ("{" suit "z"
+    # et tous les caractères possibles d'un jeton)
+    def _prefix_range(self, field: str, term: str) -> Tuple[int, int]:
+        vocabulary = self._vocabulary[field]
+        return bisect_left(vocabulary, term), bisect_left(vocabulary, term + "{")
+
+    # Nombre de jetons du vocabulaire commençant par le terme, tous champs confondus
+    def _span(self, term: str) -> int:
+        return sum(end - start for start, end in (self._prefix_range(field, term) for field in self.fields))
+
+    # Jetons du vocabulaire commençant par le terme (le terme lui-même exclu)
+    def _prefix_tokens(self, field: str, term: str) -> List[str]:
+        start, end = self._prefix_range(field, term)
+        return [token for token in self._vocabulary[field][start:end] if token != term]
+
+    # Documents dont le champ contient le terme en sous-chaîne : intersection
+    # des trigrammes puis vérification sur le texte normalisé (les documents
+    # déjà trouvés par jeton exact ou préfixe sont exclus)
+    def _substring(self, field: str, term: str, exclude: Set[int], within: Optional[Set[int]] = None) -> Set[int]:
+        if len(term) < 3:
+            return self._short_substring(field, term, within).difference(exclude)
+        field_trigrams = self._trigrams[field]
+        postings = sorted((field_trigrams.get(g, set()) for g in trigrams(term)), key=len)
+        if within is not None:
+            postings.insert(0, within)
+        result = postings[0].intersection(*postings[1:]).difference(exclude)
+        if len(term) > 3:
+            result = {doc_id for doc_id in result if term in self._docs[doc_id][field][0]}
+        return result
+
+    # Termes d'un ou deux caractères (aucun trigramme) : un jeton d'au moins trois
+    # caractères contient le terme si l'un de ses trigrammes le contient, les
+    # jetons plus courts sont cherchés directement (voir short_term_keys)
+    def _short_substring(self, field: str, term: str, within: Optional[Set[int]] = None) -> Set[int]:
+        grams, tokens = short_term_keys(term)
+        field_trigrams, field_tokens = self._trigrams[field], self._tokens[field]
+        postings = [field_trigrams[gram] for gram in grams if gram in field_trigrams]
+        postings += [field_tokens[token] for token in tokens if token in field_tokens]
+        if within is not None:
+            postings = [docs & within for docs in postings]
+        return set().union(*postings)
+
+    @staticmethod
+    def _field_trigrams(tokens: Set[str]) -> Set[str]:
+        grams: Set[str] = set()
+        for token in tokens:
+            grams |= trigrams(token)
+        return grams
+
+    # Retirer un ID d'une liste de diffusion ; retourne True si elle devient vide
+    @staticmethod
+    def _discard(postings: Dict[str, Set[int]], key: str, doc_id: int) -> bool:
+        docs = postings.get(key)
+        if docs is not None:
+            docs.discard(doc_id)
+            if not docs:
+                del postings[key]
+                return True
+        return False
@@ -0,0 +1,51 @@
+import os
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple
+
+from fastapi import Response
+from pydantic_core import to_json
+
+# Chemin de sérialisation rapide (optionnel) : les routes des utilisateurs
+# renvoient directement des octets JSON au lieu de passer par jsonable_encoder /
+# response_model. Les routes des livres l'ignorent : elles servent toujours le
+# JSON pré-encodé de EncodedCache (réponses en cache, voir utils/http_cache.py)
+FAST_JSON_RESPONSES = os.environ.get("FAST_JSON_RESPONSES", "0") == "1"
+
+
+# Réponse contenant du JSON déjà encodé (aucune sérialisation supplémentaire)
+class RawJSONResponse(Response):
+    media_type = "application/json"
+
+
+# Cache du JSON pré-encodé de chaque enregistrement. Une entrée n'est valide que
+# pour l'objet exact qui a été encodé : un enregistrement remplacé (mise à jour)
+# est donc réencodé automatiquement ; discard libère l'entrée d'un enregistrement supprimé.
+# source(id) fournit l'objet de référence lorsque les lignes encodées sont des
+# copies reconstituées à chaque lecture (Repository.record d'un dépôt en colonnes)
+class EncodedCache:
+    def __init__(self, encode: Callable[[Dict[str, Any]], bytes] = to_json,
+                 source: Optional[Callable[[int], Any]] = None):
+        self.encode = encode
+        self.source = source
+        self._entries: Dict[int, Tuple[Any, bytes]] = {}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, row: Dict[str, Any]) -> bytes:
+        reference = row if self.source is None else self.source(row["id"])
+        entry = self._entries.get(row["id"])
+        if entry is not None and entry[0] is reference:
+            return entry[1]
+        data = self.encode(row)
+        self._entries[row["id"]] = (reference, data)
+        return data
+
+    # Encoder une liste d'enregistrements en assemblant les fragments en cache
+    def encode_list(self, rows: Iterable[Dict[str, Any]]) -> bytes:
+        return b"[" + b",".join(self.get(row) for row in rows) + b"]"
+
+    def discard(self, item_id: int) -> None:
+        self._entries.pop(item_id, None)
+
+    def clear(self) -> None:
+        self._entries.clear()
@@ -0,0 +1,183 @@
+import asyncio
+from concurrent.futures import Future
+import json
+import queue
+import sqlite3
+import threading
+import time
+from typing import Any, BinaryIO, Dict, Iterator, List, Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:  # Windows : verrou via msvcrt
+    fcntl = None
+    import msvcrt
+
+# Opérations journalisées
+OP_PUT = "put"
+OP_DELETE = "delete"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS records (
+    collection TEXT NOT NULL,
+    id INTEGER NOT NULL,
+    data TEXT NOT NULL,
+    PRIMARY KEY (collection, id)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS sequences (
+    collection TEXT PRIMARY KEY,
+    next_id INTEGER NOT NULL
+);
+"""
+
+
+# Levée quand la base est déjà ouverte par un autre processus
+class StorageLockedError(RuntimeError):
+    pass
+
+
+# Verrou exclusif du processus sur une base (fichier "<chemin>.lock"), libéré à
+# la fermeture du fichier, y compris si le processus s'arrête brutalement
+def _lock(path: str) -> BinaryIO:
+    handle = open(path + ".lock", "a+b")
+    try:
+        if fcntl is not None:
+            fcntl.flock(handle.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        else:
+            msvcrt.locking(handle.fileno(), msvcrt.LK_NBLCK, 1)
+    except OSError:
+        handle.close()
+        raise StorageLockedError(
+            f"La base {path} est déjà ouverte par un autre processus : "
+            "chaque worker doit utiliser son propre STORAGE_PATH"
+        ) from None
+    return handle
+
+
+# Stockage durable basé sur SQLite en mode WAL (journal d'écriture anticipée).
+# Toutes les écritures passent par un unique thread d'écriture qui regroupe les
+# opérations en attente dans une même transaction (group commit) : un seul
+# fsync par lot au lieu d'un par requête. Le WAL est périodiquement fusionné
+# dans la base (checkpoint) pour garder un démarrage rapide.
+# Les données sont servies depuis la mémoire et les IDs attribués par le
+# processus : deux processus écrivant dans la même base attribueraient les
+# mêmes IDs et s'écraseraient. Un verrou exclusif empêche donc un second
+# processus d'ouvrir la base (StorageLockedError au démarrage)
+class Storage:
+    def __init__(self, path: str, max_batch: int = 1000, checkpoint_interval: float = 60.0):
+        self.path = path
+        self.max_batch = max_batch
+        self.checkpoint_interval = checkpoint_interval
+        self._queue: "queue.Queue[Optional[Tuple[str, str, int, Optional[str], Future]]]" = queue.Queue()
+        self.commits = 0
+        self.operations = 0
+        self._lock = _lock(path)
+
+        connection = self._connect()
+        connection.executescript(_SCHEMA)
+        connection.close()
+
+        self._writer = threading.Thread(target=self._write_loop, name="storage-writer", daemon=True)
+        self._writer.start()
+
+    def _connect(self) -> sqlite3.Connection:
+        connection = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("PRAGMA synchronous=FULL")  # Commit durable (fsync du WAL)
+        return connection
+
+    # Charger une collection (lecture au démarrage) ; retourne les enregistrements
+    # par ID croissant et le prochain ID à attribuer
+    def load(self, collection: str) -> Tuple[Iterator[Dict[str, Any]], Optional[int]]:
+        connection = self._connect()
+        row = connection.execute("SELECT next_id FROM sequences WHERE collection = ?", (collection,)).fetchone()
+        return self._iter_records(connection, collection), (row[0] if row else None)
+
+    @staticmethod
+    def _iter_records(connection: sqlite3.Connection, collection: str) -> Iterator[Dict[str, Any]]:
+        try:
+            cursor = connection.execute("SELECT data FROM records WHERE collection = ? ORDER BY id", (collection,))
+            for (data,) in cursor:
+                yield json.loads(data)
+        finally:
+            connection.close()
+
+    # Journaliser une opération ; le Future est résolu une fois le lot validé.
+    # Les données sont sérialisées immédiatement (instantané de l'enregistrement)
+    def submit(self, collection: str, op: str, item_id: int, data: Any = None) -> Future:
+        future: Future = Future()
+        payload = json.dumps(data, ensure_ascii=False) if op == OP_PUT else None
+        self._queue.put((collection, op, item_id, payload, future))
+        return future
+
+    # Attendre (sans bloquer la boucle d'événements) la validation d'une opération
+    @staticmethod
+    async def wait(future: Future) -> None:
+        await asyncio.wrap_future(future)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "commits": self.commits,
+            "operations": self.operations,
+            "pending": self._queue.qsize(),
+            "average_batch": self.operations / self.commits if self.commits else 0.0,
+        }
+
+    # Arrêter le thread d'écriture après avoir validé les opérations en attente
+    def close(self) -> None:
+        self._queue.put(None)
+        self._writer.join()
+        self._lock.close()
+
+    def _write_loop(self) -> None:
+        connection = self._connect()
+        last_checkpoint = time.monotonic()
+        running = True
+        while running:
+            batch: List[Tuple[str, str, int, Optional[str], Future]] = []
+            item = self._queue.get()
+            # Regrouper toutes les opérations déjà en attente
+            while item is not None:
+                batch.append(item)
+                if len(batch) >= self.max_batch:
+                    break
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+            else:
+                running = False
+            if batch:
+                self._commit(connection, batch)
+            if time.monotonic() - last_checkpoint >= self.checkpoint_interval:
+                connection.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+                last_checkpoint = time.monotonic()
+        connection.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        connection.close()
+
+    def _commit(self, connection: sqlite3.Connection, batch: List[Tuple[str, str, int, Optional[str], Future]]) -> None:
+        try:
+            connection.execute("BEGIN")
+            for collection, op, item_id, data, _ in batch:
+                if op == OP_PUT:
+                    connection.execute(
+                        "INSERT OR REPLACE INTO records (collection, id, data) VALUES (?, ?, ?)",
+                        (collection, item_id, data),
+                    )
+                    connection.execute(
+                        "INSERT INTO sequences (collection, next_id) VALUES (?, ?) "
+                        "ON CONFLICT(collection) DO UPDATE SET next_id = MAX(next_id, excluded.next_id)",
+                        (collection, item_id + 1),
+                    )
+                else:
+                    connection.execute("DELETE FROM records WHERE collection = ? AND id = ?", (collection, item_id))
+            connection.execute("COMMIT")
+        except Exception as error:
+            connection.execute("ROLLBACK")
+            for *_, future in batch:
+                future.set_exception(error)
+            return
+        self.commits += 1
+        self.operations += len(batch)
+        for *_, future in batch:
+            future.set_result(None)
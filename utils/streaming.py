@@ -0,0 +1,59 @@
+import csv
+import io
+import json
+from typing import Any, AsyncIterator, Dict, Iterable, List, Optional
+
+from fastapi import Request
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+CSV_MEDIA_TYPE = "text/csv"
+SSE_MEDIA_TYPE = "text/event-stream"
+
+
+# Vérifier si le client demande une réponse en flux NDJSON (en-tête Accept)
+def wants_ndjson(request: Request) -> bool:
+    return NDJSON_MEDIA_TYPE in request.headers.get("accept", "")
+
+
+# Sérialiser des enregistrements en NDJSON (un objet JSON par ligne), par lots
+# pour limiter le nombre d'écritures tout en gardant une mémoire constante.
+# Générateurs asynchrones : StreamingResponse les parcourt dans la boucle
+# d'événements (et non dans un thread), les enregistrements sont donc lus
+# entre deux écritures et jamais pendant l'une d'elles
+async def iter_ndjson(rows: Iterable[Dict[str, Any]], batch_size: int = 500) -> AsyncIterator[bytes]:
+    batch = []
+    for row in rows:
+        batch.append(json.dumps(row, ensure_ascii=False))
+        if len(batch) >= batch_size:
+            yield ("\n".join(batch) + "\n").encode("utf-8")
+            batch = []
+    if batch:
+        yield ("\n".join(batch) + "\n").encode("utf-8")
+
+
+# Sérialiser des enregistrements en CSV (ligne d'en-tête puis une ligne par enregistrement)
+async def iter_csv(rows: Iterable[Dict[str, Any]], fieldnames: List[str], batch_size: int = 500) -> AsyncIterator[bytes]:
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=fieldnames, extrasaction="ignore", lineterminator="\n")
+    writer.writeheader()
+    count = 0
+    for row in rows:
+        writer.writerow(row)
+        count += 1
+        if count % batch_size == 0:
+            yield buffer.getvalue().encode("utf-8")
+            buffer.seek(0)
+            buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode("utf-8")
+
+
+# Formater un événement Server-Sent Events (type, données JSON et ID facultatif,
+# renvoyé par le navigateur dans Last-Event-ID lors d'une reconnexion)
+def sse_event(event: str, data: bytes, event_id: Optional[int] = None) -> bytes:
+    head = f"id: {event_id}\n" if event_id is not None else ""
+    return f"{head}event: {event}\ndata: ".encode("utf-8") + data + b"\n\n"
+
+
+# Commentaire SSE (ignoré par le client) pour garder la connexion ouverte
+SSE_KEEPALIVE = b": keepalive\n\n"
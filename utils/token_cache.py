@@ -0,0 +1,89 @@
+from collections import OrderedDict
+import time
+from typing import Any, Callable, Dict, NamedTuple, Optional, Set
+
+
+# Entrée du cache : claims vérifiés, principal résolu et enregistrement source
+class CachedPrincipal(NamedTuple):
+    claims: Dict[str, Any]
+    user: Any
+    row: Any
+    user_key: Any
+    expires_at: float
+
+
+# Cache LRU borné des tokens vérifiés : évite de refaire jwt.decode et la
+# résolution de l'utilisateur à chaque requête. Une entrée expire avec le
+# token ("exp") et peut être invalidée pour un utilisateur donné.
+class TokenCache:
+    def __init__(self, max_size: int = 10_000, clock: Callable[[], float] = time.time):
+        self.max_size = max_size
+        self.clock = clock
+        self._entries: "OrderedDict[str, CachedPrincipal]" = OrderedDict()
+        self._tokens_by_user: Dict[Any, Set[str]] = {}
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    # Récupérer une entrée valide ; validate permet de rejeter une entrée
+    # dont l'utilisateur a changé depuis la mise en cache
+    def get(self, token: str, validate: Optional[Callable[[CachedPrincipal], bool]] = None) -> Optional[CachedPrincipal]:
+        entry = self._entries.get(token)
+        if entry is None:
+            self.misses += 1
+            return None
+        if entry.expires_at <= self.clock() or (validate is not None and not validate(entry)):
+            self._remove(token)
+            self.misses += 1
+            return None
+        self._entries.move_to_end(token)
+        self.hits += 1
+        return entry
+
+    def put(self, token: str, claims: Dict[str, Any], user: Any, row: Any, user_key: Any) -> None:
+        if self.max_size <= 0:
+            return
+        exp = claims.get("exp")
+        expires_at = float(exp) if exp is not None else float("inf")
+        self._remove(token)
+        self._entries[token] = CachedPrincipal(claims, user, row, user_key, expires_at)
+        self._tokens_by_user.setdefault(user_key, set()).add(token)
+        while len(self._entries) > self.max_size:
+            self._remove(next(iter(self._entries)))
+            self.evictions += 1
+
+    # Invalider tous les tokens d'un utilisateur (changement de rôle, de mot de passe...)
+    def invalidate_user(self, user_key: Any) -> None:
+        for token in list(self._tokens_by_user.get(user_key, ())):
+            self._remove(token)
+            self.invalidations += 1
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._tokens_by_user.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+        }
+
+    def _remove(self, token: str) -> None:
+        entry = self._entries.pop(token, None)
+        if entry is None:
+            return
+        tokens = self._tokens_by_user.get(entry.user_key)
+        if tokens is not None:
+            tokens.discard(token)
+            if not tokens:
+                del self._tokens_by_user[entry.user_key]